@@ -0,0 +1,101 @@
+"""
+Memory per value of the value models.
+
+    python benchmarks/memory.py
+    python benchmarks/memory.py --polls 5000 --json memory.json
+
+Keeps the values of many decoded responses in memory, like a rolling window of a
+long running collector, and reports traced bytes per value for each representation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pyupway.history import HistorySeries  # noqa: E402
+from pyupway.models import CompactHistoryValue, CompactVariableValue  # noqa: E402
+from pyupway.responses import MyUplinkDecoder, MyUpwayDecoder, loads  # noqa: E402
+from mockserver import PAYLOAD_DIR  # noqa: E402
+
+
+def read_payload(name: str) -> bytes:
+    with open(os.path.join(PAYLOAD_DIR, name), 'rb') as payload_file:
+        return payload_file.read()
+
+
+def measure(build: Callable[[], list]) -> tuple:
+    """
+    Returns (number of values, traced bytes) of the values kept by build.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return sum(len(part) for part in kept), used
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--polls', type=int, default=1000, help='number of decoded current value responses kept')
+    parser.add_argument('--history-points', type=int, default=100000, help='number of history points kept')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args(argv)
+
+    values_payload = read_payload('values.json')
+    points_payload = read_payload('points.json')
+    history_payload = read_payload('history.json')
+    myupway = MyUpwayDecoder()
+    myuplink = MyUplinkDecoder()
+
+    def history_data():
+        history = loads(history_payload)
+        data = history['data']
+        return history['unit'], [[data[0][0] + index * 60000, data[index % len(data)][1]] for index in range(args.history_points)]
+
+    cases = [
+        ('MyUpway VariableValue', lambda: [myupway.decode_current_values(loads(values_payload))[1] for _ in range(args.polls)]),
+        ('MyUpway CompactVariableValue', lambda: [[CompactVariableValue.from_value(value) for value in myupway.decode_current_values(loads(values_payload))[1]]
+                                                  for _ in range(args.polls)]),
+        ('MyUplink VariableValue', lambda: [myuplink.decode_current_values(loads(points_payload)) for _ in range(args.polls)]),
+        ('MyUplink CompactVariableValue', lambda: [[CompactVariableValue.from_value(value) for value in myuplink.decode_current_values(loads(points_payload))]
+                                                   for _ in range(args.polls)]),
+        ('VariableHistoryValue', lambda: [myupway.decode_history_data(*history_data())]),
+        ('CompactHistoryValue', lambda: [[CompactHistoryValue.from_value(value) for value in myupway.decode_history_data(*history_data())]]),
+        ('HistorySeries', lambda: [HistorySeries.from_data(*history_data())]),
+    ]
+
+    results: List[dict] = []
+
+    for name, build in cases:
+        count, used = measure(build)
+        results.append({'representation': name, 'values': count, 'bytes': used, 'bytes_per_value': used / count})
+
+    print(f"{'representation':<32}{'values':>10}{'KiB':>10}{'bytes/value':>13}")
+    print('-' * 65)
+    for result in results:
+        print(f"{result['representation']:<32}{result['values']:>10}{result['bytes'] / 1024:>10.0f}{result['bytes_per_value']:>13.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Local stand-in for the MyUpway and MyUplink cloud services.
+
+Replays the payloads in benchmarks/payloads with configurable latency, payload
+size, device count, error rate and token expiry, so the library can be measured
+without network access or real accounts.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+from collections import Counter
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads')
+
+
+def load_payload(name: str):
+    with open(os.path.join(PAYLOAD_DIR, name), encoding='utf-8') as payload_file:
+        return json.load(payload_file)
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    # Default backlog of 5 drops connections of concurrent clients, which retry only after a second
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class MockServer:
+    """
+    Threaded HTTP server answering /LogIn, /LogOut, /PrivateAPI/Values, /PrivateAPI/History,
+    /oauth/token, /v2/systems/me, /v2/devices/{id} and /v2/devices/{id}/points.
+
+        with MockServer(latency=0.05, error_rate=0.01) as server:
+            config = MyUpwayConfig(..., base_url=server.url)
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 history_points: Optional[int] = None, history_interval: int = 60, devices: int = 1,
+                 payload_scale: int = 1, token_lifetime: int = 3600, token_revoke_after: Optional[float] = None,
+                 session_lifetime: Optional[float] = None, value_latency: float = 0.0, invalid_ids: Iterable[int] = (),
+                 etag: bool = False, compress: bool = False, seed: int = 1) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.history_points = history_points
+        self.history_interval = history_interval
+        self.devices = devices
+        self.payload_scale = payload_scale
+        self.token_lifetime = token_lifetime
+        self.token_revoke_after = token_revoke_after
+        # MyUpway session cookies are rejected with 401 this many seconds after login
+        self.session_lifetime = session_lifetime
+        # Server time per requested value, large requests are slower
+        self.value_latency = value_latency
+        # Requests containing these variable ids are answered with 400
+        self.invalid_ids = frozenset(invalid_ids)
+        # Values and points responses carry ETag and honor If-None-Match
+        self.etag = etag
+        # Responses are gzip compressed when the client accepts it
+        self.compress = compress
+
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.connections = 0
+        self.bytes_sent = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}
+        self._token_counter = 0
+        self._sessions: Dict[str, float] = {}
+
+        self._values = load_payload('values.json')
+        self._values_by_id = {value['VariableId']: value for value in self._values['Values']}
+        self._history = load_payload('history.json')
+        self._token = load_payload('token.json')
+        self._systems = load_payload('systems.json')
+        self._points = load_payload('points.json')
+        self._points_by_id = {int(point['parameterId']): point for point in self._points}
+
+        self._server: Optional[_MockHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f'http://localhost:{self._server.server_address[1]}'
+
+    def start(self) -> str:
+        handler = type('MockHandler', (_MockHandler,), {'mock': self})
+        self._server = _MockHTTPServer(('127.0.0.1', 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> MockServer:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+        self.errors.clear()
+        self.connections = 0
+        self.bytes_sent = 0
+
+    # Handlers return (status, payload, headers)
+
+    def login(self, form, query, headers):
+        with self._lock:
+            self._token_counter += 1
+            session = f"mock-session-{self._token_counter}"
+            self._sessions[session] = time.monotonic()
+
+        return 200, {}, {'Set-Cookie': f'.ASPXAUTH={session}; Path=/; HttpOnly'}
+
+    def logout(self, form, query, headers):
+        self._sessions.pop(self._session(headers), None)
+        return 200, {}, {}
+
+    def values(self, form, query, headers):
+        if not self._logged_in(headers):
+            return 401, {}, {}
+
+        ids = [int(variable) for variable in form.get('variables', [])]
+
+        if not self._accept(ids):
+            return 400, {}, {}
+
+        payload = dict(self._values)
+        payload['Values'] = [self._values_by_id[variable] for variable in ids if variable in self._values_by_id]
+        return 200, payload, {}
+
+    def history(self, form, query, headers):
+        if not self._logged_in(headers):
+            return 401, {}, {}
+
+        start = int(form['startDate'][0])
+        stop = int(form['stopDate'][0])
+        resolution = int(form['resolution'][0])
+
+        # Server stores one point per history_interval and downsamples to resolution points
+        available = max(0, (stop - start) // self.history_interval)
+        count = min(available, resolution, self.history_points or available)
+        step = (stop - start) / count if count else 0
+        samples = [point[1] for point in self._history['data']]
+
+        payload = dict(self._history)
+        payload['variableid'] = int(form['variableId'][0])
+        payload['data'] = [[int((start + index * step) * 1000), samples[index % len(samples)]] for index in range(count)]
+        return 200, payload, {}
+
+    def token(self, form, query, headers):
+        with self._lock:
+            self._token_counter += 1
+            access_token = f"{self._token['access_token']}-{self._token_counter}"
+            self._tokens[access_token] = time.monotonic()
+
+        payload = dict(self._token)
+        payload['access_token'] = access_token
+        payload['expires_in'] = self.token_lifetime
+        return 200, payload, {}
+
+    def systems(self, form, query, headers):
+        if not self._authorized(headers):
+            return 401, {}, {}
+
+        page = int(query.get('page', ['1'])[0])
+        per_page = int(query.get('itemsPerPage', ['10'])[0])
+        template = self._systems['systems'][0]
+
+        systems = []
+        for index in range((page - 1) * per_page, min(page * per_page, self.devices)):
+            system = dict(template, systemId=f"{template['systemId']}-{index}")
+            system['devices'] = [dict(template['devices'][0], id=f"{template['devices'][0]['id']}-{index}")]
+            systems.append(system)
+
+        return 200, dict(self._systems, page=page, itemsPerPage=per_page, numItems=self.devices, systems=systems), {}
+
+    def device(self, form, query, headers):
+        if not self._authorized(headers):
+            return 401, {}, {}
+
+        return 200, self._systems['systems'][0]['devices'][0], {}
+
+    def points(self, form, query, headers):
+        if not self._authorized(headers):
+            return 401, {}, {}
+
+        if 'parameters' in query:
+            ids = [int(parameter) for parameter in query['parameters'][0].split(',')]
+
+            if not self._accept(ids):
+                return 400, {}, {}
+
+            points = [self._points_by_id[parameter] for parameter in ids if parameter in self._points_by_id]
+        else:
+            points = self._points
+
+            if self.value_latency:
+                time.sleep(self.value_latency * len(points))
+
+        return 200, points * self.payload_scale, {}
+
+    def _accept(self, ids: List[int]) -> bool:
+        if self.value_latency:
+            time.sleep(self.value_latency * len(ids))
+
+        return self.invalid_ids.isdisjoint(ids)
+
+    @staticmethod
+    def _session(headers) -> Optional[str]:
+        morsel = SimpleCookie(headers.get('Cookie', '')).get('.ASPXAUTH')
+        return morsel.value if morsel is not None else None
+
+    def _logged_in(self, headers) -> bool:
+        started = self._sessions.get(self._session(headers))
+
+        if started is None:
+            return False
+
+        return self.session_lifetime is None or time.monotonic() - started < self.session_lifetime
+
+    def _authorized(self, headers) -> bool:
+        authorization = headers.get('Authorization') or ''
+        issued = self._tokens.get(authorization[len('Bearer '):])
+
+        if issued is None:
+            return False
+
+        lifetime = self.token_lifetime if self.token_revoke_after is None else min(self.token_lifetime, self.token_revoke_after)
+        return time.monotonic() - issued < lifetime
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment, otherwise delayed ACKs add 40 ms to every response
+    disable_nagle_algorithm = True
+    wbufsize = -1
+    mock: MockServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+
+        with self.mock._lock:
+            self.mock.connections += 1
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode()) if length else {}
+        query = parse_qs(url.query)
+        mock = self.mock
+
+        if url.path == '/LogIn':
+            route = 'login', mock.login
+        elif url.path == '/LogOut':
+            route = 'logout', mock.logout
+        elif url.path == '/PrivateAPI/Values':
+            route = 'values', mock.values
+        elif url.path == '/PrivateAPI/History':
+            route = 'history', mock.history
+        elif url.path == '/oauth/token':
+            route = 'token', mock.token
+        elif url.path == '/v2/systems/me':
+            route = 'systems', mock.systems
+        elif url.path.startswith('/v2/devices/') and url.path.endswith('/points'):
+            route = 'points', mock.points
+        elif url.path.startswith('/v2/devices/'):
+            route = 'device', mock.device
+        else:
+            return self._send(404, {}, {})
+
+        name, handler = route
+        mock.requests[name] += 1
+
+        delay = mock.latency + (mock._random.uniform(0, mock.jitter) if mock.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if mock.error_rate and mock._random.random() < mock.error_rate:
+            mock.errors[name] += 1
+            return self._send(mock.error_status, {'error': 'mock failure'}, {'Retry-After': '0'})
+
+        status, payload, headers = handler(form, query, self.headers)
+
+        if status != 200:
+            mock.errors[name] += 1
+
+        if status == 200 and mock.etag and name in ('values', 'points'):
+            etag = '"' + hashlib.sha1(json.dumps(payload).encode()).hexdigest() + '"'
+
+            if self.headers.get('If-None-Match') == etag:
+                return self._send(304, None, {'ETag': etag})
+
+            headers = dict(headers, ETag=etag)
+
+        self._send(status, payload, headers)
+
+    def _send(self, status, payload, headers):
+        body = json.dumps(payload).encode() if payload is not None else b''
+
+        if self.mock.compress and body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            headers = dict(headers, **{'Content-Encoding': 'gzip'})
+
+        with self.mock._lock:
+            self.mock.bytes_sent += len(body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,241 @@
+"""
+Offline benchmarks against the local mock server.
+
+    pip install -e .[async]
+    python benchmarks/run.py
+    python benchmarks/run.py --scenario myuplink-values-all --latency 0.02 --error-rate 0.01 --json results.json
+
+Reports throughput, latency percentiles and peak Python memory per scenario.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pyupway import DataService, MyUpway, MyUpwayConfig, MyUpwayFleet, Variable  # noqa: E402
+from pyupway.auth import FileTokenStore  # noqa: E402
+from pyupway.transport import RequestsTransport  # noqa: E402
+from mockserver import MockServer  # noqa: E402
+
+HISTORY_STOP = datetime(2026, 10, 1)
+
+SCENARIOS: Dict[str, Callable] = {}
+
+
+def scenario(name: str, **server_options):
+    """
+    Registers function(server_url, args) -> operation as benchmark scenario.
+    server_options override the mock server settings given on the command line.
+    """
+
+    def register(setup):
+        SCENARIOS[name] = (setup, server_options)
+        return setup
+
+    return register
+
+
+def myupway_config(url: str, **options) -> MyUpwayConfig:
+    return MyUpwayConfig(dataservice=DataService.MYUPWAY, username='bench', password='bench', heatpump_id=123456, base_url=url, **options)
+
+
+def myuplink_config(url: str) -> MyUpwayConfig:
+    return MyUpwayConfig(dataservice=DataService.MYUPLINK, client_id='bench', client_secret='bench', base_url=url)
+
+
+@scenario('myupway-values-all')
+def myupway_values_all(url, args):
+    myupway = MyUpway(myupway_config(url))
+    return lambda: myupway.get_current_values()
+
+
+@scenario('myuplink-values-all')
+def myuplink_values_all(url, args):
+    myupway = MyUpway(myuplink_config(url))
+    return lambda: myupway.get_current_values()
+
+
+@scenario('myuplink-values-list')
+def myuplink_values_list(url, args):
+    # Every Variable listed in the query string, fetched in batches
+    myupway = MyUpway(myuplink_config(url))
+    return lambda: myupway.get_current_values(list(Variable))
+
+
+@scenario('myupway-values-invalid-id', invalid_ids=[Variable.CURRENT_COMPRESSOR_FREQUENCY.value])
+def myupway_values_invalid_id(url, args):
+    # Server rejects requests containing one of the variables, others are still returned
+    myupway = MyUpway(myupway_config(url), lazy=True)
+    return lambda: myupway.get_current_values()
+
+
+@scenario('myupway-startup')
+def myupway_startup(url, args):
+    # Short lived worker: create client and read one variable
+    return lambda: MyUpway(myupway_config(url), lazy=True).get_current_values([Variable.AVG_OUTDOOR_TEMP])
+
+
+@scenario('myupway-startup-stored-session')
+def myupway_startup_stored_session(url, args):
+    # Same as myupway-startup, but session cookie is reused from the previous process
+    store = FileTokenStore(os.path.join(tempfile.mkdtemp(), 'session.json'))
+    return lambda: MyUpway(myupway_config(url, token_store=store), lazy=True).get_current_values([Variable.AVG_OUTDOOR_TEMP])
+
+
+@scenario('myupway-startup-shared-transport')
+def myupway_startup_shared_transport(url, args):
+    # Same as myupway-startup, but the clients share one transport and its warm connections
+    transport = RequestsTransport()
+    return lambda: MyUpway(myupway_config(url, transport=transport), lazy=True).get_current_values([Variable.AVG_OUTDOOR_TEMP])
+
+
+@scenario('myupway-history-list', history_points=100000)
+def myupway_history_list(url, args):
+    myupway = MyUpway(myupway_config(url))
+    return lambda: myupway.get_history_values(Variable.AVG_OUTDOOR_TEMP, HISTORY_STOP - timedelta(days=365), HISTORY_STOP, resolution=100000)
+
+
+@scenario('myupway-history-series', history_points=100000)
+def myupway_history_series(url, args):
+    myupway = MyUpway(myupway_config(url))
+    return lambda: myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, HISTORY_STOP - timedelta(days=365), HISTORY_STOP, resolution=100000)
+
+
+@scenario('myupway-bulk-history')
+def myupway_bulk_history(url, args):
+    myupway = MyUpway(myupway_config(url))
+    variables = list(Variable)[:10]
+    return lambda: myupway.get_bulk_history_series(variables, HISTORY_STOP - timedelta(days=30), HISTORY_STOP, chunk_size=timedelta(days=3), max_workers=8)
+
+
+@scenario('myuplink-token-expiry', token_revoke_after=0.5)
+def myuplink_token_expiry(url, args):
+    myupway = MyUpway(myuplink_config(url))
+    variables = [Variable.AVG_OUTDOOR_TEMP, Variable.CURRENT_COMPRESSOR_FREQUENCY]
+
+    def operation():
+        time.sleep(0.05)
+        return myupway.get_current_values(variables)
+
+    return operation
+
+
+@scenario('myuplink-fleet', devices=50)
+def myuplink_fleet(url, args):
+    fleet = MyUpwayFleet(myuplink_config(url), max_workers=16)
+    return lambda: fleet.get_current_values([Variable.AVG_OUTDOOR_TEMP, Variable.EXTERNAL_FLOW_TEMP], return_exceptions=True)
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(name: str, args) -> dict:
+    setup, server_options = SCENARIOS[name]
+    options = dict(server_options)
+
+    # Options given on the command line override the scenario defaults
+    for key in ('latency', 'jitter', 'error_rate', 'devices', 'history_points', 'payload_scale', 'value_latency'):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key)
+
+    if args.compress:
+        options['compress'] = True
+
+    with MockServer(**options) as server:
+        operation = setup(server.url, args)
+        operation()  # warm up connections and caches
+        server.reset_counters()
+
+        latencies: List[float] = []
+        errors = 0
+        started = time.perf_counter()
+
+        for _ in range(args.iterations):
+            operation_started = time.perf_counter()
+            try:
+                operation()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - operation_started)
+
+        elapsed = time.perf_counter() - started
+        upstream_requests = sum(server.requests.values())
+        connections = server.connections
+        bytes_sent = server.bytes_sent
+
+        # Memory is measured on a separate call, tracing slows down the timed loop
+        tracemalloc.start()
+        try:
+            operation()
+        except Exception:
+            pass
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'scenario': name,
+        'iterations': args.iterations,
+        'errors': errors,
+        'throughput': args.iterations / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'upstream_requests': upstream_requests,
+        'connections': connections,
+        'response_kb': bytes_sent / 1024,
+        'peak_memory_kb': peak_memory / 1024,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='scenario to run, default all')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--latency', type=float, help='server latency in seconds')
+    parser.add_argument('--jitter', type=float, help='random extra latency in seconds')
+    parser.add_argument('--error-rate', type=float, help='share of requests answered with 503')
+    parser.add_argument('--devices', type=int, help='number of MyUplink devices')
+    parser.add_argument('--history-points', type=int, help='max points per history response')
+    parser.add_argument('--payload-scale', type=int, help='repeat MyUplink points payload this many times')
+    parser.add_argument('--value-latency', type=float, help='extra server latency per requested value in seconds')
+    parser.add_argument('--compress', action='store_true', help='server gzip compresses responses')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args(argv)
+
+    results = [run_scenario(name, args) for name in (args.scenario or sorted(SCENARIOS))]
+
+    header = (f"{'scenario':<34}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'requests':>10}{'conns':>8}"
+              f"{'resp KiB':>10}{'errors':>8}{'peak KiB':>10}")
+    print(header)
+    print('-' * len(header))
+    for result in results:
+        print(f"{result['scenario']:<34}{result['throughput']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['upstream_requests']:>10}{result['connections']:>8}{result['response_kb']:>10.0f}"
+              f"{result['errors']:>8}{result['peak_memory_kb']:>10.0f}")
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,35 +1,59 @@
 from __future__ import annotations
-from typing import List
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
 
 from .enums import DataService, Variable
 from .config import MyUpwayConfig
-from .models import VariableValue, VariableHistoryValue
+from .models import Device, VariableValue, VariableHistoryValue
+from .history import HistorySeries, HistoryBuckets, HistoryFrame
 from .services import MyUpwayService, MyUplinkService
+from .asyncmyupway import AsyncMyUpway
+from .myupwayfleet import MyUpwayFleet
 
 
 class MyUpway:
-    _config: MyUpwayConfig
+    """
+    Logs in when created. With lazy = True login is done on the first request instead.
+    close() releases the HTTP session, use the client as context manager to close it on exit:
+
+        with MyUpway(config) as myupway:
+            values = myupway.get_current_values()
+    """
 
-    deviceId: str
-    isOnline: bool
+    _config: MyUpwayConfig
 
-    def __init__(self, config: MyUpwayConfig) -> None:
+    def __init__(self, config: MyUpwayConfig, lazy: bool = False) -> None:
         self._config = config
 
         if self._config.dataservice == DataService.MYUPWAY:
-            self._service = MyUpwayService(self._config)
+            self._service = MyUpwayService(self._config, lazy=lazy)
         else:
-            self._service = MyUplinkService(self._config)
+            self._service = MyUplinkService(self._config, lazy=lazy)
 
-        self._service.login()
+    def __enter__(self) -> MyUpway:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-        self.deviceId = self._service.deviceId
-        self.isOnline = self._service.isOnline
+    @property
+    def deviceId(self) -> Optional[str]:
+        return getattr(self._service, "deviceId", None)
+
+    @property
+    def isOnline(self) -> bool:
+        return self._service.isOnline
 
     def login(self):
         self._service.login()
 
+    def get_status(self) -> bool:
+        """
+        Returns whether the heat pump is online using the cheapest request available.
+        """
+
+        return self._service.get_status()
+
     def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
         """
         Returns current values for requested variables provided as list of VariableValue.
@@ -41,11 +65,54 @@ class MyUpway:
     def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
         """
         MyUpway: Returns history values for selected variable from specified timerange.
-        MyUplink: Not implemented. History data not available through new API.
+        MyUplink: History API is not available, values recorded by config history_recorder are returned.
         """
 
         return self._service.get_history_values(variable, startDate, stopDate, resolution, force_login)
 
+    def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        """
+        Same as get_history_values, but returns columnar HistorySeries that creates
+        VariableHistoryValue objects only when they are accessed.
+        """
+
+        return self._service.get_history_series(variable, startDate, stopDate, resolution, force_login)
+
+    def get_history_buckets(self, variable: Variable, startDate: datetime, stopDate: datetime, interval: timedelta, fill: Optional[str] = None, points_per_bucket: int = 4, force_login: bool = False) -> HistoryBuckets:
+        """
+        Returns min, max, mean and last value of every interval long bucket. MyUpway history is
+        requested with the smallest resolution giving points_per_bucket points to each bucket.
+        Empty buckets are left empty, or filled with fill = 'previous' or 'linear'.
+        """
+
+        return self._service.get_history_buckets(variable, startDate, stopDate, interval, fill, points_per_bucket, force_login)
+
+    def get_bulk_history_values(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, List[VariableHistoryValue]]:
+        """
+        MyUpway: Returns history values for several variables. Long timerange is split to chunks
+        of chunk_size which are fetched concurrently, max_workers at a time.
+        MyUplink: History API is not available, values recorded by config history_recorder are returned.
+        """
+
+        return self._service.get_bulk_history_values(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+    def get_bulk_history_series(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, HistorySeries]:
+        """
+        Same as get_bulk_history_values, but returns columnar HistorySeries per variable.
+        """
+
+        return self._service.get_bulk_history_series(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+    def get_history_frame(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, on: Variable | timedelta | None = None, tolerance: timedelta | None = None, ffill: bool = True, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> HistoryFrame:
+        """
+        Fetches history of several variables and aligns them on a common timeline with as-of joins,
+        see HistoryFrame.align for on, tolerance and ffill.
+        """
+
+        series = self.get_bulk_history_series(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+        return HistoryFrame.align(series, on, tolerance, ffill, startDate, stopDate)
+
     def logout(self):
         """
         MyUpway: Logs you out from the system.
@@ -53,3 +120,10 @@ class MyUpway:
         """
 
         self._service.logout()
+
+    def close(self):
+        """
+        Closes the underlying HTTP session.
+        """
+
+        self._service.close()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+
+from .enums import DataService, Variable
+from .config import MyUpwayConfig
+from .models import VariableValue, VariableHistoryValue
+from .history import HistorySeries, HistoryBuckets, HistoryFrame
+from .services import AsyncMyUpwayService, AsyncMyUplinkService
+
+
+class AsyncMyUpway:
+    """
+    asyncio counterpart of MyUpway. Pass the same aiohttp connector, or the same
+    AiohttpTransport in the configurations, to many clients to poll a large number
+    of devices over one connection pool.
+
+        async with AsyncMyUpway(config) as myupway:
+            values = await myupway.get_current_values()
+
+    With lazy = True login is done on the first request instead of on enter.
+    """
+
+    _config: MyUpwayConfig
+    _lazy: bool
+
+    def __init__(self, config: MyUpwayConfig, connector=None, lazy: bool = False) -> None:
+        self._config = config
+        self._lazy = lazy
+
+        if self._config.dataservice == DataService.MYUPWAY:
+            self._service = AsyncMyUpwayService(self._config, connector, lazy)
+        else:
+            self._service = AsyncMyUplinkService(self._config, connector, lazy)
+
+    async def __aenter__(self) -> AsyncMyUpway:
+        if not self._lazy:
+            await self.login()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def deviceId(self) -> Optional[str]:
+        return getattr(self._service, "deviceId", None)
+
+    @property
+    def isOnline(self) -> bool:
+        return self._service.isOnline
+
+    async def login(self):
+        await self._service.login()
+
+    async def get_status(self) -> bool:
+        """
+        Returns whether the heat pump is online using the cheapest request available.
+        """
+
+        return await self._service.get_status()
+
+    async def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
+        """
+        Returns current values for requested variables provided as list of VariableValue.
+        If variables are not specified, function returns all variables.
+        """
+
+        return await self._service.get_current_values(variables, force_login)
+
+    async def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
+        """
+        MyUpway: Returns history values for selected variable from specified timerange.
+        MyUplink: History API is not available, values recorded by config history_recorder are returned.
+        """
+
+        return await self._service.get_history_values(variable, startDate, stopDate, resolution, force_login)
+
+    async def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        """
+        Same as get_history_values, but returns columnar HistorySeries that creates
+        VariableHistoryValue objects only when they are accessed.
+        """
+
+        return await self._service.get_history_series(variable, startDate, stopDate, resolution, force_login)
+
+    async def get_history_buckets(self, variable: Variable, startDate: datetime, stopDate: datetime, interval: timedelta, fill: Optional[str] = None, points_per_bucket: int = 4, force_login: bool = False) -> HistoryBuckets:
+        """
+        Returns min, max, mean and last value of every interval long bucket. MyUpway history is
+        requested with the smallest resolution giving points_per_bucket points to each bucket.
+        Empty buckets are left empty, or filled with fill = 'previous' or 'linear'.
+        """
+
+        return await self._service.get_history_buckets(variable, startDate, stopDate, interval, fill, points_per_bucket, force_login)
+
+    async def get_bulk_history_values(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, List[VariableHistoryValue]]:
+        """
+        MyUpway: Returns history values for several variables. Long timerange is split to chunks
+        of chunk_size which are fetched concurrently, max_workers at a time.
+        MyUplink: History API is not available, values recorded by config history_recorder are returned.
+        """
+
+        return await self._service.get_bulk_history_values(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+    async def get_bulk_history_series(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, HistorySeries]:
+        """
+        Same as get_bulk_history_values, but returns columnar HistorySeries per variable.
+        """
+
+        return await self._service.get_bulk_history_series(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+    async def get_history_frame(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, on: Variable | timedelta | None = None, tolerance: timedelta | None = None, ffill: bool = True, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> HistoryFrame:
+        """
+        Fetches history of several variables and aligns them on a common timeline with as-of joins,
+        see HistoryFrame.align for on, tolerance and ffill.
+        """
+
+        series = await self.get_bulk_history_series(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+        return HistoryFrame.align(series, on, tolerance, ffill, startDate, stopDate)
+
+    async def logout(self):
+        """
+        MyUpway: Logs you out from the system.
+        MyUplink: Not implemented as integration is token based API.
+        """
+
+        await self._service.logout()
+
+    async def close(self):
+        """
+        Closes the underlying HTTP session.
+        """
+
+        await self._service.close()
@@ -0,0 +1 @@
+from .filetokenstore import FileTokenStore
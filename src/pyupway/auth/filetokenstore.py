@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from ..models import OAuthToken
+from ..storage import write_json
+
+
+class FileTokenStore:
+    """
+    Shares OAuth tokens between processes through a JSON file. Tokens are keyed by
+    client id. A lock file serializes token fetching, so when many workers start at
+    once only the first one requests a new token and the rest reuse it.
+
+    On platforms without fcntl the lock only works between threads of one process.
+    """
+
+    _path: str
+    _thread_lock: threading.Lock
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Holds exclusive lock of the store. Use around load - fetch - save. The lock blocks
+        the thread, asyncio code must not hold it across await.
+        """
+
+        with self._thread_lock, open(self._path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, key: str) -> Optional[OAuthToken]:
+        token_data = self._read().get(key)
+
+        if not token_data:
+            return None
+
+        return OAuthToken(AccessToken=token_data['access_token'], ExpiresAt=token_data['expires_at'])
+
+    def save(self, key: str, token: OAuthToken) -> None:
+        tokens = self._read()
+        tokens[key] = {'access_token': token.AccessToken, 'expires_at': token.ExpiresAt}
+
+        write_json(self._path, tokens, 0o600)
+
+    def _read(self) -> dict:
+        try:
+            with open(self._path) as token_file:
+                return json.load(token_file)
+        except (FileNotFoundError, ValueError):
+            return {}
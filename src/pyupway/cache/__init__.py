@@ -0,0 +1,3 @@
+from .currentvaluecache import CurrentValueCache
+from .parametercatalog import ParameterCatalog
+from .conditionalcache import ConditionalCache
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+
+class ConditionalCache:
+    """
+    Remembers the last response of each values request (device and variables) with the
+    result decoded from it. A new response is decoded only when it differs:
+
+    - 304 Not Modified to If-None-Match / If-Modified-Since sent from ETag and Last-Modified
+    - identical payload bytes, response is not even parsed
+    - identical fingerprint of the parsed payload (values and their server timestamps),
+      volatile fields like MyUpway FuzzyDate do not cause decoding
+
+    Unchanged polls return the previous result in a new list. The value objects in it are
+    shared between the results, so they should not be modified.
+    """
+
+    _entries: Dict[Hashable, Tuple[Optional[str], Optional[str], bytes, Any, Any]]
+    _lock: threading.Lock
+
+    not_modified: int
+    unchanged: int
+    changed: int
+
+    def __init__(self) -> None:
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        self.not_modified = 0
+        self.unchanged = 0
+        self.changed = 0
+
+    def request_headers(self, key: Hashable) -> Dict[str, str]:
+        """
+        Conditional headers for the next request of key.
+        """
+
+        entry = self._entries.get(key)
+        headers: Dict[str, str] = {}
+
+        if entry is not None:
+            etag, last_modified = entry[0], entry[1]
+
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        return headers
+
+    def lookup_response(self, key: Hashable, status_code: int, content: bytes) -> Optional[Any]:
+        """
+        Returns previous result when the server answered 304 or sent the same payload.
+        """
+
+        # Counters are shared by the threads polling through the cache, += is not atomic
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            if status_code == 304:
+                self.not_modified += 1
+                return entry[4]
+
+            if status_code == 200 and content == entry[2]:
+                self.unchanged += 1
+                return entry[4]
+
+        return None
+
+    def lookup_fingerprint(self, key: Hashable, fingerprint: Any) -> Optional[Any]:
+        """
+        Returns previous result when the parsed payload has the same fingerprint.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[3] == fingerprint:
+                self.unchanged += 1
+                return entry[4]
+
+        return None
+
+    def store(self, key: Hashable, headers: Mapping[str, str], content: bytes, fingerprint: Any, result: Any) -> None:
+        with self._lock:
+            self.changed += 1
+            self._entries[key] = (headers.get('ETag'), headers.get('Last-Modified'), content, fingerprint, result)
+
+    def update(self, key: Hashable, headers: Mapping[str, str], content: bytes) -> None:
+        """
+        Keeps the previous result but remembers the latest payload, so the next identical one is not parsed.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries[key] = (headers.get('ETag') or entry[0], headers.get('Last-Modified') or entry[1], content, entry[3], entry[4])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'not_modified': self.not_modified, 'unchanged': self.unchanged, 'changed': self.changed}
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..enums import Variable
+from ..models import VariableValue
+
+
+class _Flight:
+    """
+    One upstream request that other callers can wait for.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+class CurrentValueCache:
+    """
+    Per device and variable TTL cache for current values. Only stale or missing variables
+    are requested from the server, and concurrent callers asking for a variable that is
+    already being fetched wait for that request instead of making their own.
+
+    Variables the server does not return are cached as missing for the same TTL.
+    """
+
+    _ttl: float
+    _variable_ttls: Dict[Variable, float]
+    _entries: Dict[Tuple[str, Variable], Tuple[float, Optional[VariableValue]]]
+    _in_flight: Dict[Tuple[str, Variable], _Flight]
+    _lock: threading.Lock
+
+    hits: int
+    misses: int
+    coalesced: int
+
+    def __init__(self, ttl: float | timedelta = 5.0, variable_ttls: Dict[Variable, float | timedelta] | None = None) -> None:
+        self._ttl = self._seconds(ttl)
+        self._variable_ttls = {variable: self._seconds(value) for variable, value in (variable_ttls or {}).items()}
+        self._entries = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_current_values(self, deviceId: str, variables: List[Variable] | None, fetch: Callable[[List[Variable] | None], List[VariableValue]]) -> List[VariableValue]:
+        """
+        Returns values of the device for variables (all variables when empty) using fetch for the ones not in cache.
+        """
+
+        deviceId = str(deviceId)
+        requested = list(variables) if variables else list(Variable)
+        now = time.monotonic()
+        to_fetch: List[Variable] = []
+        waits: Dict[Variable, _Flight] = {}
+
+        with self._lock:
+            for variable in requested:
+                entry = self._entries.get((deviceId, variable))
+
+                if entry is not None and now - entry[0] < self._variable_ttls.get(variable, self._ttl):
+                    self.hits += 1
+                elif (deviceId, variable) in self._in_flight:
+                    self.coalesced += 1
+                    waits[variable] = self._in_flight[(deviceId, variable)]
+                else:
+                    self.misses += 1
+                    to_fetch.append(variable)
+
+            flight = _Flight()
+            for variable in to_fetch:
+                self._in_flight[(deviceId, variable)] = flight
+
+        if to_fetch:
+            self._fetch(deviceId, to_fetch, None if not variables and len(to_fetch) == len(requested) else to_fetch, fetch, flight)
+
+        for waited in set(waits.values()):
+            waited.done.wait()
+
+            if waited.error is not None:
+                raise waited.error
+
+        with self._lock:
+            entries = [self._entries.get((deviceId, variable)) for variable in requested]
+
+        return [entry[1] for entry in entries if entry is not None and entry[1] is not None]
+
+    def invalidate(self, variables: List[Variable] | None = None, deviceId: str | None = None) -> None:
+        """
+        Drops given variables, or everything, from the cache. Without deviceId the variables of every device are dropped.
+        """
+
+        with self._lock:
+            for key in list(self._entries):
+                if (variables is None or key[1] in variables) and (deviceId is None or key[0] == str(deviceId)):
+                    del self._entries[key]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced}
+
+    def _fetch(self, deviceId: str, to_fetch: List[Variable], request: List[Variable] | None, fetch: Callable, flight: _Flight) -> None:
+        try:
+            values = fetch(request)
+        except BaseException as error:
+            flight.error = error
+            raise
+        else:
+            fetched_at = time.monotonic()
+            returned = {value.Enumerator: value for value in values if value.Enumerator is not None}
+
+            with self._lock:
+                for variable, value in returned.items():
+                    self._entries[(deviceId, variable)] = (fetched_at, value)
+                for variable in to_fetch:
+                    if variable not in returned:
+                        self._entries[(deviceId, variable)] = (fetched_at, None)
+        finally:
+            with self._lock:
+                for variable in to_fetch:
+                    if self._in_flight.get((deviceId, variable)) is flight:
+                        del self._in_flight[(deviceId, variable)]
+            flight.done.set()
+
+    @staticmethod
+    def _seconds(value: float | timedelta) -> float:
+        return value.total_seconds() if isinstance(value, timedelta) else float(value)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from sys import intern
+from typing import Dict, List, Optional, Tuple
+
+from ..enums import Variable
+from ..models import ParameterMetadata
+from ..storage import write_json
+
+
+def _intern(text: Optional[str]) -> Optional[str]:
+    return intern(text) if isinstance(text, str) else text
+
+
+class ParameterCatalog:
+    """
+    MyUplink parameter metadata keyed by device id and parameterId. Metadata is parsed
+    from a /points response only when a parameter is seen for the first time or its
+    unit or number of enum values changes, later polls reuse it.
+
+    Parameters that are not in Variable are kept in the catalog as well. With
+    include_unknown = True their values are returned with Enumerator None.
+
+    With path the catalog is loaded from and saved to a JSON file.
+    """
+
+    _path: Optional[str]
+    _parameters: Dict[Tuple[str, str], ParameterMetadata]
+    _lock: threading.Lock
+    _dirty: bool
+
+    include_unknown: bool
+
+    def __init__(self, path: Optional[str] = None, include_unknown: bool = False) -> None:
+        self._path = path
+        self._parameters = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.include_unknown = include_unknown
+
+        if path is not None:
+            self._load()
+
+    def get(self, deviceId: str, parameterId: str) -> Optional[ParameterMetadata]:
+        return self._parameters.get((deviceId, parameterId))
+
+    def resolve(self, deviceId: str, point: dict) -> Tuple[ParameterMetadata, bool]:
+        """
+        Returns metadata for a /points entry and whether it was added or changed.
+        """
+
+        key = (deviceId, point["parameterId"])
+        metadata = self._parameters.get(key)
+
+        if metadata is not None and metadata.EnumCount == len(point["enumValues"]) and metadata.Unit == point["parameterUnit"]:
+            return metadata, False
+
+        metadata = self._parse(point)
+
+        with self._lock:
+            self._parameters[key] = metadata
+            self._dirty = True
+
+        return metadata, True
+
+    def parameters(self, deviceId: Optional[str] = None) -> List[ParameterMetadata]:
+        return [metadata for (device, _), metadata in list(self._parameters.items()) if deviceId is None or device == deviceId]
+
+    def unknown_parameters(self, deviceId: Optional[str] = None) -> List[ParameterMetadata]:
+        """
+        Returns parameters reported by the devices that are missing from Variable.
+        """
+
+        return [metadata for metadata in self.parameters(deviceId) if metadata.Enumerator is None]
+
+    def save(self) -> None:
+        """
+        Writes the catalog to path if it has changed.
+        """
+
+        if self._path is None or not self._dirty:
+            return
+
+        with self._lock:
+            data: Dict[str, Dict[str, dict]] = {}
+
+            for (device, parameter_id), metadata in self._parameters.items():
+                data.setdefault(device, {})[parameter_id] = {
+                    'name': metadata.Name,
+                    'unit': metadata.Unit,
+                    'category': metadata.Category,
+                    'enum_texts': metadata.EnumTexts,
+                    'enum_count': metadata.EnumCount,
+                }
+
+            write_json(self._path, data)
+            self._dirty = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._parameters.clear()
+            self._dirty = True
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, encoding='utf-8') as catalog_file:
+                data = json.load(catalog_file)
+        except (FileNotFoundError, ValueError):
+            return
+
+        for device, parameters in data.items():
+            for parameter_id, parameter in parameters.items():
+                self._parameters[(device, parameter_id)] = ParameterMetadata(
+                    ParameterId=parameter_id,
+                    Name=parameter.get('name'),
+                    Unit=_intern(parameter.get('unit')),
+                    Category=parameter.get('category'),
+                    EnumTexts=parameter.get('enum_texts', {}),
+                    EnumCount=parameter.get('enum_count', 0),
+                    Enumerator=self._variable(parameter_id))
+
+    @classmethod
+    def _parse(cls, point: dict) -> ParameterMetadata:
+        texts: Dict[str, str] = {}
+
+        for el in point["enumValues"]:
+            # First entry wins, like with the earlier list scan
+            if "text" in el:
+                texts.setdefault(str(el["value"]), el["text"])
+            else:
+                texts.setdefault(str(el["value"]), str(el["value"]))
+
+        return ParameterMetadata(
+            ParameterId=point["parameterId"],
+            Name=point.get("parameterName"),
+            Unit=_intern(point["parameterUnit"]),
+            Category=point.get("category"),
+            EnumTexts=texts,
+            EnumCount=len(point["enumValues"]),
+            Enumerator=cls._variable(point["parameterId"]))
+
+    @staticmethod
+    def _variable(parameter_id: str) -> Optional[Variable]:
+        try:
+            return Variable(int(parameter_id))
+        except ValueError:
+            return None
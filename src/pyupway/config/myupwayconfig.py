@@ -1,19 +1,60 @@
 from __future__ import annotations
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 from ..enums import DataService
 from ..exceptions import ConfigurationError
+from ..transport import RequestPolicy
+
+if TYPE_CHECKING:
+    from ..auth import FileTokenStore
+    from ..cache import ConditionalCache, CurrentValueCache, ParameterCatalog
+    from ..history import HistoryCache, HistoryRecorder
+    from ..instrumentation import Instrumentation
+    from ..transport import AiohttpTransport, HttpTransport
 
 
 class MyUpwayConfig:
     username: Optional[str]
     password: Optional[str]
     heatpump_id: Optional[int]
+    heatpump_ids: List[int]
     dataservice: DataService
     client_id: Optional[str]
     client_secret: Optional[str]
+    history_cache: Optional[HistoryCache]
+    history_recorder: Optional[HistoryRecorder]
+    value_cache: Optional[CurrentValueCache]
+    conditional_cache: Optional[ConditionalCache]
+    token_store: Optional[FileTokenStore]
+    base_url: Optional[str]
+    request_policy: RequestPolicy
+    instrumentation: Optional[Instrumentation]
+    parameter_catalog: Optional[ParameterCatalog]
+    values_batch_size: Optional[int]
+    values_max_workers: int
+    transport: Optional[HttpTransport | AiohttpTransport]
 
-    def __init__(self, dataservice: DataService, username: str = None, password: str = None, heatpump_id: int = None, client_id: str = None, client_secret: str = None) -> None:
+    def __init__(self, dataservice: DataService, username: str = None, password: str = None, heatpump_id: int = None, client_id: str = None, client_secret: str = None, heatpump_ids: List[int] = None, history_cache: HistoryCache = None, value_cache: CurrentValueCache = None, token_store: FileTokenStore = None, base_url: str = None, request_policy: RequestPolicy = None, instrumentation: Instrumentation = None, history_recorder: HistoryRecorder = None, parameter_catalog: ParameterCatalog = None, values_batch_size: int = None, values_max_workers: int = 4, conditional_cache: ConditionalCache = None, transport: HttpTransport | AiohttpTransport = None) -> None:
         self.dataservice = dataservice
+        self.heatpump_ids = list(heatpump_ids or [])
+        self.history_cache = history_cache
+        # MyUplink: records current values so history can be served locally
+        self.history_recorder = history_recorder
+        self.value_cache = value_cache
+        # Skips decoding values responses that did not change since the previous poll
+        self.conditional_cache = conditional_cache
+        self.token_store = token_store
+        # Overrides the service address, eg. for a local test server
+        self.base_url = base_url
+        # Share the same policy between clients of one account to share the rate limit
+        self.request_policy = request_policy or RequestPolicy()
+        self.instrumentation = instrumentation
+        # MyUplink: parameter metadata, persisted when the catalog has a path
+        self.parameter_catalog = parameter_catalog
+        # Long variable lists are split to batches of this size (service default when None) fetched concurrently
+        self.values_batch_size = values_batch_size
+        self.values_max_workers = values_max_workers
+        # HTTP backend, HttpTransport for MyUpway and AiohttpTransport for AsyncMyUpway. Share one to share the connection pool
+        self.transport = transport
 
         if self.dataservice == DataService.MYUPWAY:
             if not username:
@@ -24,9 +65,12 @@ class MyUpwayConfig:
                 raise ConfigurationError("Password needs to be defined when using MyUpway")
             self.password = password
 
-            if not heatpump_id:
+            if not heatpump_id and not self.heatpump_ids:
                 raise ConfigurationError("Heatpump ID needs to be defined when using MyUpway")
-            self.heatpump_id = heatpump_id
+            self.heatpump_id = heatpump_id or self.heatpump_ids[0]
+
+            if self.heatpump_id not in self.heatpump_ids:
+                self.heatpump_ids.insert(0, self.heatpump_id)
         
         if self.dataservice == DataService.MYUPLINK:
             if not client_id:
@@ -35,4 +79,4 @@ class MyUpwayConfig:
 
             if not client_secret:
                 raise ConfigurationError("Client secret configuration is required for MyUplink")
-            self.client_secret = client_secret
\ No newline at end of file
+            self.client_secret = client_secret
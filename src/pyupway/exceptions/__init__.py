@@ -1,3 +1,6 @@
 from .configurationerror import ConfigurationError
 from .loginerror import LoginErr, NotLoggedIn
-from .responseerror import ResponseError
\ No newline at end of file
+from .responseerror import ResponseError
+from .circuitopenerror import CircuitOpenError
+from .proxyerror import ProxyError
+from .partialresulterror import PartialResultError
@@ -0,0 +1,4 @@
+class CircuitOpenError(Exception):
+    def __init__(self, message="Device is not polled because it is offline or keeps failing"):
+        self.message = message
+        super().__init__(self.message)
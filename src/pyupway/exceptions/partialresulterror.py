@@ -0,0 +1,14 @@
+from typing import Any, List
+
+
+class PartialResultError(Exception):
+    """
+    Some batches of a request failed. results holds the values of the batches that
+    succeeded and errors the exceptions of the failed ones.
+    """
+
+    def __init__(self, results: List[Any], errors: List[BaseException], message="Some batches failed, values of their variables are missing"):
+        self.results = results
+        self.errors = errors
+        self.message = message
+        super().__init__(self.message)
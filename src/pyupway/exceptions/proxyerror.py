@@ -0,0 +1,4 @@
+class ProxyError(Exception):
+    def __init__(self, message="Proxy request failed"):
+        self.message = message
+        super().__init__(self.message)
@@ -1,4 +1,6 @@
 class ResponseError(Exception):
-    def __init__(self, message="Error with the server response"):
+    def __init__(self, message="Error with the server response", status=None):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        # HTTP status of the response, None when the response could not be parsed
+        self.status = status
+        super().__init__(self.message)
@@ -0,0 +1,6 @@
+from .historywriter import HistoryWriter
+from .csvhistorywriter import CsvHistoryWriter
+from .lineprotocolhistorywriter import LineProtocolHistoryWriter
+from .parquethistorywriter import ParquetHistoryWriter
+from .exportcheckpoint import ExportCheckpoint
+from .historyexporter import HistoryExporter
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import csv
+
+from datetime import datetime, timezone
+
+from ..enums import Variable
+from ..history import HistorySeries
+from .historywriter import TextHistoryWriter
+
+
+class CsvHistoryWriter(TextHistoryWriter):
+    """
+    Writes rows timestamp, variable_id, variable, value, unit. Timestamps are ISO 8601
+    in UTC, or epoch milliseconds with iso_timestamps = False.
+    """
+
+    HEADER = ('timestamp', 'variable_id', 'variable', 'value', 'unit')
+
+    def __init__(self, path: str, iso_timestamps: bool = True, delimiter: str = ',') -> None:
+        super().__init__(path)
+        self._iso_timestamps = iso_timestamps
+        self._writer = csv.writer(self._file, delimiter=delimiter)
+
+        if self._is_empty():
+            self._writer.writerow(self.HEADER)
+
+    def write(self, variable: Variable, series: HistorySeries) -> None:
+        unit = series.Unit or ''
+
+        if self._iso_timestamps:
+            timestamps = (datetime.fromtimestamp(timestamp / 1000, timezone.utc).isoformat() for timestamp in series.timestamps)
+        else:
+            timestamps = iter(series.timestamps)
+
+        self._writer.writerows(
+            (timestamp, variable.value, variable.name, value, unit) for timestamp, value in zip(timestamps, series.values))
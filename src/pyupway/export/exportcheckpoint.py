@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import os
+
+from typing import Dict, Optional, Tuple
+
+from ..storage import write_json
+
+# Variable id -> (exported until in epoch seconds, last written timestamp in epoch milliseconds)
+Positions = Dict[int, Tuple[int, Optional[int]]]
+
+
+class ExportCheckpoint:
+    """
+    Remembers how far every variable has been exported and the position of the writer
+    at that point. Use one checkpoint file per export job and output.
+    """
+
+    _path: str
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    def load(self) -> Tuple[Positions, Optional[int]]:
+        """
+        Returns variable positions and writer position, empty when there is no checkpoint.
+        """
+
+        try:
+            with open(self._path) as checkpoint_file:
+                data = json.load(checkpoint_file)
+        except (FileNotFoundError, ValueError):
+            return {}, None
+
+        positions = {int(variable_id): (position['completed'], position.get('last_timestamp'))
+                     for variable_id, position in data.get('variables', {}).items()}
+
+        return positions, data.get('writer_position')
+
+    def save(self, positions: Positions, writer_position: Optional[int] = None) -> None:
+        data = {
+            'variables': {str(variable_id): {'completed': completed, 'last_timestamp': last_timestamp}
+                          for variable_id, (completed, last_timestamp) in positions.items()},
+            'writer_position': writer_position,
+        }
+
+        write_json(self._path, data)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, List, Optional
+
+from ..enums import Variable
+from ..history import HistorySeries, split_range
+from .exportcheckpoint import ExportCheckpoint, Positions
+from .historywriter import HistoryWriter
+
+if TYPE_CHECKING:
+    from .. import MyUpway
+
+
+class HistoryExporter:
+    """
+    Streams history of many variables to a HistoryWriter chunk by chunk. Only one chunk
+    per variable is held in memory, so memory use does not depend on the length of the range.
+
+    With checkpoint the progress is saved after every chunk and an interrupted export
+    continues where it stopped when run again with the same checkpoint.
+    """
+
+    # Assumed shortest logging interval of the server in seconds, used for default chunk size
+    _HISTORY_LOG_INTERVAL = 60
+
+    _myupway: MyUpway
+    _writer: HistoryWriter
+    _checkpoint: Optional[ExportCheckpoint]
+    _resolution: int
+    _chunk_size: int
+    _max_workers: int
+
+    def __init__(self, myupway: MyUpway, writer: HistoryWriter, checkpoint: ExportCheckpoint | str | None = None,
+                 resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4) -> None:
+        self._myupway = myupway
+        self._writer = writer
+        self._checkpoint = ExportCheckpoint(checkpoint) if isinstance(checkpoint, str) else checkpoint
+        self._resolution = resolution
+        # Default chunk fits within resolution at the server logging interval, so no points are dropped
+        self._chunk_size = max(1, int(chunk_size.total_seconds())) if chunk_size else resolution * self._HISTORY_LOG_INTERVAL
+        self._max_workers = max_workers
+
+    def export(self, variables: List[Variable], startDate: datetime, stopDate: datetime) -> int:
+        """
+        Exports history of variables between startDate and stopDate. Returns number of points written.
+        """
+
+        start = int(startDate.timestamp())
+        stop = int(stopDate.timestamp())
+        stored: Positions = {}
+
+        if self._checkpoint is not None:
+            stored, writer_position = self._checkpoint.load()
+
+            # Drop output that was written after the last saved checkpoint
+            if writer_position is not None:
+                self._writer.restore(writer_position)
+
+        positions: Positions = {variable.value: stored.get(variable.value, (start, None)) for variable in variables}
+        written = 0
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            for chunk_start, chunk_stop in split_range(start, stop, self._chunk_size):
+                pending = [variable for variable in variables if positions[variable.value][0] < chunk_stop]
+
+                if not pending:
+                    continue
+
+                results = executor.map(
+                    lambda variable: self._fetch(variable, max(chunk_start, positions[variable.value][0]), chunk_stop), pending)
+
+                for variable, series in zip(pending, results):
+                    last_timestamp = positions[variable.value][1]
+
+                    # Chunks share their boundaries, skip points that were written with previous chunk
+                    if last_timestamp is not None:
+                        series = series[bisect_right(series.timestamps, last_timestamp):]
+
+                    self._writer.write(variable, series)
+                    written += len(series)
+
+                    positions[variable.value] = (chunk_stop, series.timestamps[-1] if len(series) else last_timestamp)
+
+                self._writer.commit()
+
+                if self._checkpoint is not None:
+                    stored.update(positions)
+                    self._checkpoint.save(stored, self._writer.position())
+
+        return written
+
+    def _fetch(self, variable: Variable, start: int, stop: int) -> HistorySeries:
+        return self._myupway.get_history_series(
+            variable, datetime.fromtimestamp(start), datetime.fromtimestamp(stop), self._resolution)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+
+from abc import ABC, abstractmethod
+from typing import IO, Optional
+
+from ..enums import Variable
+from ..history import HistorySeries
+
+
+class HistoryWriter(ABC):
+    """
+    Destination of HistoryExporter. write is called for every fetched chunk and
+    commit when all variables of the chunk are written, after that the checkpoint is saved.
+
+    position returns a marker of the committed output that is saved with the checkpoint.
+    A resumed export calls restore with it to drop output written after the checkpoint.
+    """
+
+    @abstractmethod
+    def write(self, variable: Variable, series: HistorySeries) -> None:
+        pass
+
+    def commit(self) -> None:
+        pass
+
+    def position(self) -> Optional[int]:
+        return None
+
+    def restore(self, position: int) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TextHistoryWriter(HistoryWriter):
+    """
+    Base of the text writers. File is opened for appending so a resumed export continues it.
+    """
+
+    _file: IO[str]
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'a', encoding='utf-8', newline='')
+
+    def _is_empty(self) -> bool:
+        return self._file.tell() == 0
+
+    def commit(self) -> None:
+        # Data has to be on disk before the checkpoint says it was exported
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self) -> Optional[int]:
+        return self._file.tell()
+
+    def restore(self, position: int) -> None:
+        self._file.flush()
+
+        if position > self._file.tell():
+            raise ValueError("Output file is shorter than the checkpoint, it does not belong to this export")
+
+        self._file.truncate(position)
+        self._file.seek(position)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.commit()
+            self._file.close()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import math
+
+from typing import Dict, Optional
+
+from ..enums import Variable
+from ..history import HistorySeries
+from .historywriter import TextHistoryWriter
+
+
+def _escape_measurement(text: str) -> str:
+    return text.replace('\\', '\\\\').replace(',', '\\,').replace(' ', '\\ ')
+
+
+def _escape_key(text: str) -> str:
+    return _escape_measurement(text).replace('=', '\\=')
+
+
+class LineProtocolHistoryWriter(TextHistoryWriter):
+    """
+    Writes InfluxDB line protocol with millisecond timestamps, import it with precision=ms:
+
+        heatpump,variable=AVG_OUTDOOR_TEMP,unit=°C value=6.5 1696118400000
+
+    tags are added to every line, eg. {'heatpump': '123456'}. Numbers are written as float fields.
+    Points without a value, or with NaN or infinite value that line protocol cannot express, are left out.
+    """
+
+    def __init__(self, path: str, measurement: str = 'heatpump', tags: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(path)
+        self._prefix = _escape_measurement(measurement) + ''.join(
+            f",{_escape_key(key)}={_escape_key(str(value))}" for key, value in sorted((tags or {}).items()))
+
+    def write(self, variable: Variable, series: HistorySeries) -> None:
+        prefix = f"{self._prefix},variable={_escape_key(variable.name)}"
+
+        if series.Unit:
+            prefix += f",unit={_escape_key(series.Unit)}"
+
+        self._file.writelines(
+            f"{prefix} value={self._field(value)} {timestamp}\n" for timestamp, value in zip(series.timestamps, series.values)
+            if value is not None and not (isinstance(value, float) and not math.isfinite(value)))
+
+    @staticmethod
+    def _field(value) -> str:
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+
+        # Integers are written as floats too, InfluxDB rejects points that change the type of the field
+        if isinstance(value, (int, float)):
+            return repr(float(value))
+
+        return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+
+from array import array
+from typing import List, Optional
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+from ..enums import Variable
+from ..history import HistorySeries
+from ..storage import atomic_path
+from .historywriter import HistoryWriter
+
+
+class ParquetHistoryWriter(HistoryWriter):
+    """
+    Writes a Parquet dataset directory with columns timestamp (UTC, ms), variable_id,
+    variable, value and unit. Every commit writes one numbered part file, so an interrupted
+    export never leaves a half written file. Read it with pandas.read_parquet(directory).
+    """
+
+    _directory: str
+    _compression: str
+    _batches: list
+    _part: int
+
+    def __init__(self, directory: str, compression: str = 'zstd') -> None:
+        if pyarrow is None:
+            raise ImportError(
+                "pyarrow is required for Parquet export. Install it with: pip install pyupway[parquet]")
+
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._compression = compression
+        self._batches = []
+        self._part = len(self._part_files())
+        self._schema = pyarrow.schema([
+            ('timestamp', pyarrow.timestamp('ms', tz='UTC')),
+            ('variable_id', pyarrow.int32()),
+            ('variable', pyarrow.string()),
+            ('value', pyarrow.float64()),
+            ('unit', pyarrow.string()),
+        ])
+
+    def write(self, variable: Variable, series: HistorySeries) -> None:
+        length = len(series)
+
+        if not length:
+            return
+
+        # Numeric columns are handed to Arrow without copying
+        timestamps = pyarrow.Array.from_buffers(pyarrow.int64(), length, [None, pyarrow.py_buffer(series.timestamps)])
+
+        if isinstance(series.values, array):
+            values = pyarrow.Array.from_buffers(pyarrow.float64(), length, [None, pyarrow.py_buffer(series.values)])
+        else:
+            values = pyarrow.array([self._to_float(value) for value in series.values], pyarrow.float64())
+
+        self._batches.append(pyarrow.RecordBatch.from_arrays([
+            timestamps.cast(pyarrow.timestamp('ms', tz='UTC')),
+            pyarrow.array([variable.value] * length, pyarrow.int32()),
+            pyarrow.array([variable.name] * length, pyarrow.string()),
+            values,
+            pyarrow.array([series.Unit] * length, pyarrow.string()),
+        ], schema=self._schema))
+
+    def commit(self) -> None:
+        if not self._batches:
+            return
+
+        table = pyarrow.Table.from_batches(self._batches, self._schema)
+        path = os.path.join(self._directory, f"part-{self._part:06d}.parquet")
+
+        with atomic_path(path) as temporary_path:
+            pyarrow.parquet.write_table(table, temporary_path, compression=self._compression)
+
+        self._batches = []
+        self._part += 1
+
+    def position(self) -> Optional[int]:
+        return self._part
+
+    def restore(self, position: int) -> None:
+        for name in self._part_files()[position:]:
+            os.remove(os.path.join(self._directory, name))
+
+        self._part = position
+
+    def close(self) -> None:
+        self.commit()
+
+    def _part_files(self) -> List[str]:
+        return sorted(name for name in os.listdir(self._directory) if name.startswith('part-') and name.endswith('.parquet'))
+
+    @staticmethod
+    def _to_float(value) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,6 @@
+from .historycache import HistoryCache
+from .historychunks import split_range, merge_history_data
+from .historyseries import HistorySeries
+from .historyrecorder import HistoryRecorder
+from .historybuckets import HistoryBuckets, bucket_resolution
+from .historyframe import HistoryFrame
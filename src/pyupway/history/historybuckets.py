@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import math
+
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Sequence, overload
+
+from ..models import HistoryBucket
+
+FILL_METHODS = (None, 'previous', 'linear')
+
+
+def bucket_resolution(start: int, stop: int, interval: int, points_per_bucket: int = 4, log_interval: Optional[int] = None) -> int:
+    """
+    Smallest history resolution giving points_per_bucket points to every interval long bucket
+    of [start, stop] epoch seconds. With log_interval the resolution never asks for more
+    points than the server has logged.
+    """
+
+    resolution = math.ceil(max(1, stop - start) / interval) * points_per_bucket
+
+    if log_interval:
+        resolution = min(resolution, math.ceil(max(1, stop - start) / log_interval))
+
+    return max(1, resolution)
+
+
+class HistoryBuckets(Sequence[HistoryBucket]):
+    """
+    History aggregated to fixed interval buckets. Columns are kept in arrays, bucket
+    start as epoch milliseconds. Statistics of buckets without values are NaN unless
+    they were filled, count tells the number of values in the bucket.
+    """
+
+    Unit: str | None
+    interval: int
+    timestamps: array
+    count: array
+    minimum: array
+    maximum: array
+    mean: array
+    last: array
+
+    def __init__(self, unit: Optional[str], interval: int, timestamps: array, count: array, minimum: array, maximum: array, mean: array, last: array) -> None:
+        self.Unit = unit or None
+        self.interval = interval
+        self.timestamps = timestamps
+        self.count = count
+        self.minimum = minimum
+        self.maximum = maximum
+        self.mean = mean
+        self.last = last
+
+    @classmethod
+    def aggregate(cls, unit: Optional[str], timestamps: array, values: array, interval: timedelta, start: Optional[int] = None, stop: Optional[int] = None, fill: Optional[str] = None) -> HistoryBuckets:
+        """
+        Aggregates epoch millisecond timestamps and float values to buckets of interval
+        starting from start (ms). Without start buckets are aligned to multiples of interval.
+
+        fill = 'previous' repeats the last value before an empty bucket, 'linear' interpolates
+        between the surrounding buckets. Uses NumPy when it is installed.
+        """
+
+        if fill not in FILL_METHODS:
+            raise ValueError(f"Unknown fill method {fill!r}, use one of {FILL_METHODS}")
+
+        if not isinstance(values, array):
+            raise TypeError("Only numeric history can be aggregated")
+
+        interval_ms = int(interval.total_seconds() * 1000)
+
+        if interval_ms <= 0:
+            raise ValueError("Interval has to be positive")
+
+        if start is None:
+            start = timestamps[0] // interval_ms * interval_ms if len(timestamps) else 0
+
+        if stop is None:
+            stop = timestamps[-1] + 1 if len(timestamps) else start
+
+        size = max(0, math.ceil((stop - start) / interval_ms))
+
+        try:
+            columns = cls._aggregate_numpy(timestamps, values, start, interval_ms, size)
+        except ImportError:
+            columns = cls._aggregate_python(timestamps, values, start, interval_ms, size)
+
+        count, minimum, maximum, mean, last = columns
+
+        if fill is not None:
+            for column in (minimum, maximum, mean, last):
+                cls._fill(column, count, fill, last)
+
+        return cls(unit, interval_ms, array('q', range(start, start + size * interval_ms, interval_ms)), count, minimum, maximum, mean, last)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> HistoryBucket: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> HistoryBuckets: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryBuckets(self.Unit, self.interval, self.timestamps[index], self.count[index], self.minimum[index],
+                                  self.maximum[index], self.mean[index], self.last[index])
+
+        return HistoryBucket(
+            Start=datetime.fromtimestamp(self.timestamps[index] / 1000),
+            Count=self.count[index],
+            Min=self._optional(self.minimum[index]),
+            Max=self._optional(self.maximum[index]),
+            Mean=self._optional(self.mean[index]),
+            Last=self._optional(self.last[index]))
+
+    def __iter__(self) -> Iterator[HistoryBucket]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"HistoryBuckets(Unit={self.Unit!r}, interval={timedelta(milliseconds=self.interval)}, length={len(self)})"
+
+    def to_list(self) -> List[HistoryBucket]:
+        return list(self)
+
+    def to_pandas(self):
+        """
+        Returns buckets as pandas DataFrame indexed by UTC bucket start.
+        """
+
+        import numpy
+        import pandas
+
+        index = pandas.to_datetime(numpy.array(self.timestamps, dtype=numpy.int64), unit='ms', utc=True)
+
+        return pandas.DataFrame({
+            'count': numpy.array(self.count, dtype=numpy.int64),
+            'min': numpy.array(self.minimum, dtype=numpy.float64),
+            'max': numpy.array(self.maximum, dtype=numpy.float64),
+            'mean': numpy.array(self.mean, dtype=numpy.float64),
+            'last': numpy.array(self.last, dtype=numpy.float64),
+        }, index=index)
+
+    @staticmethod
+    def _aggregate_numpy(timestamps: array, values: array, start: int, interval: int, size: int):
+        import numpy
+
+        times = numpy.frombuffer(timestamps, dtype=numpy.int64) if len(timestamps) else numpy.empty(0, dtype=numpy.int64)
+        points = numpy.frombuffer(values, dtype=numpy.float64) if len(values) else numpy.empty(0, dtype=numpy.float64)
+
+        if len(times) > 1 and (numpy.diff(times) < 0).any():
+            order = numpy.argsort(times, kind='stable')
+            times, points = times[order], points[order]
+
+        index = (times - start) // interval
+        inside = (index >= 0) & (index < size)
+        index, points = index[inside], points[inside]
+
+        count = numpy.bincount(index, minlength=size)
+        minimum = numpy.full(size, numpy.nan)
+        maximum = numpy.full(size, numpy.nan)
+        mean = numpy.full(size, numpy.nan)
+        last = numpy.full(size, numpy.nan)
+
+        if len(index):
+            # Index is sorted, so every bucket is one contiguous run of points
+            starts = numpy.flatnonzero(numpy.concatenate(([True], index[1:] != index[:-1])))
+            buckets = index[starts]
+            minimum[buckets] = numpy.minimum.reduceat(points, starts)
+            maximum[buckets] = numpy.maximum.reduceat(points, starts)
+            mean[buckets] = numpy.add.reduceat(points, starts) / count[buckets]
+            last[buckets] = points[numpy.concatenate((starts[1:], [len(points)])) - 1]
+
+        return (array('q', count.astype(numpy.int64).tobytes()), array('d', minimum.tobytes()), array('d', maximum.tobytes()),
+                array('d', mean.tobytes()), array('d', last.tobytes()))
+
+    @staticmethod
+    def _aggregate_python(timestamps: array, values: array, start: int, interval: int, size: int):
+        nan = math.nan
+        count = array('q', bytes(8 * size))
+        minimum = array('d', [nan]) * size
+        maximum = array('d', [nan]) * size
+        total = array('d', bytes(8 * size))
+        last = array('d', [nan]) * size
+        last_time = array('q', [-1 << 62]) * size
+
+        for timestamp, value in zip(timestamps, values):
+            index = (timestamp - start) // interval
+
+            if index < 0 or index >= size:
+                continue
+
+            if count[index]:
+                if value < minimum[index]:
+                    minimum[index] = value
+                if value > maximum[index]:
+                    maximum[index] = value
+            else:
+                minimum[index] = maximum[index] = value
+
+            count[index] += 1
+            total[index] += value
+
+            if timestamp >= last_time[index]:
+                last_time[index] = timestamp
+                last[index] = value
+
+        mean = array('d', (total[index] / count[index] if count[index] else nan for index in range(size)))
+
+        return count, minimum, maximum, mean, last
+
+    @staticmethod
+    def _fill(column: array, count: array, fill: str, last: array) -> None:
+        """
+        Fills column of empty buckets in place. Filling with previous uses the last value of the previous
+        bucket, linear interpolates between the surrounding buckets having values.
+        """
+
+        size = len(column)
+        index = 0
+
+        while index < size:
+            if count[index]:
+                index += 1
+                continue
+
+            gap_end = index
+            while gap_end < size and not count[gap_end]:
+                gap_end += 1
+
+            if index > 0:
+                before = last[index - 1] if fill == 'previous' else column[index - 1]
+
+                for gap_index in range(index, gap_end):
+                    if fill == 'previous':
+                        column[gap_index] = before
+                    elif gap_end < size:
+                        column[gap_index] = before + (column[gap_end] - before) * (gap_index - index + 1) / (gap_end - index + 1)
+
+            index = gap_end
+
+    @staticmethod
+    def _optional(value: float) -> Optional[float]:
+        return None if math.isnan(value) else value
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from typing import Any, List, Optional, Tuple
+
+
+class HistoryCache:
+    """
+    SQLite store for history points. Remembers which time ranges have already been
+    downloaded for each heat pump, variable and resolution so only the missing
+    ranges need to be requested from the server.
+
+    Time ranges are epoch seconds like the History API parameters, point
+    timestamps are epoch milliseconds as returned by the server.
+    """
+
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS history_series (
+                    heatpump_id TEXT NOT NULL,
+                    variable_id INTEGER NOT NULL,
+                    resolution INTEGER NOT NULL,
+                    unit TEXT,
+                    PRIMARY KEY (heatpump_id, variable_id, resolution)
+                );
+                CREATE TABLE IF NOT EXISTS history_intervals (
+                    heatpump_id TEXT NOT NULL,
+                    variable_id INTEGER NOT NULL,
+                    resolution INTEGER NOT NULL,
+                    start INTEGER NOT NULL,
+                    stop INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS history_points (
+                    heatpump_id TEXT NOT NULL,
+                    variable_id INTEGER NOT NULL,
+                    resolution INTEGER NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    value,
+                    PRIMARY KEY (heatpump_id, variable_id, resolution, timestamp)
+                ) WITHOUT ROWID;
+            """)
+
+    def missing_ranges(self, heatpump_id, variable_id: int, resolution: int, start: int, stop: int) -> List[Tuple[int, int]]:
+        """
+        Returns the parts of [start, stop] that are not stored yet.
+        """
+
+        missing = []
+        cursor = start
+
+        for interval_start, interval_stop in self._intervals(heatpump_id, variable_id, resolution):
+            if interval_stop <= cursor:
+                continue
+            if interval_start >= stop:
+                break
+            if interval_start > cursor:
+                missing.append((cursor, interval_start))
+            cursor = max(cursor, interval_stop)
+
+        if cursor < stop:
+            missing.append((cursor, stop))
+
+        return missing
+
+    def store(self, heatpump_id, variable_id: int, resolution: int, start: int, stop: int, unit: Optional[str], data: List[List[Any]],
+              settled: Optional[int] = None) -> None:
+        """
+        Replaces the points between start and stop with data, the points downloaded for a
+        range reported missing, and marks [start, stop] as downloaded. Only the part up
+        to settled is marked when given, the rest is replaced again when it is requested.
+        """
+
+        key = (str(heatpump_id), variable_id, resolution)
+        covered_stop = stop if settled is None else min(stop, settled)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO history_series VALUES (?, ?, ?, ?)", (*key, unit))
+            # Points inside a missing range were stored by earlier requests of a range that was not settled yet,
+            # the server samples them differently on every request. Boundary points belong to the neighbouring ranges.
+            self._connection.execute(
+                "DELETE FROM history_points WHERE heatpump_id = ? AND variable_id = ? AND resolution = ? "
+                "AND timestamp > ? AND timestamp < ?",
+                (*key, start * 1000, stop * 1000))
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO history_points VALUES (?, ?, ?, ?, ?)",
+                ((*key, int(point[0]), point[1]) for point in data))
+
+            if covered_stop <= start:
+                return
+
+            intervals = self._read_intervals(key) + [(start, covered_stop)]
+            self._connection.execute(
+                "DELETE FROM history_intervals WHERE heatpump_id = ? AND variable_id = ? AND resolution = ?", key)
+            self._connection.executemany(
+                "INSERT INTO history_intervals VALUES (?, ?, ?, ?, ?)",
+                ((*key, interval_start, interval_stop) for interval_start, interval_stop in self._merge(intervals)))
+
+    def load(self, heatpump_id, variable_id: int, resolution: int, start: int, stop: int) -> Tuple[Optional[str], List[List[Any]]]:
+        """
+        Returns unit and sorted [timestamp, value] points between start and stop.
+        """
+
+        key = (str(heatpump_id), variable_id, resolution)
+
+        with self._lock:
+            unit_row = self._connection.execute(
+                "SELECT unit FROM history_series WHERE heatpump_id = ? AND variable_id = ? AND resolution = ?", key).fetchone()
+            rows = self._connection.execute(
+                "SELECT timestamp, value FROM history_points WHERE heatpump_id = ? AND variable_id = ? AND resolution = ? "
+                "AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp",
+                (*key, start * 1000, stop * 1000)).fetchall()
+
+        return (unit_row[0] if unit_row else None), [list(row) for row in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM history_series")
+            self._connection.execute("DELETE FROM history_intervals")
+            self._connection.execute("DELETE FROM history_points")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _intervals(self, heatpump_id, variable_id: int, resolution: int) -> List[Tuple[int, int]]:
+        with self._lock:
+            return self._read_intervals((str(heatpump_id), variable_id, resolution))
+
+    def _read_intervals(self, key) -> List[Tuple[int, int]]:
+        return self._connection.execute(
+            "SELECT start, stop FROM history_intervals WHERE heatpump_id = ? AND variable_id = ? AND resolution = ? ORDER BY start",
+            key).fetchall()
+
+    @staticmethod
+    def _merge(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        merged: List[Tuple[int, int]] = []
+
+        for interval_start, interval_stop in sorted(intervals):
+            if merged and interval_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], interval_stop))
+            else:
+                merged.append((interval_start, interval_stop))
+
+        return merged
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+def split_range(start: int, stop: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits [start, stop] epoch seconds to consecutive chunks of at most chunk_size seconds.
+    """
+
+    chunks = []
+    chunk_start = start
+
+    while chunk_start < stop:
+        chunk_stop = min(chunk_start + chunk_size, stop)
+        chunks.append((chunk_start, chunk_stop))
+        chunk_start = chunk_stop
+
+    return chunks
+
+
+def merge_history_data(parts: Iterable[Tuple[Optional[str], List[List[Any]]]]) -> Tuple[Optional[str], List[List[Any]]]:
+    """
+    Stitches (unit, [timestamp, value] pairs) of several chunks to one sorted list
+    without duplicate timestamps. Chunks share their boundaries, so later parts win.
+    """
+
+    unit = None
+    points = {}
+
+    for part_unit, data in parts:
+        unit = unit or part_unit
+
+        for point in data:
+            points[point[0]] = point
+
+    return unit, [points[timestamp] for timestamp in sorted(points)]
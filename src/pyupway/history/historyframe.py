@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import math
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..enums import Variable
+from .historyseries import HistorySeries
+
+
+class HistoryFrame:
+    """
+    History of several variables aligned on one timeline of epoch milliseconds. Every
+    column has a value for every timestamp: the last value of the variable at or before
+    it (as-of join), or NaN / None when there is none within the tolerance.
+
+        frame = HistoryFrame.align({Variable.EXTERNAL_FLOW_TEMP: flow_temp, Variable.EXTERNAL_RETURN_TEMP: return_temp}, tolerance=timedelta(minutes=5))
+        frame.at(datetime(2023, 6, 1, 12))
+    """
+
+    timestamps: array
+    columns: Dict[Variable, array | List[Any]]
+    units: Dict[Variable, Optional[str]]
+    tolerance: Optional[timedelta]
+
+    def __init__(self, timestamps: array, columns: Dict[Variable, array | List[Any]], units: Dict[Variable, Optional[str]],
+                 tolerance: Optional[timedelta] = None) -> None:
+        self.timestamps = timestamps
+        self.columns = columns
+        self.units = units
+        # Maximum age of the row at() returns, None accepts any age
+        self.tolerance = tolerance
+
+    @classmethod
+    def align(cls, series: Dict[Variable, HistorySeries], on: Variable | timedelta | None = None, tolerance: Optional[timedelta] = None,
+              ffill: bool = True, start: Optional[datetime] = None, stop: Optional[datetime] = None) -> HistoryFrame:
+        """
+        Aligns series on a common timeline. Timeline is the union of all timestamps, the timestamps
+        of variable on, or a grid of timedelta on between start and stop (first and last timestamp by default).
+
+        With ffill the last earlier value is used when a variable has no value at the timestamp,
+        but not when it is older than tolerance. Without ffill only exact matches are used.
+        Uses NumPy when it is installed.
+        """
+
+        timeline = cls._timeline(series, on, start, stop)
+        tolerance_ms = int(tolerance.total_seconds() * 1000) if tolerance is not None else None
+
+        try:
+            columns = {variable: cls._join_numpy(timeline, values, tolerance_ms, ffill) for variable, values in series.items()}
+        except ImportError:
+            columns = {variable: cls._join_python(timeline, values, tolerance_ms, ffill) for variable, values in series.items()}
+
+        return cls(timeline, columns, {variable: values.Unit for variable, values in series.items()}, tolerance)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, variable: Variable) -> HistorySeries:
+        return HistorySeries(self.units.get(variable), self.timestamps, self.columns[variable])
+
+    def __iter__(self) -> Iterator[Variable]:
+        return iter(self.columns)
+
+    def __repr__(self) -> str:
+        return f"HistoryFrame(variables={[variable.name for variable in self.columns]}, length={len(self)})"
+
+    @property
+    def variables(self) -> List[Variable]:
+        return list(self.columns)
+
+    def at(self, time: datetime) -> Dict[Variable, Any]:
+        """
+        Values at time, or the last ones before it unless they are older than the tolerance
+        of the frame. Found with binary search.
+        """
+
+        timestamp = int(time.timestamp() * 1000)
+        index = bisect_right(self.timestamps, timestamp) - 1
+
+        if index < 0 or (self.tolerance is not None and timestamp - self.timestamps[index] > self.tolerance.total_seconds() * 1000):
+            return {variable: None for variable in self.columns}
+
+        return {variable: self._optional(column[index]) for variable, column in self.columns.items()}
+
+    def between(self, start: datetime, stop: datetime) -> HistoryFrame:
+        """
+        Rows with start <= timestamp < stop. Found with binary search, columns are sliced.
+        """
+
+        first = bisect_left(self.timestamps, int(start.timestamp() * 1000))
+        last = bisect_left(self.timestamps, int(stop.timestamp() * 1000))
+
+        return HistoryFrame(self.timestamps[first:last], {variable: column[first:last] for variable, column in self.columns.items()}, self.units, self.tolerance)
+
+    def rows(self) -> Iterator[tuple]:
+        """
+        Yields (datetime, value of each variable) tuples in the order of variables.
+        """
+
+        columns = list(self.columns.values())
+
+        for index, timestamp in enumerate(self.timestamps):
+            yield (datetime.fromtimestamp(timestamp / 1000), *(self._optional(column[index]) for column in columns))
+
+    def to_pandas(self):
+        """
+        Returns pandas DataFrame indexed by UTC timestamps with a column named after each variable.
+        """
+
+        import numpy
+        import pandas
+
+        index = pandas.to_datetime(numpy.array(self.timestamps, dtype=numpy.int64), unit='ms', utc=True)
+
+        return pandas.DataFrame({variable.name: list(column) if isinstance(column, list) else numpy.array(column, dtype=numpy.float64)
+                                 for variable, column in self.columns.items()}, index=index)
+
+    @staticmethod
+    def _timeline(series: Dict[Variable, HistorySeries], on: Variable | timedelta | None, start: Optional[datetime], stop: Optional[datetime]) -> array:
+        if isinstance(on, Variable):
+            return array('q', series[on].timestamps)
+
+        if isinstance(on, timedelta):
+            first = int(start.timestamp() * 1000) if start is not None else min((values.timestamps[0] for values in series.values() if len(values)), default=0)
+            last = int(stop.timestamp() * 1000) if stop is not None else max((values.timestamps[-1] for values in series.values() if len(values)), default=0)
+            step = int(on.total_seconds() * 1000)
+
+            if step <= 0:
+                raise ValueError("Timeline interval has to be positive")
+
+            return array('q', range(first, last + 1, step))
+
+        try:
+            import numpy
+
+            timestamps = [numpy.frombuffer(values.timestamps, dtype=numpy.int64) for values in series.values() if len(values)]
+
+            return array('q', numpy.unique(numpy.concatenate(timestamps)).tobytes()) if timestamps else array('q')
+        except ImportError:
+            return array('q', sorted(set().union(*(values.timestamps for values in series.values()))))
+
+    @staticmethod
+    def _join_numpy(timeline: array, values: HistorySeries, tolerance: Optional[int], ffill: bool) -> array | List[Any]:
+        import numpy
+
+        points = len(values)
+        target = numpy.frombuffer(timeline, dtype=numpy.int64) if len(timeline) else numpy.empty(0, dtype=numpy.int64)
+        source = numpy.frombuffer(values.timestamps, dtype=numpy.int64) if points else numpy.empty(0, dtype=numpy.int64)
+
+        # Index of the last value at or before each timeline timestamp
+        index = numpy.searchsorted(source, target, side='right') - 1
+        matched = index >= 0
+        safe_index = numpy.maximum(index, 0)
+
+        if points:
+            age = target - source[safe_index]
+
+            if not ffill:
+                matched &= age == 0
+            elif tolerance is not None:
+                matched &= age <= tolerance
+
+        if isinstance(values.values, list):
+            return [values.values[position] if ok else None for position, ok in zip(safe_index.tolist(), matched.tolist())]
+
+        column = numpy.frombuffer(values.values, dtype=numpy.float64)[safe_index] if points else numpy.empty(len(target))
+        column = numpy.where(matched, column, numpy.nan)
+
+        return array('d', column.tobytes())
+
+    @staticmethod
+    def _join_python(timeline: array, values: HistorySeries, tolerance: Optional[int], ffill: bool) -> array | List[Any]:
+        numeric = isinstance(values.values, array)
+        missing = math.nan if numeric else None
+        column = []
+        source = values.timestamps
+        points = len(source)
+        position = -1
+
+        # Both timelines are sorted, so one linear sweep finds every as-of match
+        for timestamp in timeline:
+            while position + 1 < points and source[position + 1] <= timestamp:
+                position += 1
+
+            if position < 0:
+                column.append(missing)
+                continue
+
+            age = timestamp - source[position]
+
+            if (not ffill and age != 0) or (tolerance is not None and age > tolerance):
+                column.append(missing)
+            else:
+                column.append(values.values[position])
+
+        return array('d', column) if numeric else column
+
+    @staticmethod
+    def _optional(value: Any) -> Any:
+        return None if isinstance(value, float) and math.isnan(value) else value
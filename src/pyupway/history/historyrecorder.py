@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..models import VariableValue
+
+
+class HistoryRecorder:
+    """
+    SQLite store for observed current values, used as history source for MyUplink
+    which has no history API. Values are stored with their update timestamp, so polling
+    an unchanged value again does not add rows.
+
+    Loading returns [timestamp, value] points like the MyUpway History API: at most
+    resolution points, downsampled by taking the last value of evenly sized time buckets.
+    """
+
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        # Every poll is one small transaction, WAL keeps its commit cheap
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+
+        with self._lock, self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS recorder_series (
+                    heatpump_id TEXT NOT NULL,
+                    variable_id INTEGER NOT NULL,
+                    unit TEXT,
+                    PRIMARY KEY (heatpump_id, variable_id)
+                );
+                CREATE TABLE IF NOT EXISTS recorder_points (
+                    heatpump_id TEXT NOT NULL,
+                    variable_id INTEGER NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    value,
+                    PRIMARY KEY (heatpump_id, variable_id, timestamp)
+                ) WITHOUT ROWID;
+            """)
+
+    def record(self, heatpump_id, values: List[VariableValue], observed_at: Optional[datetime] = None) -> None:
+        """
+        Stores values. Values without update time are stored at observed_at, default now.
+        """
+
+        heatpump_id = str(heatpump_id)
+        observed = int((observed_at.timestamp() if observed_at else time.time()) * 1000)
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO recorder_series VALUES (?, ?, ?)",
+                {(heatpump_id, value.Id, value.Unit) for value in values})
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO recorder_points VALUES (?, ?, ?, ?)",
+                ((heatpump_id, value.Id, int(value.UpdatedAt.timestamp() * 1000) if value.UpdatedAt else observed, value.Value)
+                 for value in values))
+
+    def load(self, heatpump_id, variable_id: int, start: int, stop: int, resolution: int = 1000) -> Tuple[Optional[str], List[List[Any]]]:
+        """
+        Returns unit and sorted [timestamp, value] points between start and stop epoch seconds.
+        Value in effect at start is returned as the first point with start as timestamp.
+        """
+
+        key = (str(heatpump_id), variable_id)
+        start_ms = start * 1000
+        stop_ms = stop * 1000
+        resolution = max(1, resolution)
+
+        with self._lock:
+            unit_row = self._connection.execute(
+                "SELECT unit FROM recorder_series WHERE heatpump_id = ? AND variable_id = ?", key).fetchone()
+            previous = self._connection.execute(
+                "SELECT value FROM recorder_points WHERE heatpump_id = ? AND variable_id = ? AND timestamp < ? "
+                "ORDER BY timestamp DESC LIMIT 1", (*key, start_ms)).fetchone()
+            count = self._connection.execute(
+                "SELECT COUNT(*) FROM recorder_points WHERE heatpump_id = ? AND variable_id = ? AND timestamp >= ? AND timestamp <= ?",
+                (*key, start_ms, stop_ms)).fetchone()[0]
+
+            # Value in effect at start takes one point of the resolution
+            buckets = resolution - 1 if previous is not None else resolution
+
+            if count <= buckets:
+                rows = self._connection.execute(
+                    "SELECT timestamp, value FROM recorder_points WHERE heatpump_id = ? AND variable_id = ? "
+                    "AND timestamp >= ? AND timestamp <= ? ORDER BY timestamp",
+                    (*key, start_ms, stop_ms)).fetchall()
+            elif buckets == 0:
+                rows = []
+            else:
+                # SQLite returns value of the row holding MAX(timestamp), that is the last value of each bucket
+                rows = self._connection.execute(
+                    "SELECT MAX(timestamp), value FROM recorder_points WHERE heatpump_id = ? AND variable_id = ? "
+                    "AND timestamp >= ? AND timestamp <= ? GROUP BY (timestamp - ?) * ? / ? ORDER BY 1",
+                    (*key, start_ms, stop_ms, start_ms, buckets, stop_ms - start_ms + 1)).fetchall()
+
+        data = [list(row) for row in rows]
+
+        if previous is not None and (not data or data[0][0] > start_ms):
+            data.insert(0, [start_ms, previous[0]])
+
+        return (unit_row[0] if unit_row else None), data
+
+    def prune(self, before: datetime) -> None:
+        """
+        Deletes points older than before.
+        """
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM recorder_points WHERE timestamp < ?", (int(before.timestamp() * 1000),))
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM recorder_series")
+            self._connection.execute("DELETE FROM recorder_points")
+
+    def close(self) -> None:
+        self._connection.close()
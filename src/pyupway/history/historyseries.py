@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Any, Iterator, List, Optional, Sequence, overload
+
+from ..models import VariableHistoryValue
+from .historybuckets import HistoryBuckets
+
+
+class HistorySeries(Sequence[VariableHistoryValue]):
+    """
+    Columnar history values. Timestamps are kept as epoch milliseconds in one array and
+    values in another, VariableHistoryValue objects are only created when items are accessed.
+
+    Numeric values are stored in a float array, series containing other values fall back to a list.
+    """
+
+    Unit: str | None
+    timestamps: array
+    values: array | List[Any]
+
+    def __init__(self, unit: Optional[str], timestamps: array, values: array | List[Any]) -> None:
+        self.Unit = unit or None
+        self.timestamps = timestamps
+        self.values = values
+
+    @classmethod
+    def from_data(cls, unit: Optional[str], data: List[List[Any]]) -> HistorySeries:
+        """
+        Builds series straight from raw [timestamp, value] pairs of the History API.
+        """
+
+        timestamps = array('q', map(int, map(itemgetter(0), data)))
+
+        try:
+            values = array('d', map(itemgetter(1), data))
+        except TypeError:
+            values = list(map(itemgetter(1), data))
+
+        return cls(unit, timestamps, values)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @overload
+    def __getitem__(self, index: int) -> VariableHistoryValue: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> HistorySeries: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistorySeries(self.Unit, self.timestamps[index], self.values[index])
+
+        return VariableHistoryValue(self.values[index], self.Unit, datetime.fromtimestamp(self.timestamps[index] / 1000))
+
+    def __iter__(self) -> Iterator[VariableHistoryValue]:
+        for timestamp, value in zip(self.timestamps, self.values):
+            yield VariableHistoryValue(value, self.Unit, datetime.fromtimestamp(timestamp / 1000))
+
+    def __repr__(self) -> str:
+        return f"HistorySeries(Unit={self.Unit!r}, length={len(self)})"
+
+    def to_list(self) -> List[VariableHistoryValue]:
+        return list(self)
+
+    def aggregate(self, interval: timedelta, start: Optional[datetime] = None, stop: Optional[datetime] = None, fill: Optional[str] = None) -> HistoryBuckets:
+        """
+        Returns min, max, mean and last value of every interval long bucket between start and stop.
+        Empty buckets are left empty, or filled with fill = 'previous' or 'linear'.
+        """
+
+        return HistoryBuckets.aggregate(
+            self.Unit, self.timestamps, self.values, interval,
+            int(start.timestamp() * 1000) if start is not None else None,
+            int(stop.timestamp() * 1000) if stop is not None else None,
+            fill)
+
+    def to_numpy(self):
+        """
+        Returns (timestamps, values) as NumPy arrays. Numeric series are not copied.
+        """
+
+        import numpy
+
+        timestamps = numpy.frombuffer(self.timestamps, dtype=numpy.int64) if len(self.timestamps) else numpy.empty(0, dtype=numpy.int64)
+
+        if isinstance(self.values, array):
+            values = numpy.frombuffer(self.values, dtype=numpy.float64) if len(self.values) else numpy.empty(0, dtype=numpy.float64)
+        else:
+            values = numpy.array(self.values, dtype=object)
+
+        return timestamps, values
+
+    def to_pandas(self):
+        """
+        Returns values as pandas Series indexed by UTC timestamps.
+        """
+
+        import pandas
+
+        timestamps, values = self.to_numpy()
+
+        return pandas.Series(values, index=pandas.to_datetime(timestamps, unit='ms', utc=True), name=self.Unit)
@@ -0,0 +1,4 @@
+from .requestevent import RequestEvent
+from .decodeevent import DecodeEvent
+from .instrumentation import Instrumentation
+from .prometheuscollector import PrometheusCollector
@@ -0,0 +1,14 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+@dataclass
+class DecodeEvent:
+    """
+    Time spent on JSON parsing (ParseTime) and building the models (DecodeTime) for one response.
+    """
+
+    Service: str
+    Operation: str
+    ParseTime: float
+    DecodeTime: float
+    Values: int
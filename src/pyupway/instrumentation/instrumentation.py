@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import time
+
+from typing import Any, Awaitable, Callable, Optional
+
+from .decodeevent import DecodeEvent
+from .requestevent import RequestEvent
+
+
+class Instrumentation:
+    """
+    Receives timing events from the services. This base class does nothing,
+    subclass it and override on_request and on_decode.
+    Services skip all measuring when no instrumentation is configured.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        pass
+
+    def on_decode(self, event: DecodeEvent) -> None:
+        pass
+
+    def timed_request(self, service: str, operation: str, deviceId: Optional[str], send: Callable[[Callable[[], Any]], Any], call: Callable[[], Any], bytes_sent: int = 0) -> Any:
+        """
+        Runs send(call) and reports it with on_request. call is counted to get the number of retries,
+        bytes_sent is the size of the request body.
+        """
+
+        attempts = 0
+
+        def counted_call():
+            nonlocal attempts
+            attempts += 1
+            return call()
+
+        started = time.perf_counter()
+        response = None
+        error = None
+
+        try:
+            response = send(counted_call)
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.on_request(self._request_event(service, operation, deviceId, response, time.perf_counter() - started, attempts, error, bytes_sent))
+
+    async def timed_request_async(self, service: str, operation: str, deviceId: Optional[str], send: Callable[[Callable[[], Awaitable[Any]]], Awaitable[Any]], call: Callable[[], Awaitable[Any]], bytes_sent: int = 0) -> Any:
+        """
+        asyncio version of timed_request.
+        """
+
+        attempts = 0
+
+        async def counted_call():
+            nonlocal attempts
+            attempts += 1
+            return await call()
+
+        started = time.perf_counter()
+        response = None
+        error = None
+
+        try:
+            response = await send(counted_call)
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.on_request(self._request_event(service, operation, deviceId, response, time.perf_counter() - started, attempts, error, bytes_sent))
+
+    @staticmethod
+    def _request_event(service: str, operation: str, deviceId: Optional[str], response, duration: float, attempts: int, error: Optional[str], bytes_sent: int) -> RequestEvent:
+        return RequestEvent(
+            Service=service,
+            Operation=operation,
+            DeviceId=deviceId,
+            Status=response.status_code if response is not None else None,
+            Duration=duration,
+            BytesReceived=len(response.content or b'') if response is not None else 0,
+            Retries=max(0, attempts - 1),
+            Error=error,
+            BytesSent=bytes_sent)
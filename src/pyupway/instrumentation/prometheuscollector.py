@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+
+from typing import Dict, List, Sequence, Tuple
+
+from .decodeevent import DecodeEvent
+from .instrumentation import Instrumentation
+from .requestevent import RequestEvent
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class PrometheusCollector(Instrumentation):
+    """
+    Collects counters and latency histograms of the events in memory.
+    render() returns them in Prometheus text exposition format, serve it from any HTTP endpoint.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    _HELP = {
+        'requests_total': 'Requests by service, operation and final HTTP status',
+        'request_errors_total': 'Requests that raised an exception',
+        'request_retries_total': 'Retried request attempts',
+        'request_bytes_total': 'Request body bytes sent',
+        'response_bytes_total': 'Response body bytes received',
+        'decoded_values_total': 'Values decoded from responses',
+        'request_duration_seconds': 'Request duration including retries and rate limit waits',
+        'decode_duration_seconds': 'Time spent parsing JSON (phase="parse") and building models (phase="decode")',
+    }
+
+    namespace: str
+    buckets: Sequence[float]
+
+    def __init__(self, namespace: str = "pyupway", buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        # name -> labels -> [bucket counts..., sum, count]
+        self._histograms: Dict[str, Dict[Labels, List[float]]] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        labels = (('service', event.Service), ('operation', event.Operation))
+
+        with self._lock:
+            if event.Error is None:
+                self._inc('requests_total', labels + (('status', str(event.Status)),))
+            else:
+                self._inc('request_errors_total', labels + (('error', event.Error),))
+
+            self._inc('request_retries_total', labels, event.Retries)
+            self._inc('request_bytes_total', labels, event.BytesSent)
+            self._inc('response_bytes_total', labels, event.BytesReceived)
+            self._observe('request_duration_seconds', labels, event.Duration)
+
+    def on_decode(self, event: DecodeEvent) -> None:
+        labels = (('service', event.Service), ('operation', event.Operation))
+
+        with self._lock:
+            self._inc('decoded_values_total', labels, event.Values)
+
+            if event.ParseTime:
+                self._observe('decode_duration_seconds', labels + (('phase', 'parse'),), event.ParseTime)
+            if event.DecodeTime:
+                self._observe('decode_duration_seconds', labels + (('phase', 'decode'),), event.DecodeTime)
+
+    def render(self) -> str:
+        lines: List[str] = []
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                self._header(lines, name, 'counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{self.namespace}_{name}{self._format_labels(labels)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, 'histogram')
+                for labels, values in sorted(series.items()):
+                    cumulative = 0.0
+                    for bound, count in zip(self.buckets, values):
+                        cumulative += count
+                        lines.append(f"{self.namespace}_{name}_bucket{self._format_labels(labels + (('le', f'{bound:g}'),))} {cumulative:g}")
+                    lines.append(f"{self.namespace}_{name}_bucket{self._format_labels(labels + (('le', '+Inf'),))} {values[-1]:g}")
+                    lines.append(f"{self.namespace}_{name}_sum{self._format_labels(labels)} {values[-2]}")
+                    lines.append(f"{self.namespace}_{name}_count{self._format_labels(labels)} {values[-1]:g}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _header(self, lines: List[str], name: str, metric_type: str) -> None:
+        lines.append(f"# HELP {self.namespace}_{name} {self._HELP[name]}")
+        lines.append(f"# TYPE {self.namespace}_{name} {metric_type}")
+
+    def _inc(self, name: str, labels: Labels, amount: float = 1) -> None:
+        series = self._counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + amount
+
+    def _observe(self, name: str, labels: Labels, value: float) -> None:
+        series = self._histograms.setdefault(name, {})
+        values = series.get(labels)
+
+        if values is None:
+            values = series[labels] = [0.0] * (len(self.buckets) + 2)
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                values[index] += 1
+                break
+
+        values[-2] += value
+        values[-1] += 1
+
+    @staticmethod
+    def _format_labels(labels: Labels) -> str:
+        return "{" + ",".join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                              for key, value in labels) + "}"
@@ -0,0 +1,20 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class RequestEvent:
+    """
+    One request as seen by the caller. Duration includes retries and rate limit waits.
+    """
+
+    Service: str
+    Operation: str
+    DeviceId: Optional[str]
+    Status: Optional[int]
+    Duration: float
+    BytesReceived: int
+    Retries: int
+    Error: Optional[str]
+    # Size of the request body, form data is counted as encoded
+    BytesSent: int = 0
@@ -0,0 +1,5 @@
+from .metric import Metric
+from .timeweightedintegral import TimeWeightedIntegral
+from .rollingwindow import RollingWindow
+from .stateduration import StateDuration
+from .metricsengine import MetricsEngine
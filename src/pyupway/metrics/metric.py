@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from ..enums import Variable
+from ..models import VariableValue
+
+
+class Metric(ABC):
+    """
+    Aggregate of one variable kept up to date one observation at a time, so reading it
+    does not depend on how long the history is. Timestamps are epoch milliseconds.
+
+    snapshot returns the state as a JSON compatible dict and restore continues from it.
+    """
+
+    variable: Variable
+    last_time: Optional[int]
+
+    def __init__(self, variable: Variable) -> None:
+        self.variable = variable
+        self.last_time = None
+
+    def update(self, timestamp: int, value: VariableValue) -> bool:
+        """
+        Adds observation, returns False when it is not newer than the previous one and was skipped.
+        Repeated polls return unchanged MyUplink values with the same timestamp.
+        """
+
+        if self.last_time is not None and timestamp <= self.last_time:
+            return False
+
+        self._observe(timestamp, value)
+        self.last_time = timestamp
+
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'type': type(self).__name__, 'variable': self.variable.value, 'last_time': self.last_time, **self._state()}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        if snapshot.get('type') != type(self).__name__ or snapshot.get('variable') != self.variable.value:
+            raise ValueError(f"Snapshot of {snapshot.get('type')} {snapshot.get('variable')} does not belong to {type(self).__name__} {self.variable.value}")
+
+        self.reset()
+        self.last_time = snapshot['last_time']
+        self._restore(snapshot)
+
+    def reset(self) -> None:
+        self.last_time = None
+
+    @abstractmethod
+    def _observe(self, timestamp: int, value: VariableValue) -> None:
+        pass
+
+    @abstractmethod
+    def _state(self) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def _restore(self, snapshot: Dict[str, Any]) -> None:
+        pass
+
+    @staticmethod
+    def _number(value: VariableValue) -> Optional[float]:
+        """
+        Numeric value, MyUpway returns numbers as strings. None when the value is not a number.
+        """
+
+        if isinstance(value.Value, bool) or value.Value is None:
+            return None
+
+        try:
+            return float(value.Value)
+        except ValueError:
+            return None
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from ..enums import Variable
+from ..models import VariableValue
+from ..storage import write_json
+from .metric import Metric
+
+
+class MetricsEngine:
+    """
+    Named metrics updated from the value stream, so dashboards read running aggregates
+    instead of computing them from the stored history on every refresh.
+
+        engine = MetricsEngine({
+            'addition_energy': TimeWeightedIntegral(Variable.ADDITION_ELECTRICAL_ADDITION_POWER, unit=timedelta(hours=1)),
+            'degree_minutes': RollingWindow(Variable.MYUPWAY_DEGREE_MINUTES, window=timedelta(hours=6)),
+            'addition': StateDuration(Variable.ADDITION_STATUS),
+        })
+
+        for changes in VariablePoller(myupway, {variable: 60 for variable in engine.variables}):
+            engine.update(changes)
+
+    Values are timestamped with UpdatedAt, or the time given to update (now by default)
+    when the service does not return one. With path the state is loaded when created and
+    written by save, so the metrics continue over restarts.
+    """
+
+    _metrics: Dict[str, Metric]
+    _by_variable: Dict[Variable, List[Metric]]
+    _path: Optional[str]
+
+    def __init__(self, metrics: Dict[str, Metric], path: Optional[str] = None) -> None:
+        self._metrics = dict(metrics)
+        self._by_variable = {}
+        self._path = path
+
+        for metric in self._metrics.values():
+            self._by_variable.setdefault(metric.variable, []).append(metric)
+
+        if path is not None:
+            self.load()
+
+    def __getitem__(self, name: str) -> Metric:
+        return self._metrics[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._metrics)
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    @property
+    def variables(self) -> List[Variable]:
+        """
+        Variables the metrics need, for polling.
+        """
+
+        return list(self._by_variable)
+
+    def update(self, values: Iterable[VariableValue], time: Optional[datetime] = None) -> int:
+        """
+        Feeds values to the metrics of their variables. Returns the number of metric updates,
+        values that are not newer than the previous observation of a metric are skipped.
+        """
+
+        observed = int((time or datetime.now()).timestamp() * 1000)
+        updates = 0
+
+        for value in values:
+            metrics = self._by_variable.get(value.Enumerator)
+
+            if not metrics:
+                continue
+
+            timestamp = int(value.UpdatedAt.timestamp() * 1000) if value.UpdatedAt is not None else observed
+
+            for metric in metrics:
+                updates += metric.update(timestamp, value)
+
+        return updates
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Restores metrics found in snapshot, metrics added after it was taken start empty.
+        """
+
+        for name, metric in self._metrics.items():
+            if name in snapshot:
+                metric.restore(snapshot[name])
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def load(self) -> None:
+        try:
+            with open(self._path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (FileNotFoundError, ValueError):
+            return
+
+        self.restore(snapshot)
+
+    def save(self) -> None:
+        if self._path is None:
+            raise ValueError("MetricsEngine has no path to save to")
+
+        write_json(self._path, self.snapshot())
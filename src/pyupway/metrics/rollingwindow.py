@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import timedelta
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from ..enums import Variable
+from ..models import VariableValue
+from .metric import Metric
+
+
+class RollingWindow(Metric):
+    """
+    Count, sum, mean, minimum, maximum and change of the numeric observations within
+    window of the latest one. Minimum and maximum are kept in monotonic deques, so every
+    observation is added and dropped once and all queries take constant time.
+
+    Fed from VariablePoller, observations arrive only when the value changes.
+    """
+
+    window: timedelta
+
+    _values: Deque[Tuple[int, float]]
+    _minimum: Deque[Tuple[int, float]]
+    _maximum: Deque[Tuple[int, float]]
+    _sum: float
+
+    def __init__(self, variable: Variable, window: timedelta) -> None:
+        super().__init__(variable)
+
+        self.window = window
+        self._window_ms = window.total_seconds() * 1000
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"RollingWindow(variable={self.variable.name}, window={self.window}, count={self.count}, mean={self.mean})"
+
+    def reset(self) -> None:
+        super().reset()
+        self._values = deque()
+        self._minimum = deque()
+        self._maximum = deque()
+        self._sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / len(self._values) if self._values else None
+
+    @property
+    def minimum(self) -> Optional[float]:
+        return self._minimum[0][1] if self._minimum else None
+
+    @property
+    def maximum(self) -> Optional[float]:
+        return self._maximum[0][1] if self._maximum else None
+
+    @property
+    def change(self) -> Optional[float]:
+        """
+        Latest value minus the oldest value in the window, for example degree minute trend.
+        """
+
+        return self._values[-1][1] - self._values[0][1] if self._values else None
+
+    def _observe(self, timestamp: int, value: VariableValue) -> None:
+        number = self._number(value)
+
+        if number is not None:
+            self._add(timestamp, number)
+
+        self._expire(timestamp - self._window_ms)
+
+    def _add(self, timestamp: int, number: float) -> None:
+        self._values.append((timestamp, number))
+        self._sum += number
+
+        # Older values that are not smaller (larger) can never be the minimum (maximum) again
+        while self._minimum and self._minimum[-1][1] >= number:
+            self._minimum.pop()
+        self._minimum.append((timestamp, number))
+
+        while self._maximum and self._maximum[-1][1] <= number:
+            self._maximum.pop()
+        self._maximum.append((timestamp, number))
+
+    def _expire(self, cutoff: float) -> None:
+        values = self._values
+
+        while values and values[0][0] <= cutoff:
+            self._sum -= values.popleft()[1]
+
+        while self._minimum and self._minimum[0][0] <= cutoff:
+            self._minimum.popleft()
+
+        while self._maximum and self._maximum[0][0] <= cutoff:
+            self._maximum.popleft()
+
+        if not values:
+            # Start again from exact zero instead of accumulated rounding error
+            self._sum = 0.0
+
+    def _state(self) -> Dict[str, Any]:
+        return {'values': [[timestamp, number] for timestamp, number in self._values]}
+
+    def _restore(self, snapshot: Dict[str, Any]) -> None:
+        for timestamp, number in snapshot['values']:
+            self._add(timestamp, number)
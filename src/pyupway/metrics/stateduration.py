@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from ..enums import Variable
+from ..models import VariableValue
+from .metric import Metric
+
+
+class StateDuration(Metric):
+    """
+    Time spent in each state of a variable and how many times each state was entered.
+    State is EnumValue, or Value for variables without one, or what the state function
+    returns, for example duty cycle of the compressor:
+
+        StateDuration(Variable.ADDITION_STATUS)
+        StateDuration(Variable.CURRENT_COMPRESSOR_FREQUENCY, state=lambda value: float(value.Value) > 0)
+
+    The state function gets the VariableValue as it was polled, MyUpway returns numbers as strings.
+
+    A state lasts until the next observation with a different state. States are stored
+    in snapshots as they are, so they have to be JSON compatible.
+    """
+
+    _state_of: Callable[[VariableValue], Any]
+
+    current: Any
+    since: Optional[int]
+    _durations: Dict[Any, int]
+    _entries: Dict[Any, int]
+
+    def __init__(self, variable: Variable, state: Optional[Callable[[VariableValue], Any]] = None) -> None:
+        super().__init__(variable)
+
+        self._state_of = state or self._default_state
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"StateDuration(variable={self.variable.name}, current={self.current!r}, states={len(self._durations)})"
+
+    def reset(self) -> None:
+        super().reset()
+        self.current = None
+        # Epoch milliseconds when current state was entered
+        self.since = None
+        self._durations = {}
+        self._entries = {}
+
+    @property
+    def states(self) -> list:
+        return list(self._durations)
+
+    def duration(self, state: Any, time: Optional[datetime] = None) -> timedelta:
+        """
+        Total time in state. Ongoing current state counts up to time, or up to the latest observation.
+        """
+
+        milliseconds = self._durations.get(state, 0)
+
+        if state == self.current and self.since is not None:
+            milliseconds += self._elapsed(time)
+
+        return timedelta(milliseconds=milliseconds)
+
+    def entries(self, state: Any) -> int:
+        return self._entries.get(state, 0)
+
+    def ratio(self, state: Any, time: Optional[datetime] = None) -> Optional[float]:
+        """
+        Share of the observed time spent in state, None before any time has been observed.
+        """
+
+        total = sum(self._durations.values()) + (self._elapsed(time) if self.since is not None else 0)
+
+        if not total:
+            return None
+
+        return self.duration(state, time) / timedelta(milliseconds=total)
+
+    def _elapsed(self, time: Optional[datetime]) -> int:
+        end = int(time.timestamp() * 1000) if time is not None else self.last_time
+
+        return max(0, end - self.since) if end is not None and self.since is not None else 0
+
+    def _observe(self, timestamp: int, value: VariableValue) -> None:
+        state = self._state_of(value)
+
+        if self.since is not None and state == self.current:
+            return
+
+        if self.since is not None:
+            self._durations[self.current] = self._durations.get(self.current, 0) + timestamp - self.since
+
+        self._durations.setdefault(state, 0)
+        self._entries[state] = self._entries.get(state, 0) + 1
+        self.current = state
+        self.since = timestamp
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            'current': self.current,
+            'since': self.since,
+            'states': [[state, duration, self._entries.get(state, 0)] for state, duration in self._durations.items()],
+        }
+
+    def _restore(self, snapshot: Dict[str, Any]) -> None:
+        self.current = snapshot['current']
+        self.since = snapshot['since']
+
+        for state, duration, entries in snapshot['states']:
+            self._durations[state] = duration
+            self._entries[state] = entries
+
+    @staticmethod
+    def _default_state(value: VariableValue) -> Any:
+        return value.EnumValue if value.EnumValue is not None else value.Value
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from ..enums import Variable
+from ..models import VariableValue
+from .metric import Metric
+
+
+class TimeWeightedIntegral(Metric):
+    """
+    Running integral of a variable over time, in value * unit. Power in kW with unit of
+    one hour gives energy in kWh, temperature with unit of one minute gives degree minutes.
+
+    With method 'step' a value holds until the next observation, which suits values polled
+    only when they change. 'linear' interpolates between observations (trapezoid rule).
+    With max_gap a step value is held for at most max_gap, and linear periods longer than
+    max_gap are left out as missing data.
+    """
+
+    unit: timedelta
+    method: str
+    max_gap: Optional[timedelta]
+
+    integral: float
+    duration: int
+    _last_value: Optional[float]
+
+    def __init__(self, variable: Variable, unit: timedelta = timedelta(hours=1), method: str = 'step', max_gap: Optional[timedelta] = None) -> None:
+        if method not in ('step', 'linear'):
+            raise ValueError(f"Unknown integration method {method}")
+
+        super().__init__(variable)
+
+        self.unit = unit
+        self.method = method
+        self.max_gap = max_gap
+        self._unit_ms = unit.total_seconds() * 1000
+        self._max_gap_ms = max_gap.total_seconds() * 1000 if max_gap is not None else None
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"TimeWeightedIntegral(variable={self.variable.name}, integral={self.integral}, mean={self.mean})"
+
+    def reset(self) -> None:
+        super().reset()
+        self.integral = 0.0
+        # Milliseconds covered by the integral
+        self.duration = 0
+        self._last_value = None
+
+    @property
+    def mean(self) -> Optional[float]:
+        """
+        Time weighted average of the variable, None before two observations.
+        """
+
+        if not self.duration:
+            return None
+
+        return self.integral * self._unit_ms / self.duration
+
+    def at(self, time: datetime) -> float:
+        """
+        Integral up to time. With method 'step' the latest value is held until time,
+        otherwise the integral ends at the latest observation.
+        """
+
+        timestamp = int(time.timestamp() * 1000)
+
+        if self.method != 'step' or self._last_value is None or self.last_time is None or timestamp <= self.last_time:
+            return self.integral
+
+        return self.integral + self._last_value * self._held(timestamp - self.last_time) / self._unit_ms
+
+    def _observe(self, timestamp: int, value: VariableValue) -> None:
+        number = self._number(value)
+
+        if self._last_value is not None and self.last_time is not None:
+            elapsed = timestamp - self.last_time
+
+            # Same rule as at(), so the integral at the next observation is what at() returned before it
+            if self.method == 'step' or number is None:
+                elapsed = self._held(elapsed)
+                area = self._last_value * elapsed
+            elif self._max_gap_ms is None or elapsed <= self._max_gap_ms:
+                area = (self._last_value + number) / 2 * elapsed
+            else:
+                area = elapsed = 0
+
+            self.integral += area / self._unit_ms
+            self.duration += elapsed
+
+        # Missing value ends the period, integration continues from the next number
+        self._last_value = number
+
+    def _held(self, elapsed: int) -> float:
+        """
+        Milliseconds a step value is held for, at most max_gap.
+        """
+
+        return elapsed if self._max_gap_ms is None else min(elapsed, self._max_gap_ms)
+
+    def _state(self) -> Dict[str, Any]:
+        return {'integral': self.integral, 'duration': self.duration, 'last_value': self._last_value}
+
+    def _restore(self, snapshot: Dict[str, Any]) -> None:
+        self.integral = snapshot['integral']
+        self.duration = snapshot['duration']
+        self._last_value = snapshot['last_value']
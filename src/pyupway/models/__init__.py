@@ -1,3 +1,10 @@
 from .valuemodel import ValueModel
 from .variablehistoryvalue import VariableHistoryValue
-from .variablevalue import VariableValue
\ No newline at end of file
+from .variablevalue import VariableValue
+from .device import Device
+from .oauthtoken import OAuthToken
+from .variablemetadata import VariableMetadata
+from .compactvariablevalue import CompactVariableValue
+from .compacthistoryvalue import CompactHistoryValue
+from .parametermetadata import ParameterMetadata
+from .historybucket import HistoryBucket
@@ -0,0 +1,28 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from sys import intern
+from .variablehistoryvalue import VariableHistoryValue
+
+@dataclass(frozen=True)
+class CompactHistoryValue:
+    """
+    Immutable, slotted VariableHistoryValue with interned unit.
+    For long series HistorySeries is smaller still.
+    """
+
+    __slots__ = ('Value', 'Unit', 'Date')
+
+    Value: int | float | str | bool | None
+    Unit: str | None
+    Date: datetime
+
+    @classmethod
+    def from_value(cls, value: VariableHistoryValue) -> CompactHistoryValue:
+        return cls(value.Value, intern(value.Unit) if value.Unit else None, value.Date)
+
+    def __reduce__(self):
+        return (self.__class__, (self.Value, self.Unit, self.Date))
+
+    def to_value(self) -> VariableHistoryValue:
+        return VariableHistoryValue(self.Value, self.Unit, self.Date)
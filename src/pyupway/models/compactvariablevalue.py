@@ -0,0 +1,47 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from ..enums import Variable
+from .variablemetadata import VariableMetadata
+from .variablevalue import VariableValue
+
+@dataclass(frozen=True)
+class CompactVariableValue:
+    """
+    Immutable, slotted VariableValue for keeping many values in memory. Id, Name,
+    Enumerator and Unit are read from the shared VariableMetadata of the variable.
+    """
+
+    __slots__ = ('Metadata', 'Value', 'EnumValue', 'UpdatedAt')
+
+    Metadata: VariableMetadata
+    Value: int | float | str | bool | None
+    EnumValue: str | None
+    UpdatedAt: datetime | None
+
+    @property
+    def Id(self) -> int:
+        return self.Metadata.Id
+
+    @property
+    def Name(self) -> str:
+        return self.Metadata.Name
+
+    @property
+    def Enumerator(self) -> Variable:
+        return self.Metadata.Enumerator
+
+    @property
+    def Unit(self) -> str | None:
+        return self.Metadata.Unit
+
+    @classmethod
+    def from_value(cls, value: VariableValue) -> CompactVariableValue:
+        return cls(VariableMetadata.of(value.Id, value.Name, value.Enumerator, value.Unit), value.Value, value.EnumValue, value.UpdatedAt)
+
+    def __reduce__(self):
+        return (self.__class__, (self.Metadata, self.Value, self.EnumValue, self.UpdatedAt))
+
+    def to_value(self) -> VariableValue:
+        metadata = self.Metadata
+        return VariableValue(metadata.Id, metadata.Name, metadata.Enumerator, self.Value, metadata.Unit, self.EnumValue, self.UpdatedAt)
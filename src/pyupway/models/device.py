@@ -0,0 +1,9 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+@dataclass
+class Device:
+    Id: str
+    Name: str | None
+    SystemId: str | None
+    IsOnline: bool | None
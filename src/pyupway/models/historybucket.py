@@ -0,0 +1,12 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass
+class HistoryBucket:
+    Start: datetime
+    Count: int
+    Min: float | None
+    Max: float | None
+    Mean: float | None
+    Last: float | None
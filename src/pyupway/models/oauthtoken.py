@@ -0,0 +1,14 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+@dataclass
+class OAuthToken:
+    AccessToken: str
+    ExpiresAt: float
+
+    def is_valid(self, now: float, margin: float = 0) -> bool:
+        """
+        Returns True when token does not expire within margin seconds from now (epoch seconds).
+        """
+
+        return self.ExpiresAt - margin > now
@@ -0,0 +1,18 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict
+from ..enums import Variable
+
+@dataclass
+class ParameterMetadata:
+    """
+    Metadata of one MyUplink parameter. Enumerator is None for parameters missing from Variable.
+    """
+
+    ParameterId: str
+    Name: str | None
+    Unit: str | None
+    Category: str | None
+    EnumTexts: Dict[str, str]
+    EnumCount: int
+    Enumerator: Variable | None
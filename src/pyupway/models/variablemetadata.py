@@ -0,0 +1,34 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Tuple
+from ..enums import Variable
+
+@dataclass(frozen=True)
+class VariableMetadata:
+    """
+    Fields that are the same for every value of a variable. Use VariableMetadata.of
+    to get the shared instance instead of creating a new one per value.
+    """
+
+    __slots__ = ('Id', 'Name', 'Enumerator', 'Unit')
+
+    Id: int
+    Name: str
+    Enumerator: Variable
+    Unit: str | None
+
+    _instances: ClassVar[Dict[Tuple, VariableMetadata]] = {}
+
+    @classmethod
+    def of(cls, Id: int, Name: str, Enumerator: Variable, Unit: str | None) -> VariableMetadata:
+        key = (Id, Name, Enumerator, Unit)
+        metadata = cls._instances.get(key)
+
+        if metadata is None:
+            metadata = cls._instances.setdefault(key, cls(Id, Name, Enumerator, Unit))
+
+        return metadata
+
+    def __reduce__(self):
+        # Frozen slotted instance cannot be restored with setattr, unpickled copies are shared too
+        return (VariableMetadata.of, (self.Id, self.Name, self.Enumerator, self.Unit))
@@ -7,7 +7,7 @@ from datetime import datetime
 class VariableValue:
     Id: int
     Name: str
-    Enumerator: Variable
+    Enumerator: Variable | None
     Value: int | float | str | bool | None
     Unit: str | None
     EnumValue: str | None
@@ -0,0 +1,100 @@
+from __future__ import annotations
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+from .enums import DataService, Variable
+from .config import MyUpwayConfig
+from .models import Device, VariableValue
+from .services import MyUpwayService, MyUplinkService
+from .transport import HttpTransport, RequestsTransport
+
+
+class MyUpwayFleet:
+    """
+    Polls every device of one account with a single authenticated session.
+
+    MyUplink: devices are discovered from all systems of the account.
+    MyUpway: devices are the heat pumps listed in config heatpump_ids.
+    """
+
+    _config: MyUpwayConfig
+    _max_workers: int
+    _transport: HttpTransport
+    _owns_transport: bool
+
+    devices: List[Device]
+
+    def __init__(self, config: MyUpwayConfig, max_workers: int = 8) -> None:
+        self._config = config
+        self._max_workers = max_workers
+
+        # Keep one pooled connection per worker so concurrent polls do not open new connections
+        self._transport = self._config.transport or RequestsTransport(pool_maxsize=max_workers)
+        self._owns_transport = self._config.transport is None
+
+        # Service is created lazy, login of MyUplink would list the devices once more
+        if self._config.dataservice == DataService.MYUPWAY:
+            self._service = MyUpwayService(self._config, self._transport, lazy=True)
+        else:
+            self._service = MyUplinkService(self._config, self._transport, lazy=True)
+
+        self.login()
+
+    def login(self):
+        """
+        MyUpway: Logs in with the session cookie shared by all heat pumps.
+        MyUplink: Lists the devices of the account, the token is fetched when needed.
+        """
+
+        if self._config.dataservice == DataService.MYUPWAY:
+            self._service.login()
+
+        self.devices = self._service.get_devices()
+
+    def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False, return_exceptions: bool = False) -> Dict[str, List[VariableValue] | Exception]:
+        """
+        Returns current values of all devices keyed by device id.
+        With return_exceptions = True a failing device returns its exception instead of failing the whole poll.
+        """
+
+        results: Dict[str, List[VariableValue] | Exception] = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = {
+                device.Id: executor.submit(self._service.get_device_values, device.Id, variables, force_login)
+                for device in self.devices
+            }
+
+            for deviceId, future in futures.items():
+                try:
+                    results[deviceId] = future.result()
+                except Exception as error:
+                    if not return_exceptions:
+                        raise
+                    results[deviceId] = error
+
+        return results
+
+    def logout(self):
+        """
+        MyUpway: Logs you out from the system.
+        MyUplink: Not implemented as integration is token based API.
+        """
+
+        self._service.logout()
+
+    def close(self):
+        """
+        Closes the underlying HTTP session, and the transport unless it was given in the configuration.
+        """
+
+        self._service.close()
+
+        if self._owns_transport:
+            self._transport.close()
+
+    def __enter__(self) -> MyUpwayFleet:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
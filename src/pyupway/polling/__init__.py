@@ -0,0 +1,2 @@
+from .variablepoller import VariablePoller
+from .asyncvariablepoller import AsyncVariablePoller
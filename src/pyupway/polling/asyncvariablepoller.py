@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from typing import AsyncIterator, List, Optional
+
+from ..models import VariableValue
+from .variablepoller import VariablePollerBase
+
+
+class AsyncVariablePoller(VariablePollerBase):
+    """
+    asyncio version of VariablePoller for AsyncMyUpway.
+
+        async for changes in AsyncVariablePoller(myupway, {Variable.AVG_OUTDOOR_TEMP: 600}):
+            print(changes)
+    """
+
+    def __aiter__(self) -> AsyncIterator[List[VariableValue]]:
+        return self.poll()
+
+    async def poll(self, max_polls: Optional[int] = None) -> AsyncIterator[List[VariableValue]]:
+        """
+        Async generator yielding lists of changed values. Sleeps until next variable is due.
+        Stops after max_polls upstream requests when given.
+        """
+
+        polls = 0
+
+        while max_polls is None or polls < max_polls:
+            await asyncio.sleep(self.sleep_time())
+
+            changes = await self.poll_once()
+            polls += 1
+
+            if changes:
+                yield changes
+
+    async def poll_once(self) -> List[VariableValue]:
+        """
+        Fetches variables that are due now and returns changed values.
+        """
+
+        now = time.monotonic()
+        due = self._due_variables(now)
+
+        if not due:
+            return []
+
+        values = await self._client.get_current_values(due, self._force_login)
+
+        return self._apply(due, values, now)
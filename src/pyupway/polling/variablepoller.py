@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import time
+
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional
+
+from ..enums import Variable
+from ..models import VariableValue
+
+
+class VariablePollerBase:
+    """
+    Scheduling and change detection shared by VariablePoller and AsyncVariablePoller.
+    """
+
+    _intervals: Dict[Variable, float]
+    _next_due: Dict[Variable, float]
+    _last_values: Dict[Variable, VariableValue]
+
+    def __init__(self, client, intervals: Dict[Variable, float | timedelta], force_login: bool = False) -> None:
+        self._client = client
+        self._force_login = force_login
+        self._intervals = {
+            variable: interval.total_seconds() if isinstance(interval, timedelta) else float(interval)
+            for variable, interval in intervals.items()
+        }
+
+        if not self._intervals:
+            raise ValueError("At least one variable has to be polled")
+
+        if any(interval <= 0 for interval in self._intervals.values()):
+            raise ValueError("Polling intervals have to be positive")
+
+        self._next_due = {variable: 0.0 for variable in self._intervals}
+        self._last_values = {}
+
+    @property
+    def last_values(self) -> Dict[Variable, VariableValue]:
+        """
+        Latest observed value of each variable.
+        """
+
+        return dict(self._last_values)
+
+    @property
+    def intervals(self) -> Dict[Variable, float]:
+        """
+        Polling interval of each variable in seconds.
+        """
+
+        return dict(self._intervals)
+
+    def sleep_time(self, now: Optional[float] = None) -> float:
+        """
+        Seconds until the next variable is due, measured from time.monotonic() now.
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        return max(0.0, min(self._next_due.values()) - now)
+
+    def _due_variables(self, now: float) -> List[Variable]:
+        return [variable for variable, due in self._next_due.items() if due <= now]
+
+    def _apply(self, due: List[Variable], values: List[VariableValue], now: float) -> List[VariableValue]:
+        """
+        Reschedules polled variables and returns values that differ from the previous observation.
+        """
+
+        for variable in due:
+            self._next_due[variable] = now + self._intervals[variable]
+
+        changes = []
+
+        for value in values:
+            previous = self._last_values.get(value.Enumerator)
+
+            if previous is None or (previous.Value, previous.EnumValue, previous.Unit) != (value.Value, value.EnumValue, value.Unit):
+                changes.append(value)
+
+            self._last_values[value.Enumerator] = value
+
+        return changes
+
+
+class VariablePoller(VariablePollerBase):
+    """
+    Polls variables with individual intervals and yields only values that changed.
+    Variables that are due at the same time are fetched with one request.
+
+        poller = VariablePoller(myupway, {Variable.CURRENT_COMPRESSOR_FREQUENCY: 10, Variable.AVG_OUTDOOR_TEMP: 600})
+
+        for changes in poller:
+            print(changes)
+    """
+
+    def __iter__(self) -> Iterator[List[VariableValue]]:
+        return self.poll()
+
+    def poll(self, max_polls: Optional[int] = None) -> Iterator[List[VariableValue]]:
+        """
+        Generator yielding lists of changed values. Sleeps until next variable is due.
+        Stops after max_polls upstream requests when given.
+        """
+
+        polls = 0
+
+        while max_polls is None or polls < max_polls:
+            time.sleep(self.sleep_time())
+
+            changes = self.poll_once()
+            polls += 1
+
+            if changes:
+                yield changes
+
+    def poll_once(self) -> List[VariableValue]:
+        """
+        Fetches variables that are due now and returns changed values.
+        """
+
+        now = time.monotonic()
+        due = self._due_variables(now)
+
+        if not due:
+            return []
+
+        values = self._client.get_current_values(due, self._force_login)
+
+        return self._apply(due, values, now)
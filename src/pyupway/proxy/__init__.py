@@ -0,0 +1,2 @@
+from .myupwayproxy import MyUpwayProxy
+from .proxyclient import ProxyClient
@@ -0,0 +1,53 @@
+"""
+Runs MyUpwayProxy as a daemon. Credentials are read from environment variables
+PYUPWAY_USERNAME and PYUPWAY_PASSWORD (MyUpway) or PYUPWAY_CLIENT_ID and
+PYUPWAY_CLIENT_SECRET (MyUplink), so they do not show in the process list.
+
+    python -m pyupway.proxy --heatpump-id 123456 --interval 60
+    python -m pyupway.proxy --dataservice myuplink --unix-socket /run/pyupway.sock
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+from .. import MyUpway
+from ..config import MyUpwayConfig
+from ..enums import DataService
+from ..history import HistoryCache
+from .myupwayproxy import MyUpwayProxy
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m pyupway.proxy', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dataservice', choices=['myupway', 'myuplink'], default='myupway')
+    parser.add_argument('--heatpump-id', type=int, help='MyUpway heat pump id')
+    parser.add_argument('--interval', type=float, default=60, help='seconds between polls, default 60')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', help='serve on this Unix socket instead of TCP')
+    parser.add_argument('--history-cache', help='SQLite file caching history for the consumers')
+    args = parser.parse_args(argv)
+
+    config = MyUpwayConfig(
+        dataservice=DataService.MYUPWAY if args.dataservice == 'myupway' else DataService.MYUPLINK,
+        username=os.environ.get('PYUPWAY_USERNAME'),
+        password=os.environ.get('PYUPWAY_PASSWORD'),
+        heatpump_id=args.heatpump_id,
+        client_id=os.environ.get('PYUPWAY_CLIENT_ID'),
+        client_secret=os.environ.get('PYUPWAY_CLIENT_SECRET'),
+        history_cache=HistoryCache(args.history_cache) if args.history_cache else None)
+
+    proxy = MyUpwayProxy(MyUpway(config, lazy=True), interval=args.interval, host=args.host, port=args.port, unix_socket=args.unix_socket)
+
+    # Port is known only after binding, --port 0 picks a free one
+    proxy.start()
+    print(f"Serving on {args.unix_socket or proxy.url}")
+    proxy.serve_forever()
+
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
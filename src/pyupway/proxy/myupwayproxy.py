@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from ..enums import Variable
+from ..models import VariableValue
+from ..polling import VariablePoller
+from .serialization import encode_values
+
+
+class MyUpwayProxy:
+    """
+    Local daemon sharing one client between many consumers. Variables are polled once with
+    the intervals given, consumers read the latest values, history and push updates over
+    localhost HTTP or a Unix socket, so upstream load does not grow with the consumers.
+
+        proxy = MyUpwayProxy(MyUpway(config), interval=60)
+        proxy.serve_forever()
+
+    Endpoints:
+        GET /values?variables=40067,40071  latest polled values
+        GET /history?variable=40067&start=<epoch s>&stop=<epoch s>&resolution=1000
+        GET /status                        device state and poll statistics
+        GET /events                        Server-Sent Events, current values then changes
+
+    History is requested through the client, give history_cache in its configuration
+    so consumers asking for the same range are served from the cache.
+    """
+
+    # Seconds between SSE keepalive comments, keeps idle connections open through proxies
+    _KEEPALIVE = 15
+    # Pending SSE messages per subscriber, slower subscribers are disconnected
+    _SUBSCRIBER_QUEUE_SIZE = 100
+
+    _client: object
+    _poller: VariablePoller
+    _retry_interval: float
+    _values: Dict[Variable, VariableValue]
+    _subscribers: List[queue.Queue]
+    _subscribers_lock: threading.Lock
+    _stopped: threading.Event
+    _server: Optional[socketserver.BaseServer]
+    _threads: List[threading.Thread]
+
+    host: str
+    port: int
+    unix_socket: Optional[str]
+    polls: int
+    last_poll: Optional[float]
+    last_error: Optional[str]
+
+    def __init__(self, client, intervals: Dict[Variable, float | timedelta] | None = None, interval: float | timedelta = 60,
+                 host: str = '127.0.0.1', port: int = 8765, unix_socket: Optional[str] = None) -> None:
+        self._client = client
+        # Without explicit intervals every variable is polled with the same interval
+        self._poller = VariablePoller(client, intervals or {variable: interval for variable in Variable})
+        self._retry_interval = min(self._poller.intervals.values())
+        self._values = {}
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server = None
+        self._threads = []
+
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.polls = 0
+        self.last_poll = None
+        self.last_error = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> MyUpwayProxy:
+        """
+        Starts polling and serving in background threads.
+        """
+
+        # TCP_NODELAY is not available on Unix sockets
+        handler = type('ProxyHandler', (_ProxyHandler,), {'proxy': self, 'disable_nagle_algorithm': self.unix_socket is None})
+
+        if self.unix_socket is not None:
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            self._server = _UnixHTTPServer(self.unix_socket, handler)
+        else:
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+            # Port 0 binds a free port
+            self.port = self._server.server_address[1]
+
+        self._stopped.clear()
+        self._threads = [
+            threading.Thread(target=self._poll_loop, name='pyupway-proxy-poll', daemon=True),
+            threading.Thread(target=self._server.serve_forever, name='pyupway-proxy-http', daemon=True),
+        ]
+
+        for thread in self._threads:
+            thread.start()
+
+        return self
+
+    def serve_forever(self) -> None:
+        """
+        Starts the proxy, unless it was started already, and blocks until stop() is called
+        or the process is interrupted.
+        """
+
+        if self._server is None:
+            self.start()
+
+        try:
+            self._stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        with self._subscribers_lock:
+            for subscriber in self._subscribers:
+                self._close_subscriber(subscriber)
+            self._subscribers.clear()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+            if self.unix_socket is not None and os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=5)
+
+    def __enter__(self) -> MyUpwayProxy:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def current_values(self, variables: List[Variable] | None = None) -> List[VariableValue]:
+        values = self._values
+
+        if not variables:
+            return list(values.values())
+
+        return [values[variable] for variable in variables if variable in values]
+
+    def status(self) -> dict:
+        return {
+            'device_id': getattr(self._client, 'deviceId', None),
+            'is_online': getattr(self._client, 'isOnline', None),
+            'polls': self.polls,
+            'last_poll': self.last_poll,
+            'last_error': self.last_error,
+            'subscribers': len(self._subscribers),
+        }
+
+    def history(self, variable: Variable, start: int, stop: int, resolution: int) -> dict:
+        series = self._client.get_history_series(variable, datetime.fromtimestamp(start), datetime.fromtimestamp(stop), resolution)
+
+        return {'unit': series.Unit, 'data': [[timestamp, value] for timestamp, value in zip(series.timestamps, series.values)]}
+
+    def subscribe(self) -> queue.Queue:
+        """
+        Returns queue receiving JSON encoded changes, None when the subscription ends.
+        """
+
+        subscriber: queue.Queue = queue.Queue(self._SUBSCRIBER_QUEUE_SIZE)
+
+        with self._subscribers_lock:
+            self._subscribers.append(subscriber)
+
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._subscribers_lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def _poll_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                changes = self._poller.poll_once()
+            except Exception as error:
+                # Keep serving the last values, failed variables stay due and are retried
+                self.last_error = f"{type(error).__name__}: {error}"
+                self._stopped.wait(self._retry_interval)
+                continue
+
+            self.polls += 1
+            self.last_poll = time.time()
+            self.last_error = None
+            self._values = self._poller.last_values
+
+            if changes:
+                self._publish(json.dumps(encode_values(changes)))
+
+            self._stopped.wait(self._poller.sleep_time())
+
+    def _publish(self, message: str) -> None:
+        with self._subscribers_lock:
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    self._subscribers.remove(subscriber)
+                    self._close_subscriber(subscriber)
+
+    @staticmethod
+    def _close_subscriber(subscriber: queue.Queue) -> None:
+        # Drop pending messages so the end marker fits in
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+
+        subscriber.put_nowait(None)
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects (host, port) client address
+        return request, ('local', 0)
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    proxy: MyUpwayProxy
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        try:
+            if url.path == '/values':
+                variables = [Variable(int(variable)) for variable in query.get('variables', [''])[0].split(',') if variable]
+                self._send_json(200, encode_values(self.proxy.current_values(variables)))
+            elif url.path == '/history':
+                self._send_json(200, self.proxy.history(
+                    Variable(int(query['variable'][0])), int(query['start'][0]), int(query['stop'][0]),
+                    int(query.get('resolution', ['1000'])[0])))
+            elif url.path == '/status':
+                self._send_json(200, self.proxy.status())
+            elif url.path == '/events':
+                self._stream_events()
+            else:
+                self._send_json(404, {'error': 'Not found'})
+        except (KeyError, ValueError) as error:
+            self._send_json(400, {'error': f"Invalid request: {error}"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as error:
+            self._send_json(502, {'error': f"{type(error).__name__}: {error}"})
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self) -> None:
+        subscriber = self.proxy.subscribe()
+
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+
+            # New subscriber gets the current values first, then only changes
+            self._write_event(json.dumps(encode_values(self.proxy.current_values())))
+
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.proxy._KEEPALIVE)
+                except queue.Empty:
+                    self.wfile.write(b': keepalive\n\n')
+                    self.wfile.flush()
+                    continue
+
+                if message is None:
+                    return
+
+                self._write_event(message)
+        finally:
+            self.proxy.unsubscribe(subscriber)
+
+    def _write_event(self, data: str) -> None:
+        self.wfile.write(b'event: values\ndata: ' + data.encode() + b'\n\n')
+        self.wfile.flush()
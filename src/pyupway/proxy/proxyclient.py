@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import threading
+
+from datetime import datetime
+from typing import Any, Iterator, List, Optional
+from urllib.parse import urlencode, urlparse
+
+from ..enums import Variable
+from ..exceptions import ProxyError
+from ..history import HistorySeries
+from ..models import VariableHistoryValue, VariableValue
+from .serialization import decode_values
+
+
+class ProxyClient:
+    """
+    Reads values from MyUpwayProxy with the same methods as MyUpway, so a consumer can
+    switch to the shared proxy without other changes.
+
+        client = ProxyClient('http://127.0.0.1:8765')
+        client = ProxyClient(unix_socket='/run/pyupway.sock')
+    """
+
+    _host: str
+    _port: int
+    _unix_socket: Optional[str]
+    _timeout: float
+    _local: threading.local
+
+    def __init__(self, url: str = 'http://127.0.0.1:8765', unix_socket: Optional[str] = None, timeout: float = 30) -> None:
+        parsed = urlparse(url)
+
+        self._host = parsed.hostname or '127.0.0.1'
+        self._port = parsed.port or 80
+        self._unix_socket = unix_socket
+        self._timeout = timeout
+        # http.client connections are not thread safe, keep one per thread
+        self._local = threading.local()
+
+    @property
+    def deviceId(self) -> Optional[str]:
+        return self._get('/status')['device_id']
+
+    @property
+    def isOnline(self) -> bool:
+        return bool(self._get('/status')['is_online'])
+
+    def get_status(self) -> bool:
+        return self.isOnline
+
+    def get_proxy_status(self) -> dict:
+        """
+        Device state and poll statistics of the proxy.
+        """
+
+        return self._get('/status')
+
+    def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
+        """
+        Latest values polled by the proxy. Variables the proxy does not poll are left out.
+        """
+
+        path = '/values'
+
+        if variables:
+            path += '?' + urlencode({'variables': ','.join(str(variable.value) for variable in variables)})
+
+        return decode_values(self._get(path))
+
+    def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
+        return self.get_history_series(variable, startDate, stopDate, resolution).to_list()
+
+    def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        response_data = self._get('/history?' + urlencode({
+            'variable': variable.value,
+            'start': int(startDate.timestamp()),
+            'stop': int(stopDate.timestamp()),
+            'resolution': resolution,
+        }))
+
+        return HistorySeries.from_data(response_data['unit'], response_data['data'])
+
+    def subscribe(self) -> Iterator[List[VariableValue]]:
+        """
+        Generator yielding current values first and then lists of changed values pushed by the proxy.
+        """
+
+        connection = self._connect(timeout=None)
+
+        try:
+            connection.request('GET', '/events', headers={'Accept': 'text/event-stream'})
+            response = connection.getresponse()
+
+            if response.status != 200:
+                raise ProxyError(f"Proxy responded with status code {response.status}")
+
+            data: List[str] = []
+
+            for line in response:
+                line = line.decode().rstrip('\r\n')
+
+                if line.startswith('data:'):
+                    data.append(line[5:].lstrip())
+                elif not line and data:
+                    yield decode_values(json.loads('\n'.join(data)))
+                    data = []
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _get(self, path: str) -> Any:
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+
+            if connection is None:
+                connection = self._local.connection = self._connect(self._timeout)
+
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # Proxy closed the idle keep-alive connection, reconnect once
+                connection.close()
+                self._local.connection = None
+
+                if attempt:
+                    raise
+
+        if response.status != 200:
+            try:
+                message = json.loads(body).get('error')
+            except ValueError:
+                message = None
+
+            raise ProxyError(f"Proxy responded with status code {response.status}: {message}")
+
+        return json.loads(body)
+
+    def _connect(self, timeout: Optional[float]) -> http.client.HTTPConnection:
+        if self._unix_socket is not None:
+            return _UnixHTTPConnection(self._unix_socket, timeout)
+
+        return http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float]) -> None:
+        super().__init__('localhost', timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..enums import Variable
+from ..models import VariableValue
+
+
+def encode_values(values: List[VariableValue]) -> List[Dict[str, Any]]:
+    """
+    VariableValue objects as JSON compatible dicts, Enumerator is given by Id.
+    """
+
+    return [{
+        'id': value.Id,
+        'name': value.Name,
+        'value': value.Value,
+        'unit': value.Unit,
+        'enum_value': value.EnumValue,
+        'updated_at': value.UpdatedAt.isoformat() if value.UpdatedAt is not None else None,
+    } for value in values]
+
+
+def decode_values(data: List[Dict[str, Any]]) -> List[VariableValue]:
+    return [VariableValue(
+        Id=item['id'],
+        Name=item['name'],
+        Enumerator=_variable(item['id']),
+        Value=item['value'],
+        Unit=item['unit'],
+        EnumValue=item['enum_value'],
+        UpdatedAt=datetime.fromisoformat(item['updated_at']) if item['updated_at'] else None,
+    ) for item in data]
+
+
+def _variable(variable_id: int) -> Optional[Variable]:
+    try:
+        return Variable(variable_id)
+    except ValueError:
+        return None
@@ -1 +1,4 @@
-from .myupwayresponses import ValueResponseModel, HistoryResponseModel
\ No newline at end of file
+from .myupwayresponses import ValueResponseModel, HistoryResponseModel
+from .myupwaydecoder import MyUpwayDecoder
+from .myuplinkdecoder import MyUplinkDecoder
+from .jsonbackend import loads
@@ -0,0 +1,11 @@
+"""
+JSON decoding used for API responses. orjson is used when installed (pip install pyupway[fast]).
+Both backends raise ValueError on invalid content.
+"""
+
+try:
+    from orjson import loads
+except ImportError:  # pragma: no cover - optional dependency
+    from json import loads
+
+__all__ = ['loads']
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import logging
+
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from ..models import VariableHistoryValue, VariableValue
+from ..cache import ParameterCatalog
+
+logger = logging.getLogger(__name__)
+
+
+class MyUplinkDecoder:
+    """
+    Turns MyUplink /points responses into value models.
+    Shared by the blocking and the asyncio services.
+    """
+
+    _catalog: ParameterCatalog
+
+    def __init__(self, catalog: Optional[ParameterCatalog] = None) -> None:
+        self._catalog = catalog if catalog is not None else ParameterCatalog()
+
+    def decode_history_data(self, unit: Optional[str], data: List[List[Any]]) -> List[VariableHistoryValue]:
+        """
+        Decodes recorded [timestamp, value] pairs to list of VariableHistoryValue.
+        """
+
+        history_unit = unit or None
+        fromtimestamp = datetime.fromtimestamp
+
+        return [VariableHistoryValue(value[1], history_unit, fromtimestamp(value[0]/1000)) for value in data]
+
+    def decode_current_values(self, response_data: list, deviceId: str = "") -> List[VariableValue]:
+        """
+        Decodes /v2/devices/{id}/points response to list of VariableValue.
+        Parameter metadata is taken from the catalog, it is parsed only for new or changed parameters.
+        """
+
+        results: List[VariableValue] = []
+        seen = set()
+        fromisoformat = datetime.fromisoformat
+        resolve = self._catalog.resolve
+        include_unknown = self._catalog.include_unknown
+        # Points of one response mostly share timestamps, keep one object of each
+        timestamps: Dict[str, datetime] = {}
+
+        for result in response_data:
+            metadata, changed = resolve(deviceId, result)
+            variableEnum = metadata.Enumerator
+
+            if variableEnum is None:
+                if changed:
+                    logger.warning("Missing Variable enum. Contact the maintainer (https://github.com/lemanjo/pyupway) to add it to the code with these details: %s", result)
+                if not include_unknown:
+                    continue
+
+            parameter_id = metadata.ParameterId
+
+            if parameter_id in seen:
+                continue
+            seen.add(parameter_id)
+
+            raw_value = result["value"]
+            # JSON does not distinguish between int and float, so python always outputs float. But enum
+            # interpretation needs to be able to access the value as an int if it is one.
+            value = int(raw_value) if isinstance(raw_value, float) and raw_value.is_integer() else raw_value
+            str_value = str(value)
+            timestamp = result["timestamp"]
+            updated_at = timestamps.get(timestamp)
+
+            if updated_at is None:
+                updated_at = timestamps[timestamp] = fromisoformat(timestamp)
+
+            results.append(VariableValue(
+                Id=variableEnum.value if variableEnum is not None else int(parameter_id),
+                Name=variableEnum.name if variableEnum is not None else metadata.Name,
+                Enumerator=variableEnum,
+                Value=raw_value,
+                Unit=metadata.Unit,
+                EnumValue=metadata.EnumTexts.get(str_value, str_value),
+                UpdatedAt=updated_at
+            ))
+
+        self._catalog.save()
+
+        return results
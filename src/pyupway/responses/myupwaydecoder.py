@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import re
+
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+
+from ..enums import Variable
+from ..models import VariableHistoryValue, VariableValue
+from .myupwayresponses import HistoryResponseModel
+
+TIME_REPRESENTATION_FORMATS = [
+    "%m/%d/%Y %H:%M:%S",
+    "%Y. %m. %d. %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%d-%m-%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H.%M.%S"
+]
+
+# Regular expression pattern to match numeric value and unit
+VALUE_PATTERN = re.compile(r'^(-?[\d]+(?:[.,]\d{1,})?)(\D*)$')
+
+VARIABLES_BY_ID = {variable.value: variable for variable in Variable}
+
+
+class MyUpwayDecoder:
+    """
+    Turns MyUpway PrivateAPI responses into value models.
+    Shared by the blocking and the asyncio services.
+    """
+
+    _time_format: str
+
+    def __init__(self) -> None:
+        # Server keeps using the same format, so the one that worked last time is tried first
+        self._time_format = TIME_REPRESENTATION_FORMATS[0]
+
+    def decode_current_values(self, response_data: dict) -> Tuple[bool, List[VariableValue]]:
+        """
+        Decodes /PrivateAPI/Values response. Returns online state and list of VariableValue.
+        """
+
+        response_data['Date'] = self.decode_date(response_data['Date'])
+
+        match_value = VALUE_PATTERN.match
+        results = []
+
+        for value in response_data['Values']:
+            id = value['VariableId']
+            enumerator = VARIABLES_BY_ID.get(id) or Variable(id)
+            current_value = value['CurrentValue']
+
+            match = match_value(current_value)
+            if match:
+                current_value, unit = match.groups()
+                if unit == "":
+                    unit = None
+
+            else:
+                # If no match, consider the entire value as the value itself
+                unit = None
+
+            results.append(VariableValue(
+                Id=id,
+                Name=enumerator.name,
+                Enumerator=enumerator,
+                Value=current_value,
+                Unit=unit,
+                EnumValue=None,
+                UpdatedAt=None
+            ))
+
+        return not response_data['IsOffline'], results
+
+    def decode_date(self, value: str) -> datetime | str:
+        """
+        Parses date of the values response. Returns the original string if no format matches.
+        """
+
+        try:
+            return datetime.strptime(value, self._time_format)
+        except (TypeError, ValueError):
+            pass
+
+        for timeformat in TIME_REPRESENTATION_FORMATS:
+            try:
+                date = datetime.strptime(value, timeformat)
+            except (TypeError, ValueError):
+                continue
+
+            self._time_format = timeformat
+            return date
+
+        return value
+
+    def decode_history_values(self, response_data: dict) -> List[VariableHistoryValue]:
+        """
+        Decodes /PrivateAPI/History response to list of VariableHistoryValue.
+        """
+
+        history_response = HistoryResponseModel(**response_data)
+
+        return self.decode_history_data(history_response.unit, history_response.data)
+
+    def decode_history_data(self, unit: Optional[str], data: List[List[Any]]) -> List[VariableHistoryValue]:
+        """
+        Decodes raw [timestamp, value] pairs to list of VariableHistoryValue.
+        """
+
+        history_unit = unit or None
+        fromtimestamp = datetime.fromtimestamp
+
+        return [VariableHistoryValue(value[1], history_unit, fromtimestamp(value[0]/1000)) for value in data]
@@ -1,2 +1,4 @@
 from .myuplinkservice import MyUplinkService
-from .myupwayservice import MyUpwayService
\ No newline at end of file
+from .myupwayservice import MyUpwayService
+from .asyncmyuplinkservice import AsyncMyUplinkService
+from .asyncmyupwayservice import AsyncMyUpwayService
@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from ..config import MyUpwayConfig
+from ..exceptions import ConfigurationError, LoginErr, NotLoggedIn, ResponseError
+from ..enums import Variable
+from ..models import Device, OAuthToken, VariableValue, VariableHistoryValue
+from ..responses import MyUplinkDecoder, loads
+from ..history import HistorySeries, HistoryBuckets, bucket_resolution
+from ..transport import AiohttpTransport, BufferedResponse, split_batches, fetch_batches_async
+from .asyncservicebase import AsyncServiceBase
+
+
+class AsyncMyUplinkService(AsyncServiceBase):
+    """
+    asyncio version of MyUplinkService. Authorization is sent per request, so the
+    connection pool (aiohttp connector) can be shared freely between instances.
+    """
+
+    _SERVICE = 'myuplink'
+    _BASE_URL = 'https://api.myuplink.com'
+    _ITEMS_PER_PAGE = 100
+    # Seconds before expiry when token is refreshed
+    _TOKEN_REFRESH_MARGIN = 60
+    _DEFAULT_TOKEN_LIFETIME = 3600
+    # Parameters per /points request when a long variable list is requested
+    _VALUES_BATCH_SIZE = 32
+
+    _config: MyUpwayConfig
+    _transport: AiohttpTransport
+    _owns_transport: bool
+    _token: Optional[OAuthToken]
+    _token_lock: Optional[asyncio.Lock]
+    _decoder: MyUplinkDecoder
+    _login_pending: bool
+    _login_lock: Optional[asyncio.Lock]
+
+    deviceId: Optional[str]
+    isOnline: bool
+
+    def __init__(self, config: MyUpwayConfig, connector: Optional[aiohttp.BaseConnector] = None, lazy: bool = False) -> None:
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for asyncio support. Install it with: pip install pyupway[async]")
+
+        self._config = config
+
+        if self._config.base_url:
+            self._BASE_URL = self._config.base_url
+
+        # CurrentValueCache makes waiting callers block the thread, which would stop the event loop
+        if self._config.value_cache is not None:
+            raise ConfigurationError("value_cache is not supported by AsyncMyUpway")
+
+        if connector is not None:
+            self._transport = AiohttpTransport(connector=connector)
+        else:
+            self._transport = self._config.transport or AiohttpTransport()
+
+        if not isinstance(self._transport, AiohttpTransport):
+            raise ConfigurationError("AsyncMyUpway needs AiohttpTransport, HttpTransport is for MyUpway")
+
+        # Transport created here is closed with the service, shared transport and connector are left open
+        self._owns_transport = connector is None and self._config.transport is None
+        self._client_session = None
+        self._decoder = MyUplinkDecoder(self._config.parameter_catalog)
+        self._token = None
+        self._token_lock = None
+        # Lazy service logs in on first request, otherwise login() has to be called
+        self._login_pending = lazy
+        self._login_lock = None
+
+        self.deviceId = None
+        self.isOnline = False
+
+    async def login(self):
+        await self._get_token(self._token)
+
+        # First device of the account, later pages are not requested
+        async for device in self._iter_devices():
+            break
+        else:
+            raise LoginErr("No devices found for the MyUplink account")
+
+        deviceId = device.Id
+        isOnline = device.IsOnline
+
+        # Set only after parsing, so a failing login leaves the previous device in place
+        self.deviceId = deviceId
+        self.isOnline = isOnline
+
+        if isOnline:
+            self._config.request_policy.mark_online(deviceId)
+        else:
+            self._config.request_policy.mark_offline(deviceId)
+
+        self._login_pending = False
+
+    async def get_status(self) -> bool:
+        """
+        Returns whether the device is connected. Requests only the device details, not the values.
+        """
+
+        await self._ensure_logged_in()
+        await self._ensure_token()
+
+        url = self._BASE_URL + '/v2/devices/' + self.deviceId
+
+        response = await self._authorized_request('status', 'GET', url, self.deviceId, breaker=False)
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to get device status. API responded with status code {response.status_code}")
+
+        isOnline = loads(response.content).get('connectionState') == "Connected"
+        self.isOnline = isOnline
+
+        if isOnline:
+            self._config.request_policy.mark_online(self.deviceId)
+        else:
+            self._config.request_policy.mark_offline(self.deviceId)
+
+        return isOnline
+
+    async def get_devices(self) -> List[Device]:
+        """
+        Returns all devices of all systems available for the account.
+        """
+
+        await self._ensure_token()
+
+        return [device async for device in self._iter_devices()]
+
+    async def _iter_devices(self) -> AsyncIterator[Device]:
+        """
+        Yields the devices of all systems, the next page is requested when the previous one is used up.
+        """
+
+        page = 1
+
+        while True:
+            response = await self._authorized_request('devices', 'GET', self._BASE_URL + '/v2/systems/me', params={'page': page, 'itemsPerPage': self._ITEMS_PER_PAGE})
+
+            if response.status_code != 200:
+                raise Exception(f"Failed to get systems. API responded with status code {response.status_code}")
+
+            response_data = loads(response.content)
+            systems = response_data.get('systems', [])
+
+            for system in systems:
+                for device_data in system.get('devices', []):
+                    device = Device(
+                        Id=device_data['id'],
+                        Name=device_data.get('product', {}).get('name'),
+                        SystemId=system.get('systemId'),
+                        IsOnline=device_data.get('connectionState') == "Connected"
+                    )
+
+                    if not device.IsOnline:
+                        self._config.request_policy.mark_offline(device.Id)
+
+                    yield device
+
+            if not systems or page * self._ITEMS_PER_PAGE >= response_data.get('numItems', 0):
+                return
+
+            page += 1
+
+    async def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
+        """
+        Returns current values for requested variables provided as list of VariableValue.
+        If variables are not specified, function returns all variables.
+        Long variable lists are fetched in concurrent batches, variables rejected by the server are left out.
+        When another batch fails, PartialResultError carrying the values of the other batches is raised.
+        """
+
+        await self._ensure_logged_in()
+        await self._ensure_token()
+
+        if variables:
+            batches = split_batches(variables, self._config.values_batch_size or self._VALUES_BATCH_SIZE)
+            results = await fetch_batches_async(self._fetch_points, batches, self._config.values_max_workers, self._is_rejected)
+        else:
+            results = await self._fetch_points(None)
+
+        if self._config.history_recorder is not None:
+            self._config.history_recorder.record(self.deviceId, results)
+
+        return results
+
+    async def _fetch_points(self, variables: List[Variable] | None) -> List[VariableValue]:
+        params = {}
+
+        if variables:
+            params = {
+                "parameters": ','.join(str(variable.value) for variable in variables)
+            }
+
+        url = self._BASE_URL + '/v2/devices/' + self.deviceId + '/points'
+
+        cache = self._config.conditional_cache
+        key = (self.deviceId, tuple(variable.value for variable in variables) if variables else None)
+        conditional_headers = cache.request_headers(key) if cache is not None else {}
+
+        response = await self._authorized_request('values', 'GET', url, self.deviceId, params=params, headers=conditional_headers)
+
+        if cache is not None:
+            cached = cache.lookup_response(key, response.status_code, response.content)
+
+            if cached is not None:
+                return list(cached)
+
+        if response.status_code != 200:
+            raise ResponseError(f"Failed to get values. API responded with status code {response.status_code}", response.status_code)
+
+        parse_started = time.perf_counter()
+        response_data = loads(response.content)
+
+        # Points carry their values and server timestamps, so equal points decode to equal values
+        if cache is not None:
+            cached = cache.lookup_fingerprint(key, response_data)
+
+            if cached is not None:
+                cache.update(key, response.headers, response.content)
+                return list(cached)
+
+        decode_started = time.perf_counter()
+        results = self._decoder.decode_current_values(response_data, self.deviceId)
+        self._report_decode('values', decode_started - parse_started, time.perf_counter() - decode_started, len(results))
+
+        if cache is not None:
+            cache.store(key, response.headers, response.content, response_data, results)
+
+        return list(results)
+
+    async def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
+        """
+        API has no history. Returns values recorded by config history_recorder, or empty list without recorder.
+        """
+
+        return self._decoder.decode_history_data(*self._load_history(variable, startDate, stopDate, resolution))
+
+    async def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        """
+        Same as get_history_values, but returns columnar HistorySeries.
+        """
+
+        return HistorySeries.from_data(*self._load_history(variable, startDate, stopDate, resolution))
+
+    async def get_history_buckets(self, variable: Variable, startDate: datetime, stopDate: datetime, interval: timedelta, fill: Optional[str] = None, points_per_bucket: int = 4, force_login: bool = False) -> HistoryBuckets:
+        """
+        Recorded history aggregated to interval long buckets.
+        """
+
+        resolution = bucket_resolution(int(startDate.timestamp()), int(stopDate.timestamp()), int(interval.total_seconds()), points_per_bucket)
+
+        return (await self.get_history_series(variable, startDate, stopDate, resolution)).aggregate(interval, startDate, stopDate, fill)
+
+    async def get_bulk_history_values(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, List[VariableHistoryValue]]:
+        """
+        Recorded history of several variables. Chunking options are ignored as values are read locally.
+        """
+
+        return {variable: await self.get_history_values(variable, startDate, stopDate, resolution) for variable in variables}
+
+    async def get_bulk_history_series(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, HistorySeries]:
+        """
+        Same as get_bulk_history_values, but returns columnar HistorySeries per variable.
+        """
+
+        return {variable: await self.get_history_series(variable, startDate, stopDate, resolution) for variable in variables}
+
+    async def logout(self):
+        """ No implementation """
+        pass
+
+    async def close(self) -> None:
+        """
+        Closes the HTTP session. Shared transport and connector are left open.
+        """
+
+        await self._close_session()
+
+        if self._owns_transport:
+            await self._transport.close()
+
+    async def _get_token(self, current: Optional[OAuthToken], rejected: bool = False):
+        """
+        Replaces current, the token the caller used, like MyUplinkService._get_token.
+        Concurrent tasks share one token request.
+        """
+
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+
+        async with self._token_lock:
+            if self._token is not current:
+                return
+
+            store = self._config.token_store
+
+            if store is None:
+                self._token = await self._fetch_token()
+                return
+
+            # Store lock blocks the thread, so it is held around load and save but never across await
+            with store.lock():
+                token = store.load(self._config.client_id)
+
+            if token is None or not token.is_valid(time.time(), self._TOKEN_REFRESH_MARGIN) or (rejected and current is not None and token.AccessToken == current.AccessToken):
+                token = await self._fetch_token()
+
+                with store.lock():
+                    store.save(self._config.client_id, token)
+
+            self._token = token
+
+    async def _fetch_token(self) -> OAuthToken:
+        token_params = {
+            'grant_type': 'client_credentials',
+            'client_id': self._config.client_id,
+            'client_secret': self._config.client_secret,
+        }
+
+        response = await self._request('token', 'POST', self._BASE_URL + '/oauth/token', data=token_params)
+
+        if response.status_code != 200:
+            raise LoginErr("Cannot fetch MyUplink token")
+
+        token_data = loads(response.content)
+
+        return OAuthToken(
+            AccessToken=token_data['access_token'],
+            ExpiresAt=time.time() + token_data.get('expires_in', self._DEFAULT_TOKEN_LIFETIME))
+
+    def _load_history(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int) -> Tuple[Optional[str], List[List[Any]]]:
+        recorder = self._config.history_recorder
+
+        if recorder is None or not self.deviceId:
+            return None, []
+
+        return recorder.load(self.deviceId, variable.value, int(startDate.timestamp()), int(stopDate.timestamp()), resolution)
+
+    async def _ensure_logged_in(self):
+        if self._login_pending:
+            if self._login_lock is None:
+                self._login_lock = asyncio.Lock()
+
+            async with self._login_lock:
+                if self._login_pending:
+                    await self.login()
+
+        if self.deviceId is None:
+            raise NotLoggedIn("Not logged in. Use login() or async with, or create the client with lazy = True.")
+
+    async def _ensure_token(self):
+        token = self._token
+
+        # Refresh ahead of expiry so requests are not rejected with 401
+        if token is None or not token.is_valid(time.time(), self._TOKEN_REFRESH_MARGIN):
+            await self._get_token(token)
+
+    async def _authorized_request(self, operation: str, method: str, url: str, deviceId: Optional[str] = None, headers: Optional[dict] = None, **kwargs) -> BufferedResponse:
+        """
+        Sends request with the current token, request rejected with 401 is sent once more with a new token.
+        """
+
+        token = self._token
+        response = await self._request(operation, method, url, deviceId, headers={**self._headers(token), **(headers or {})}, **kwargs)
+
+        if response.status_code == 401:
+            await self._get_token(token, rejected=True)
+
+            response = await self._request(operation, method, url, deviceId, headers={**self._headers(self._token), **(headers or {})}, **kwargs)
+
+        return response
+
+    @staticmethod
+    def _headers(token: Optional[OAuthToken]) -> dict:
+        return {'Authorization': "Bearer " + token.AccessToken} if token is not None else {}
@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from ..config import MyUpwayConfig
+from ..exceptions import ConfigurationError, LoginErr, NotLoggedIn, ResponseError
+from ..models import OAuthToken, VariableHistoryValue, VariableValue
+from ..enums import Variable
+from ..responses import MyUpwayDecoder, loads
+from ..history import HistorySeries, split_range, merge_history_data, HistoryBuckets, bucket_resolution
+from ..transport import AiohttpTransport, BufferedResponse, split_batches, fetch_batches_async
+from .asyncservicebase import AsyncServiceBase
+
+
+class AsyncMyUpwayService(AsyncServiceBase):
+    """
+    asyncio version of MyUpwayService. Every instance keeps its own cookie jar but
+    can share a connection pool (aiohttp connector) with other instances.
+    """
+
+    _SERVICE = 'myupway'
+    _DOMAIN = 'myupway.com'
+    _BASE_URL = f'https://www.{_DOMAIN}'
+    # Assumed shortest logging interval of the server in seconds, used for default history chunk size
+    _HISTORY_LOG_INTERVAL = 60
+    # Lifetime assumed for stored session cookie when server does not give expiry
+    _DEFAULT_SESSION_LIFETIME = 3600
+    # Requesting one variable is enough to get the online status
+    _STATUS_VARIABLES = [Variable.AVG_OUTDOOR_TEMP]
+    # Variables per /PrivateAPI/Values request, all variables are fetched in three concurrent requests
+    _VALUES_BATCH_SIZE = 32
+
+    _config: MyUpwayConfig
+    _transport: AiohttpTransport
+    _owns_transport: bool
+    _decoder: MyUpwayDecoder
+    _login_pending: bool
+    _login_lock: Optional[asyncio.Lock]
+
+    deviceId: str
+    isOnline: bool
+
+    def __init__(self, config: MyUpwayConfig, connector: Optional[aiohttp.BaseConnector] = None, lazy: bool = False) -> None:
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for asyncio support. Install it with: pip install pyupway[async]")
+
+        self._config = config
+
+        if self._config.base_url:
+            self._BASE_URL = self._config.base_url
+
+        # CurrentValueCache makes waiting callers block the thread, which would stop the event loop
+        if self._config.value_cache is not None:
+            raise ConfigurationError("value_cache is not supported by AsyncMyUpway")
+
+        if connector is not None:
+            self._transport = AiohttpTransport(connector=connector)
+        else:
+            self._transport = self._config.transport or AiohttpTransport()
+
+        if not isinstance(self._transport, AiohttpTransport):
+            raise ConfigurationError("AsyncMyUpway needs AiohttpTransport, HttpTransport is for MyUpway")
+
+        # Transport created here is closed with the service, shared transport and connector are left open
+        self._owns_transport = connector is None and self._config.transport is None
+        self._client_session = None
+        self._decoder = MyUpwayDecoder()
+
+        self.deviceId = self._config.heatpump_id
+        self.isOnline = False
+        # Lazy service logs in on first request, otherwise login() has to be called
+        self._login_pending = lazy
+        self._login_lock = None
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        session = self._transport.session()
+        # Set language to en to be able to get boolean values right
+        session.cookie_jar.update_cookies(
+            {"EmilLanguage": "en-GB"}, response_url=URL(self._BASE_URL))
+
+        return session
+
+    async def login(self) -> None:
+        """
+        Logs in and updates isOnline. With token store configured a stored session
+        cookie is reused when the server still accepts it.
+        """
+
+        await self._login_with_store(None)
+
+    async def _login_with_store(self, rejected: Optional[str]) -> None:
+        """
+        Logs in unless the session in token store can be restored, like MyUpwayService._login_with_store.
+        """
+
+        store = self._config.token_store
+
+        if store is None:
+            await self._login()
+        else:
+            # Store lock blocks the thread, so it is held around load and save but never across await
+            with store.lock():
+                token = store.load(self._session_key())
+
+            if token is not None and token.AccessToken == rejected:
+                token = None
+
+            if not await self._restore_session(token):
+                await self._login()
+
+                with store.lock():
+                    store.save(self._session_key(), self._session_token())
+
+        self._login_pending = False
+
+    async def get_status(self) -> bool:
+        """
+        Returns whether the heat pump is online. Requests a single variable, which is
+        much cheaper than get_current_values for all variables.
+        """
+
+        await self._ensure_logged_in(False)
+        await self._probe_status(relogin=True)
+
+        return self.isOnline
+
+    async def _login(self) -> None:
+        url = self._BASE_URL + '/LogIn'
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        data = {
+            'returnUrl': '',
+            'Email': self._config.username,
+            'Password': self._config.password
+        }
+
+        response = await self._request('login', 'POST', url, headers=headers, data=data)
+
+        if response.status_code != 200:
+            raise ResponseError(f"Request failed with status code {response.status_code}", response.status_code)
+
+        if not self._is_logged_in():
+            raise LoginErr("Login failed.")
+
+        await self._probe_status(relogin=False)
+
+    async def _restore_session(self, token: Optional[OAuthToken]) -> bool:
+        """
+        Sets stored session cookie and checks that the server still accepts it.
+        """
+
+        if token is None or not token.is_valid(time.time()):
+            return False
+
+        self._session.cookie_jar.update_cookies(
+            {'.ASPXAUTH': token.AccessToken}, response_url=URL(self._BASE_URL))
+
+        try:
+            await self._probe_status(relogin=False)
+            return True
+        except ResponseError:
+            self._session.cookie_jar.clear(lambda cookie: cookie.key == '.ASPXAUTH')
+            return False
+
+    def _session_key(self) -> str:
+        return f"myupway:{self._config.username}"
+
+    def _session_token(self) -> OAuthToken:
+        cookie = next(cookie for cookie in self._session.cookie_jar if cookie.key == '.ASPXAUTH')
+        expires_at = time.time() + self._DEFAULT_SESSION_LIFETIME
+
+        if cookie['expires']:
+            try:
+                expires_at = parsedate_to_datetime(cookie['expires']).timestamp()
+            except (TypeError, ValueError):
+                pass
+
+        return OAuthToken(AccessToken=cookie.value, ExpiresAt=expires_at)
+
+    async def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
+        """
+        Returns current values for requested variables provided as list of VariableValue.
+        If variables are not specified, function returns all variables.
+        """
+
+        await self._ensure_logged_in(force_login)
+
+        return await self._fetch_values(variables)
+
+    async def _probe_status(self, relogin: bool) -> None:
+        """
+        Requests one variable to update isOnline. Sent past the circuit breaker, so it
+        tells when a device paused as offline is back.
+        """
+
+        await self._fetch_batch(self._STATUS_VARIABLES, relogin, breaker=False)
+
+    async def _fetch_values(self, variables: List[Variable] | None) -> List[VariableValue]:
+        """
+        Long variable lists are fetched in concurrent batches. Variables rejected by the server
+        are left out. When another batch fails, PartialResultError carrying the values of the
+        other batches is raised, and when every batch fails the first error is raised.
+        """
+
+        if not variables:
+            variables = list(Variable)
+
+        batches = split_batches(variables, self._config.values_batch_size or self._VALUES_BATCH_SIZE)
+
+        return await fetch_batches_async(self._fetch_batch, batches, self._config.values_max_workers, self._is_rejected)
+
+    async def _fetch_batch(self, variables: List[Variable], relogin: bool = True, breaker: bool = True) -> List[VariableValue]:
+        url = self._BASE_URL + '/PrivateAPI/Values'
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+        data = [
+            ('hpid', str(self._config.heatpump_id))
+        ]
+
+        for variable in variables:
+            data.append(('variables', str(variable.value)))
+
+        cache = self._config.conditional_cache
+        key = (str(self.deviceId), tuple(variable.value for variable in variables))
+
+        if cache is not None:
+            headers.update(cache.request_headers(key))
+
+        response = await self._session_request('values', 'POST', url, str(self.deviceId), relogin, breaker, headers=headers, data=data)
+
+        if cache is not None:
+            cached = cache.lookup_response(key, response.status_code, response.content)
+
+            if cached is not None:
+                return self._apply_values(*cached)
+
+        parse_time, response_data = self._parse_json(response)
+
+        # Date and FuzzyDate change between polls even when the values do not
+        fingerprint = (response_data['IsOffline'], response_data['Values'])
+
+        if cache is not None:
+            cached = cache.lookup_fingerprint(key, fingerprint)
+
+            if cached is not None:
+                cache.update(key, response.headers, response.content)
+                return self._apply_values(*cached)
+
+        decode_started = time.perf_counter()
+        isOnline, results = self._decoder.decode_current_values(response_data)
+        self._report_decode('values', parse_time, time.perf_counter() - decode_started, len(results))
+
+        if cache is not None:
+            cache.store(key, response.headers, response.content, fingerprint, (isOnline, results))
+
+        return self._apply_values(isOnline, results)
+
+    def _apply_values(self, isOnline: bool, results: List[VariableValue]) -> List[VariableValue]:
+        self.isOnline = isOnline
+
+        if isOnline:
+            self._config.request_policy.mark_online(str(self.deviceId))
+        else:
+            self._config.request_policy.mark_offline(str(self.deviceId))
+
+        return list(results)
+
+    async def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
+        """
+        Returns history values for selected variable from specified timerange.
+        """
+
+        unit, data = await self._get_history_data(variable, int(startDate.timestamp()), int(stopDate.timestamp()), resolution, force_login)
+
+        return self._decode_history(unit, data, self._decoder.decode_history_data)
+
+    async def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        """
+        Returns history values for selected variable from specified timerange as columnar HistorySeries.
+        """
+
+        unit, data = await self._get_history_data(variable, int(startDate.timestamp()), int(stopDate.timestamp()), resolution, force_login)
+
+        return self._decode_history(unit, data, HistorySeries.from_data)
+
+    async def get_history_buckets(self, variable: Variable, startDate: datetime, stopDate: datetime, interval: timedelta, fill: Optional[str] = None, points_per_bucket: int = 4, force_login: bool = False) -> HistoryBuckets:
+        """
+        Returns history aggregated to interval long buckets. Resolution is chosen to give
+        points_per_bucket points per bucket, not more than the server has logged.
+        """
+
+        resolution = bucket_resolution(int(startDate.timestamp()), int(stopDate.timestamp()), int(interval.total_seconds()), points_per_bucket, self._HISTORY_LOG_INTERVAL)
+
+        return (await self.get_history_series(variable, startDate, stopDate, resolution, force_login)).aggregate(interval, startDate, stopDate, fill)
+
+    async def get_bulk_history_values(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, List[VariableHistoryValue]]:
+        """
+        Returns history values for several variables. Timerange is split to chunks that each
+        fit within the resolution, at most max_workers chunks are fetched at a time.
+        """
+
+        bulk_data = await self._get_bulk_history_data(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+        return {variable: self._decode_history(unit, data, self._decoder.decode_history_data) for variable, (unit, data) in bulk_data.items()}
+
+    async def get_bulk_history_series(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, HistorySeries]:
+        """
+        Same as get_bulk_history_values, but returns columnar HistorySeries per variable.
+        """
+
+        bulk_data = await self._get_bulk_history_data(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+        return {variable: self._decode_history(unit, data, HistorySeries.from_data) for variable, (unit, data) in bulk_data.items()}
+
+    async def _get_bulk_history_data(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int, chunk_size: timedelta | None, max_workers: int, force_login: bool) -> Dict[Variable, Tuple[Optional[str], List[List[Any]]]]:
+        if chunk_size is None:
+            chunk_size = timedelta(seconds=resolution * self._HISTORY_LOG_INTERVAL)
+
+        chunks = split_range(int(startDate.timestamp()), int(stopDate.timestamp()), max(1, int(chunk_size.total_seconds())))
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(variable: Variable, chunk_start: int, chunk_stop: int):
+            async with semaphore:
+                return await self._get_history_data(variable, chunk_start, chunk_stop, resolution, force_login)
+
+        parts = await asyncio.gather(*(fetch(variable, chunk_start, chunk_stop)
+                                       for variable in variables for chunk_start, chunk_stop in chunks))
+
+        return {variable: merge_history_data(parts[index * len(chunks):(index + 1) * len(chunks)])
+                for index, variable in enumerate(variables)}
+
+    async def _get_history_data(self, variable: Variable, start: int, stop: int, resolution: int, force_login: bool) -> Tuple[Optional[str], List[List[Any]]]:
+        """
+        Returns unit and raw [timestamp, value] pairs. When history cache is configured
+        only the ranges missing from the cache are requested.
+        """
+
+        if self._config.history_cache is None:
+            response_data = await self._request_history(variable, start, stop, resolution, force_login)
+            return response_data['unit'], response_data['data']
+
+        settled, gaps = self._missing_history(variable, start, stop, resolution)
+
+        for gap_start, gap_stop, gap_resolution in gaps:
+            response_data = await self._request_history(variable, gap_start, gap_stop, gap_resolution, force_login)
+            self._store_history(variable, resolution, gap_start, gap_stop, settled, response_data)
+
+        return self._load_cached_history(variable, start, stop, resolution)
+
+    async def _request_history(self, variable: Variable, start: int, stop: int, resolution: int, force_login: bool) -> dict:
+        url = self._BASE_URL + '/PrivateAPI/History'
+
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        data = {
+            'hpid': str(self._config.heatpump_id),
+            'variableId': str(variable.value),
+            'resolution': str(resolution),
+            'startDate': str(start),
+            'stopDate': str(stop),
+            'isFullZoom': 'True',
+            'reloadOverview': 'True'
+        }
+
+        await self._ensure_logged_in(force_login)
+
+        parse_time, response_data = await self._post_json('history', url, headers, data, str(self.deviceId))
+        self._report_decode('history', parse_time, 0.0, len(response_data.get('data') or []))
+
+        return response_data
+
+    async def logout(self):
+        url = self._BASE_URL + '/LogOut'
+
+        await self._request('logout', 'GET', url)
+
+    async def close(self) -> None:
+        """
+        Closes the HTTP session. Shared transport and connector are left open.
+        """
+
+        await self._close_session()
+
+        if self._owns_transport:
+            await self._transport.close()
+
+    def _is_logged_in(self) -> bool:
+        return self._session_cookie() is not None
+
+    def _session_cookie(self) -> Optional[str]:
+        return next((cookie.value for cookie in self._session.cookie_jar if cookie.key == '.ASPXAUTH'), None)
+
+    async def _relogin(self, rejected: Optional[str]) -> None:
+        """
+        Logs in again after the server rejected session cookie rejected. One task logs in at
+        a time, tasks that waited for it find the cookie replaced and continue with its session.
+        """
+
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+
+        async with self._login_lock:
+            if self._session_cookie() == rejected:
+                await self._login_with_store(rejected)
+
+    async def _session_request(self, operation: str, method: str, url: str, deviceId: str, relogin: bool, breaker: bool = True, **kwargs) -> BufferedResponse:
+        """
+        Sends request with the session cookie, like MyUpwayService._session_request. Request
+        rejected with 401 is sent once more after _relogin unless relogin is False.
+        """
+
+        session = self._session_cookie()
+        response = await self._request(operation, method, url, deviceId, breaker, **kwargs)
+
+        if response.status_code == 401 and relogin:
+            await self._relogin(session)
+
+            response = await self._request(operation, method, url, deviceId, breaker, **kwargs)
+
+        return response
+
+    async def _ensure_logged_in(self, force_login: bool) -> None:
+        if self._login_pending:
+            if self._login_lock is None:
+                self._login_lock = asyncio.Lock()
+
+            async with self._login_lock:
+                if self._login_pending:
+                    await self.login()
+
+        if not self._is_logged_in() and force_login:
+            await self.login()
+
+        if not self._is_logged_in():
+            raise NotLoggedIn(
+                "Session is not currenly logged in. Use force_login = True if you want to force relogin.")
+
+    async def _post_json(self, operation: str, url: str, headers: dict, data, deviceId: Optional[str] = None) -> Tuple[float, dict]:
+        """
+        Returns JSON parse time and parsed response.
+        """
+
+        response = await self._session_request(operation, 'POST', url, deviceId, True, headers=headers, data=data)
+
+        return self._parse_json(response)
+
+    def _parse_json(self, response: BufferedResponse) -> Tuple[float, dict]:
+        if response.status_code != 200:
+            raise ResponseError(f"Request failed with status code {response.status_code}", response.status_code)
+
+        parse_started = time.perf_counter()
+
+        try:
+            response_data = loads(response.content)
+        except ValueError:
+            raise ResponseError(
+                f"Cannot parse response data. Data: {response.content}")
+
+        return time.perf_counter() - parse_started, response_data
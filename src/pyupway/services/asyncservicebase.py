@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Optional
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from ..exceptions import ResponseError
+from ..transport import AiohttpTransport, BufferedResponse, REJECTED_STATUSES
+from .servicebase import ServiceBase
+
+
+class AsyncServiceBase(ServiceBase):
+    """
+    Requests of the asyncio services, sent with an AiohttpTransport session.
+    """
+
+    _transport: AiohttpTransport
+    _client_session: Optional[aiohttp.ClientSession]
+
+    @property
+    def _session(self) -> aiohttp.ClientSession:
+        # Session is created on first use, aiohttp wants it created with the event loop running
+        if self._client_session is None:
+            self._client_session = self._new_session()
+
+        return self._client_session
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        return self._transport.session()
+
+    async def _close_session(self) -> None:
+        if self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+
+    async def _request(self, operation: str, method: str, url: str, deviceId: Optional[str] = None, breaker: bool = True, **kwargs) -> BufferedResponse:
+        """
+        Sends request with the aiohttp session through the request policy, like BlockingServiceBase._request.
+        """
+
+        async def send(call):
+            return await self._config.request_policy.send_async(call, deviceId if breaker else None, self._transport.retry_exceptions)
+
+        async def call() -> BufferedResponse:
+            async with self._session.request(method, url, **kwargs) as response:
+                return BufferedResponse(response.status, response.headers, await response.read())
+
+        if self._config.instrumentation is None:
+            return await send(call)
+
+        return await self._config.instrumentation.timed_request_async(self._SERVICE, operation, deviceId, send, call, self._body_size(kwargs.get('data')))
+
+    @staticmethod
+    def _is_rejected(error: BaseException) -> bool:
+        return isinstance(error, ResponseError) and error.status in REJECTED_STATUSES
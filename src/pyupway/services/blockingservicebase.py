@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import requests
+
+from typing import Optional
+
+from ..transport import BufferedResponse, HttpSession, HttpTransport, REJECTED_STATUSES
+from .servicebase import ServiceBase
+
+
+class BlockingServiceBase(ServiceBase):
+    """
+    Requests of the blocking services, sent with an HttpTransport session.
+    """
+
+    _transport: HttpTransport
+    _session: HttpSession
+
+    def _request(self, operation: str, method: str, url: str, deviceId: Optional[str] = None, breaker: bool = True, **kwargs) -> BufferedResponse:
+        """
+        Sends request with the transport session through the request policy: rate limit, retries and circuit breaker for deviceId.
+        Without breaker the circuit breaker is skipped, for login and status probes that find out whether the device is back.
+        """
+
+        def send(call):
+            return self._config.request_policy.send(call, deviceId if breaker else None, self._transport.retry_exceptions)
+
+        def call():
+            return self._session.request(method, url, **kwargs)
+
+        if self._config.instrumentation is None:
+            return send(call)
+
+        return self._config.instrumentation.timed_request(self._SERVICE, operation, deviceId, send, call, self._body_size(kwargs.get('data')))
+
+    @staticmethod
+    def _is_rejected(error: BaseException) -> bool:
+        return isinstance(error, requests.exceptions.HTTPError) and error.response is not None and error.response.status_code in REJECTED_STATUSES
@@ -1,41 +1,168 @@
 from __future__ import annotations
 
 import requests
+import threading
+import time
+import weakref
 
-from typing import List
-from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 from ..config import MyUpwayConfig
-from ..exceptions import LoginErr
+from ..exceptions import ConfigurationError, LoginErr
 from ..enums import Variable
-from ..models import VariableValue, VariableHistoryValue
+from ..models import Device, OAuthToken, VariableValue, VariableHistoryValue
+from ..responses import MyUplinkDecoder, loads
+from ..history import HistorySeries, HistoryBuckets, bucket_resolution
+from ..transport import BufferedResponse, HttpSession, HttpTransport, RequestsTransport, split_batches, fetch_batches
+from .blockingservicebase import BlockingServiceBase
 
-class MyUplinkService:
+class MyUplinkService(BlockingServiceBase):
+    _SERVICE = 'myuplink'
     _BASE_URL = 'https://api.myuplink.com'
+    _ITEMS_PER_PAGE = 100
+    # Seconds before expiry when token is refreshed
+    _TOKEN_REFRESH_MARGIN = 60
+    _DEFAULT_TOKEN_LIFETIME = 3600
+    # Parameters per /points request when a long variable list is requested
+    _VALUES_BATCH_SIZE = 32
     
     _config: MyUpwayConfig
-    _session: requests.Session
-    _token: str
+    _transport: HttpTransport
+    _owns_transport: bool
+    _session: HttpSession
+    _token: Optional[OAuthToken]
+    _token_lock: threading.Lock
+    _refresh_timer: Optional[threading.Timer]
+    _decoder: MyUplinkDecoder
+    _login_pending: bool
+    _login_lock: threading.Lock
+    _executor: ThreadPoolExecutor
 
-    deviceId: str
+    deviceId: Optional[str]
     isOnline: bool
 
-    def __init__(self, config: MyUpwayConfig) -> None:
+    def __init__(self, config: MyUpwayConfig, transport: Optional[HttpTransport] = None, lazy: bool = False) -> None:
         self._config = config
-        self._session = requests.Session()
 
-        self.login()
+        if self._config.base_url:
+            self._BASE_URL = self._config.base_url
+
+        self._transport = transport or self._config.transport or RequestsTransport()
+
+        if not isinstance(self._transport, HttpTransport):
+            raise ConfigurationError("MyUpway needs HttpTransport, AiohttpTransport is for AsyncMyUpway")
+
+        # Transport created here is closed with the service, shared transport is left open
+        self._owns_transport = transport is None and self._config.transport is None
+        self._session = self._transport.session()
+        self._decoder = MyUplinkDecoder(self._config.parameter_catalog)
+        # Token and its expiry are replaced together, so threads never see a mix of two tokens
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._refresh_timer = None
+        self._login_pending = True
+        self._login_lock = threading.Lock()
+        # Batches of all polls share the threads, they are started on first use
+        self._executor = ThreadPoolExecutor(max_workers=self._config.values_max_workers)
+
+        self.deviceId = None
+        self.isOnline = False
+
+        # Lazy service logs in on first request
+        if not lazy:
+            self.login()
     
     def login(self):
-        self._get_token()
-    
-        response = self._session.get(self._BASE_URL + '/v2/systems/me?page=1&itemsPerPage=10')
-        response_data = response.json()
+        self._get_token(self._token)
+
+        # First device of the account, later pages are not requested
+        device = next(self._iter_devices(), None)
+
+        if device is None:
+            raise LoginErr("No devices found for the MyUplink account")
+
+        deviceId = device.Id
+        isOnline = device.IsOnline
+
+        # Set only after parsing, so a failing login leaves the previous device in place
+        self.deviceId = deviceId
+        self.isOnline = isOnline
+
+        if isOnline:
+            self._config.request_policy.mark_online(deviceId)
+        else:
+            self._config.request_policy.mark_offline(deviceId)
+
+        self._login_pending = False
+
+    def get_status(self) -> bool:
+        """
+        Returns whether the device is connected. Requests only the device details, not the values.
+        """
+
+        self._ensure_logged_in()
+        self._ensure_token()
+
+        response = self._authorized_request('status', 'GET', self._BASE_URL + '/v2/devices/' + self.deviceId, self.deviceId, breaker=False)
+
+        if response.status_code != 200:
+            raise Exception(f"Failed to get device status. API responded with status code {response.status_code}")
+
+        isOnline = loads(response.content).get('connectionState') == "Connected"
+        self.isOnline = isOnline
+
+        if isOnline:
+            self._config.request_policy.mark_online(self.deviceId)
+        else:
+            self._config.request_policy.mark_offline(self.deviceId)
+
+        return isOnline
+
+    def get_devices(self) -> List[Device]:
+        """
+        Returns all devices of all systems available for the account.
+        """
+
+        self._ensure_token()
+
+        return list(self._iter_devices())
+
+    def _iter_devices(self) -> Iterator[Device]:
+        """
+        Yields the devices of all systems, the next page is requested when the previous one is used up.
+        """
 
-        device_data = response_data['systems'][0]['devices'][0]
+        page = 1
 
-        self.deviceId = device_data['id']
-        self.isOnline = device_data['connectionState'] == "Connected"
+        while True:
+            response = self._authorized_request('devices', 'GET', self._BASE_URL + '/v2/systems/me', params={'page': page, 'itemsPerPage': self._ITEMS_PER_PAGE})
+
+            if response.status_code != 200:
+                raise Exception(f"Failed to get systems. API responded with status code {response.status_code}")
+
+            response_data = loads(response.content)
+            systems = response_data.get('systems', [])
+
+            for system in systems:
+                for device_data in system.get('devices', []):
+                    device = Device(
+                        Id=device_data['id'],
+                        Name=device_data.get('product', {}).get('name'),
+                        SystemId=system.get('systemId'),
+                        IsOnline=device_data.get('connectionState') == "Connected"
+                    )
+
+                    if not device.IsOnline:
+                        self._config.request_policy.mark_offline(device.Id)
+
+                    yield device
+
+            if not systems or page * self._ITEMS_PER_PAGE >= response_data.get('numItems', 0):
+                return
+
+            page += 1
 
     def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
         """
@@ -43,77 +170,171 @@ class MyUplinkService:
         If variables are not specified, function returns all variables.
         """
 
+        self._ensure_logged_in()
+
+        return self.get_device_values(self.deviceId, variables, force_login)
+
+    def get_device_values(self, deviceId: str, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
+        """
+        Returns current values of the given device using the shared token. Long variable
+        lists are fetched in concurrent batches. Variables rejected by the server are left out.
+        When another batch fails, PartialResultError carrying the values of the other batches
+        is raised. Values still fresh in config value_cache are not requested.
+        """
+
+        if self._config.value_cache is not None:
+            return self._config.value_cache.get_current_values(
+                deviceId, variables, lambda missing: self._get_device_values(deviceId, missing))
+
+        return self._get_device_values(deviceId, variables)
+
+    def _get_device_values(self, deviceId: str, variables: List[Variable] | None) -> List[VariableValue]:
+        self._ensure_token()
+
+        if variables:
+            batches = split_batches(variables, self._config.values_batch_size or self._VALUES_BATCH_SIZE)
+            results = fetch_batches(lambda batch: self._fetch_points(deviceId, batch), batches, self._executor, self._is_rejected)
+        else:
+            results = self._fetch_points(deviceId, None)
+
+        if self._config.history_recorder is not None:
+            self._config.history_recorder.record(deviceId, results)
+
+        return results
+
+    def _fetch_points(self, deviceId: str, variables: List[Variable] | None) -> List[VariableValue]:
         params = {}
 
         if variables:
             params = {
                 "parameters": ','.join(str(variable.value) for variable in variables)
             }
-        
-        response = self._session.get(self._BASE_URL + '/v2/devices/' + self.deviceId + '/points', params=params)
 
-        if response.status_code == 401:
-            self._get_token()
-
-            response = self._session.get(self._BASE_URL + '/v2/devices/' + self.deviceId + '/points', params=params)
-
-        elif response.status_code != 200:
-            raise Exception(f"Failed to get values. API responded with status code {response.status_code}")
-
-        response_data = response.json()
-
-        results: List[VariableValue] = []
-
-        for result in response_data:
-            try:
-                variableEnum = Variable(int(result["parameterId"]))
-            except ValueError:
-                print(f"ERROR: Missing Variable enum. Contact the maintainer (https://github.com/lemanjo/pyupway) to add it to the code with these details: {result}")
-                continue
-
-            raw_value = result["value"]
-            # JSON does not distinguish between int and float, so python always outputs float. But enum
-            # interpretation needs to be able to access the value as an int if it is one.
-            value = int(raw_value) if raw_value.is_integer() else raw_value
-            str_value = str(value)
-
-            found_enum = [el for el in result["enumValues"] if str(el["value"]) == str_value]
-            enum_value = found_enum[0]["text"] if len(found_enum) > 0 and "text" in found_enum[0] else str_value
-
-            variable_value = VariableValue(
-                Id=variableEnum.value,
-                Name=variableEnum.name,
-                Enumerator=variableEnum,
-                Value=raw_value,
-                Unit=result["parameterUnit"],
-                EnumValue=enum_value,
-                UpdatedAt=datetime.fromisoformat(result["timestamp"])
-            )
-
-            if not self._contains_variable_value_with_id(results, variable_value.Id):
-                results.append(variable_value)
-        
-        return results
+        cache = self._config.conditional_cache
+        key = (deviceId, tuple(variable.value for variable in variables) if variables else None)
+        conditional_headers = cache.request_headers(key) if cache is not None else {}
+
+        response = self._authorized_request('values', 'GET', self._BASE_URL + '/v2/devices/' + deviceId + '/points', deviceId, params=params, headers=conditional_headers)
+
+        if cache is not None:
+            cached = cache.lookup_response(key, response.status_code, response.content)
+
+            if cached is not None:
+                return list(cached)
+
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(
+                f"Failed to get values. API responded with status code {response.status_code}", response=response)
+
+        parse_started = time.perf_counter()
+        response_data = loads(response.content)
+
+        # Points carry their values and server timestamps, so equal points decode to equal values
+        if cache is not None:
+            cached = cache.lookup_fingerprint(key, response_data)
+
+            if cached is not None:
+                cache.update(key, response.headers, response.content)
+                return list(cached)
+
+        decode_started = time.perf_counter()
+        results = self._decoder.decode_current_values(response_data, deviceId)
+        self._report_decode('values', decode_started - parse_started, time.perf_counter() - decode_started, len(results))
+
+        if cache is not None:
+            cache.store(key, response.headers, response.content, response_data, results)
+
+        return list(results)
 
     def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
         """
-        No way to implement in new API.
+        API has no history. Returns values recorded by config history_recorder, or empty list without recorder.
         """
 
-        results: List[VariableHistoryValue] = []
+        return self._decoder.decode_history_data(*self._load_history(variable, startDate, stopDate, resolution))
 
-        return results
+    def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        """
+        Same as get_history_values, but returns columnar HistorySeries.
+        """
+
+        return HistorySeries.from_data(*self._load_history(variable, startDate, stopDate, resolution))
+
+    def get_history_buckets(self, variable: Variable, startDate: datetime, stopDate: datetime, interval: timedelta, fill: Optional[str] = None, points_per_bucket: int = 4, force_login: bool = False) -> HistoryBuckets:
+        """
+        Recorded history aggregated to interval long buckets.
+        """
+
+        resolution = bucket_resolution(int(startDate.timestamp()), int(stopDate.timestamp()), int(interval.total_seconds()), points_per_bucket)
+
+        return (self.get_history_series(variable, startDate, stopDate, resolution)).aggregate(interval, startDate, stopDate, fill)
+
+    def get_bulk_history_values(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, List[VariableHistoryValue]]:
+        """
+        Recorded history of several variables. Chunking options are ignored as values are read locally.
+        """
+
+        return {variable: self.get_history_values(variable, startDate, stopDate, resolution) for variable in variables}
+
+    def get_bulk_history_series(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, HistorySeries]:
+        """
+        Same as get_bulk_history_values, but returns columnar HistorySeries per variable.
+        """
+
+        return {variable: self.get_history_series(variable, startDate, stopDate, resolution) for variable in variables}
     
     def logout(self):
-        """ No implementation """
-        pass
+        """
+        Stops background token refresh. Token based API has no session to log out from.
+        """
+
+        with self._token_lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+
+    def close(self) -> None:
+        """
+        Stops background token refresh and batch threads and closes the HTTP session.
+        Shared transport is left open.
+        """
+
+        self.logout()
+        self._executor.shutdown()
+        self._session.close()
+
+        if self._owns_transport:
+            self._transport.close()
 
     
-    def _get_token(self):
+    def _get_token(self, current: Optional[OAuthToken], rejected: bool = False):
         """
-        Fetch new token from OAUTH
+        Replaces current, the token the caller used, with a new token from OAUTH or a valid
+        token from the shared token store. One thread fetches at a time, and the threads
+        that waited for it return without fetching when the token was already replaced.
+        Token the server rejected is never reused from the store.
         """
-        
+
+        with self._token_lock:
+            if self._token is not current:
+                return
+
+            store = self._config.token_store
+
+            if store is None:
+                self._set_token(self._fetch_token())
+                return
+
+            with store.lock():
+                token = store.load(self._config.client_id)
+
+                if token is None or not token.is_valid(time.time(), self._TOKEN_REFRESH_MARGIN) or (rejected and current is not None and token.AccessToken == current.AccessToken):
+                    token = self._fetch_token()
+                    store.save(self._config.client_id, token)
+
+            self._set_token(token)
+
+    def _fetch_token(self) -> OAuthToken:
         # Define token request parameters
         token_params = {
             'grant_type': 'client_credentials',  # or other grant type depending on your OAuth flow
@@ -123,20 +344,80 @@ class MyUplinkService:
         }
 
         # Make a POST request to the token endpoint
-        response = requests.post(self._BASE_URL+'/oauth/token', data=token_params)
+        response = self._request('token', 'POST', self._BASE_URL+'/oauth/token', data=token_params)
 
         # Check if the request was successful (status code 200)
-        if response.status_code == 200:
-            # Extract the token from the response
-            token_data = response.json()
-            access_token = "Bearer "+token_data['access_token']
-            self._token = access_token
-            self._session.headers.update({'Authorization': access_token})
-        else:
+        if response.status_code != 200:
             raise LoginErr("Cannot fetch MyUplink token")
-    
-    def _contains_variable_value_with_id(self, variable_values, Id):
-        for var_value in variable_values:
-            if var_value.Id == Id:
-                return True
-        return False
+
+        token_data = loads(response.content)
+
+        return OAuthToken(
+            AccessToken=token_data['access_token'],
+            ExpiresAt=time.time() + token_data.get('expires_in', self._DEFAULT_TOKEN_LIFETIME))
+
+    def _set_token(self, token: OAuthToken):
+        self._token = token
+
+        # Refresh ahead of expiry so requests do not have to wait for a new token
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+
+        # Timer holds the service weakly, so a client that is dropped without close() can be freed
+        self._refresh_timer = threading.Timer(
+            max(0, token.ExpiresAt - self._TOKEN_REFRESH_MARGIN - time.time()), self._refresh_token, (weakref.ref(self), token))
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    @staticmethod
+    def _refresh_token(service: weakref.ref, token: OAuthToken):
+        service = service()
+
+        if service is None:
+            return
+
+        try:
+            service._get_token(token)
+        except Exception:
+            # Next request refreshes the token again before it is used
+            pass
+
+    def _load_history(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int) -> Tuple[Optional[str], List[List[Any]]]:
+        recorder = self._config.history_recorder
+
+        if recorder is None or not self.deviceId:
+            return None, []
+
+        return recorder.load(self.deviceId, variable.value, int(startDate.timestamp()), int(stopDate.timestamp()), resolution)
+
+    def _ensure_logged_in(self):
+        if self._login_pending:
+            with self._login_lock:
+                if self._login_pending:
+                    self.login()
+
+    def _ensure_token(self):
+        token = self._token
+
+        if token is None or not token.is_valid(time.time(), self._TOKEN_REFRESH_MARGIN):
+            self._get_token(token)
+
+    def _authorized_request(self, operation: str, method: str, url: str, deviceId: Optional[str] = None, headers: Optional[dict] = None, **kwargs) -> BufferedResponse:
+        """
+        Sends request with the current token. Request rejected with 401 is sent once more
+        with a new token, threads rejected with the same token share one token request.
+        """
+
+        token = self._token
+        response = self._request(operation, method, url, deviceId, headers={**self._headers(token), **(headers or {})}, **kwargs)
+
+        if response.status_code == 401:
+            self._get_token(token, rejected=True)
+
+            response = self._request(operation, method, url, deviceId, headers={**self._headers(self._token), **(headers or {})}, **kwargs)
+
+        return response
+
+    @staticmethod
+    def _headers(token: Optional[OAuthToken]) -> dict:
+        return {'Authorization': "Bearer " + token.AccessToken} if token is not None else {}
@@ -1,49 +1,121 @@
 from __future__ import annotations
 
 import requests
-import re
+import threading
+import time
 
-from typing import List
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 
 from ..config import MyUpwayConfig
-from ..exceptions import LoginErr, NotLoggedIn, ResponseError
-from ..models import ValueModel, VariableHistoryValue, VariableValue
+from ..exceptions import ConfigurationError, LoginErr, NotLoggedIn, ResponseError
+from ..models import Device, OAuthToken, VariableHistoryValue, VariableValue
 from ..enums import Variable
-from ..responses import ValueResponseModel, HistoryResponseModel
+from ..responses import MyUpwayDecoder, loads
+from ..history import HistorySeries, split_range, merge_history_data, HistoryBuckets, bucket_resolution
+from ..transport import BufferedResponse, HttpSession, HttpTransport, RequestsTransport, split_batches, fetch_batches
+from .blockingservicebase import BlockingServiceBase
 
-TIME_REPRESENTATION_FORMATS = [
-    "%m/%d/%Y %H:%M:%S",
-    "%Y. %m. %d. %H:%M:%S",
-    "%Y-%m-%d %H:%M:%S",
-    "%d-%m-%Y %H:%M:%S",
-    "%d.%m.%Y %H:%M:%S",
-    "%d.%m.%Y %H.%M.%S"
-]
 
-
-class MyUpwayService:
+class MyUpwayService(BlockingServiceBase):
+    _SERVICE = 'myupway'
     _DOMAIN = 'myupway.com'
     _BASE_URL = f'https://www.{_DOMAIN}'
+    # Assumed shortest logging interval of the server in seconds, used for default history chunk size
+    _HISTORY_LOG_INTERVAL = 60
+    # Lifetime assumed for stored session cookie when server does not give expiry
+    _DEFAULT_SESSION_LIFETIME = 3600
+    # Requesting one variable is enough to get the online status
+    _STATUS_VARIABLES = [Variable.AVG_OUTDOOR_TEMP]
+    # Variables per /PrivateAPI/Values request, all variables are fetched in three concurrent requests
+    _VALUES_BATCH_SIZE = 32
 
     _config: MyUpwayConfig
-    _session: requests.Session
+    _transport: HttpTransport
+    _owns_transport: bool
+    _session: HttpSession
+    _decoder: MyUpwayDecoder
+    _login_pending: bool
+    _login_lock: threading.Lock
+    _executor: ThreadPoolExecutor
 
     deviceId: str
     isOnline: bool
 
-    def __init__(self, config: MyUpwayConfig) -> None:
+    def __init__(self, config: MyUpwayConfig, transport: Optional[HttpTransport] = None, lazy: bool = False) -> None:
         self._config = config
-        self._session = requests.Session()
+
+        if self._config.base_url:
+            self._BASE_URL = self._config.base_url
+
+        self._transport = transport or self._config.transport or RequestsTransport()
+
+        if not isinstance(self._transport, HttpTransport):
+            raise ConfigurationError("MyUpway needs HttpTransport, AiohttpTransport is for AsyncMyUpway")
+
+        # Transport created here is closed with the service, shared transport is left open
+        self._owns_transport = transport is None and self._config.transport is None
+        self._session = self._transport.session()
+        self._decoder = MyUpwayDecoder()
         # Set language to en to be able to get boolean values right
-        self._session.cookies.set("EmilLanguage", "en-GB", domain=self._DOMAIN)
+        self._session.set_cookie("EmilLanguage", "en-GB", self._DOMAIN)
 
         self.deviceId = self._config.heatpump_id
-
-        self.login()
+        self.isOnline = False
+        self._login_pending = True
+        self._login_lock = threading.Lock()
+        # Batches of all polls share the threads, they are started on first use
+        self._executor = ThreadPoolExecutor(max_workers=self._config.values_max_workers)
+
+        # Lazy service logs in on first request
+        if not lazy:
+            self.login()
 
     def login(self) -> None:
+        """
+        Logs in and updates isOnline. With token store configured a stored session
+        cookie is reused when the server still accepts it.
+        """
+
+        self._login_with_store(None)
+
+    def _login_with_store(self, rejected: Optional[str]) -> None:
+        """
+        Logs in unless the session in token store can be restored. Stored session that
+        is the rejected cookie is not tried again, it would only cost a failing probe.
+        """
+
+        store = self._config.token_store
+
+        if store is None:
+            self._login()
+        else:
+            with store.lock():
+                token = store.load(self._session_key())
+
+                if token is not None and token.AccessToken == rejected:
+                    token = None
+
+                if not self._restore_session(token):
+                    self._login()
+                    store.save(self._session_key(), self._session_token())
 
+        self._login_pending = False
+
+    def get_status(self) -> bool:
+        """
+        Returns whether the heat pump is online. Requests a single variable, which is
+        much cheaper than get_current_values for all variables.
+        """
+
+        self._ensure_logged_in(False)
+        self._probe_status(relogin=True)
+
+        return self.isOnline
+
+    def _login(self) -> None:
         url = self._BASE_URL + '/LogIn'
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
         data = {
@@ -52,16 +124,84 @@ class MyUpwayService:
             'Password': self._config.password
         }
 
-        response = self._session.post(url, headers=headers, data=data)
+        response = self._request('login', 'POST', url, headers=headers, data=data)
 
         if response.status_code != 200:
             raise requests.exceptions.HTTPError(
                 f"Request failed with status code {response.status_code}")
 
-        if not '.ASPXAUTH' in self._session.cookies:
+        if self._session.get_cookie('.ASPXAUTH') is None:
             raise LoginErr("Login failed.")
 
-        self.get_current_values() # perform request to set the isOnline flag
+        self._probe_status(relogin=False)
+
+    def _restore_session(self, token: Optional[OAuthToken]) -> bool:
+        """
+        Sets stored session cookie and checks that the server still accepts it.
+        """
+
+        if token is None or not token.is_valid(time.time()):
+            return False
+
+        self._session.set_cookie('.ASPXAUTH', token.AccessToken, self._cookie_domain())
+
+        try:
+            self._probe_status(relogin=False)
+            return True
+        except (requests.exceptions.HTTPError, ResponseError):
+            self._session.clear_cookie('.ASPXAUTH', self._cookie_domain())
+            return False
+
+    def _session_key(self) -> str:
+        return f"myupway:{self._config.username}"
+
+    def _session_token(self) -> OAuthToken:
+        cookie = self._session.get_cookie('.ASPXAUTH')
+
+        return OAuthToken(
+            AccessToken=cookie.value,
+            ExpiresAt=cookie.expires or time.time() + self._DEFAULT_SESSION_LIFETIME)
+
+    def _cookie_domain(self) -> str:
+        host = urlparse(self._BASE_URL).hostname or ''
+        # Cookie jar stores cookies of dotless hosts (eg. localhost) under host.local
+        return host if '.' in host else host + '.local'
+
+    def _session_cookie(self) -> Optional[str]:
+        cookie = self._session.get_cookie('.ASPXAUTH')
+
+        return cookie.value if cookie is not None else None
+
+    def _ensure_logged_in(self, force_login: bool) -> None:
+        if self._login_pending:
+            with self._login_lock:
+                if self._login_pending:
+                    self.login()
+
+        if self._session_cookie() is None and force_login:
+            self._relogin(None)
+
+        if self._session_cookie() is None:
+            raise NotLoggedIn(
+                "Session is not currenly logged in. Use force_login = True if you want to force relogin.")
+
+    def _relogin(self, rejected: Optional[str]) -> None:
+        """
+        Logs in again after the server rejected session cookie rejected. One thread logs in at
+        a time, threads that waited for it find the cookie replaced and continue with its session.
+        """
+
+        with self._login_lock:
+            if self._session_cookie() == rejected:
+                self._login_with_store(rejected)
+
+    def get_devices(self) -> List[Device]:
+        """
+        Returns heat pumps configured with heatpump_id / heatpump_ids.
+        MyUpway has no API for listing the systems of an account.
+        """
+
+        return [Device(Id=str(heatpump_id), Name=None, SystemId=None, IsOnline=None) for heatpump_id in self._config.heatpump_ids]
 
     def get_current_values(self, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
         """
@@ -69,93 +209,196 @@ class MyUpwayService:
         If variables are not specified, function returns all variables.
         """
 
+        return self.get_device_values(self.deviceId, variables, force_login)
+
+    def get_device_values(self, deviceId, variables: List[Variable] | None = None, force_login: bool = False) -> List[VariableValue]:
+        """
+        Returns current values of the given heat pump using the logged in session, or
+        config value_cache when the values are fresh there.
+        """
+
+        if self._config.value_cache is not None:
+            return self._config.value_cache.get_current_values(
+                deviceId, variables, lambda missing: self._get_device_values(deviceId, missing, force_login))
+
+        return self._get_device_values(deviceId, variables, force_login)
+
+    def _get_device_values(self, deviceId, variables: List[Variable] | None, force_login: bool) -> List[VariableValue]:
+        self._ensure_logged_in(force_login)
+
+        return self._fetch_device_values(deviceId, variables)
+
+    def _probe_status(self, relogin: bool) -> None:
+        """
+        Requests one variable to update isOnline. Sent past the circuit breaker, so it
+        tells when a device paused as offline is back.
+        """
+
+        self._fetch_batch(self.deviceId, self._STATUS_VARIABLES, relogin, breaker=False)
+
+    def _fetch_device_values(self, deviceId, variables: List[Variable] | None, relogin: bool = True) -> List[VariableValue]:
+        """
+        Long variable lists are fetched in concurrent batches. Variables rejected by the server
+        are left out. When another batch fails, PartialResultError carrying the values of the
+        other batches is raised, and when every batch fails the first error is raised.
+        """
+
+        if not variables:
+            variables = list(Variable)
+
+        batches = split_batches(variables, self._config.values_batch_size or self._VALUES_BATCH_SIZE)
+
+        return fetch_batches(lambda batch: self._fetch_batch(deviceId, batch, relogin), batches, self._executor, self._is_rejected)
+
+    def _fetch_batch(self, deviceId, variables: List[Variable], relogin: bool, breaker: bool = True) -> List[VariableValue]:
         url = self._BASE_URL + '/PrivateAPI/Values'
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
 
         data = [
-            ('hpid', self._config.heatpump_id)
+            ('hpid', deviceId)
         ]
 
-        if not variables:
-            variables = list(Variable)
-
         for variable in variables:
             data.append(('variables', variable.value))  # type: ignore
 
-        if not '.ASPXAUTH' in self._session.cookies and force_login:
-            self.login()
+        cache = self._config.conditional_cache
+        key = (str(deviceId), tuple(variable.value for variable in variables))
 
-        if not '.ASPXAUTH' in self._session.cookies:
-            raise NotLoggedIn(
-                "Session is not currenly logged in. Use force_login = True if you want to force relogin.")
+        if cache is not None:
+            headers.update(cache.request_headers(key))
+
+        response = self._session_request('values', 'POST', url, str(deviceId), relogin, breaker=breaker, headers=headers, data=data)
+
+        if cache is not None:
+            cached = cache.lookup_response(key, response.status_code, response.content)
 
-        response = self._session.post(url, headers=headers, data=data)
+            if cached is not None:
+                return self._apply_values(deviceId, *cached)
 
         if response.status_code != 200:
             raise requests.exceptions.HTTPError(
-                f"Request failed with status code {response.status_code}, data: {response}")
+                f"Request failed with status code {response.status_code}, data: {response}", response=response)
+
+        parse_started = time.perf_counter()
 
         try:
-            response_data = response.json()
-        except requests.exceptions.JSONDecodeError:
+            response_data = loads(response.content)
+        except ValueError:
             raise ResponseError(
                 f"Cannot parse response data. Data: {response.content}")
 
-        for timeformat in TIME_REPRESENTATION_FORMATS:
-            try:
-                response_data['Date'] = datetime.strptime(
-                    response_data['Date'], timeformat)
+        # Date and FuzzyDate change between polls even when the values do not
+        fingerprint = (response_data['IsOffline'], response_data['Values'])
+
+        if cache is not None:
+            cached = cache.lookup_fingerprint(key, fingerprint)
+
+            if cached is not None:
+                cache.update(key, response.headers, response.content)
+                return self._apply_values(deviceId, *cached)
 
-            except ValueError:
-                continue
+        decode_started = time.perf_counter()
+        isOnline, results = self._decoder.decode_current_values(response_data)
+        self._report_decode('values', decode_started - parse_started, time.perf_counter() - decode_started, len(results))
 
-            else:
-                break
+        if cache is not None:
+            cache.store(key, response.headers, response.content, fingerprint, (isOnline, results))
 
-        currentValues = ValueResponseModel(**response_data)
+        return self._apply_values(deviceId, isOnline, results)
 
-        self.isOnline = not currentValues.IsOffline
+    def _apply_values(self, deviceId, isOnline: bool, results: List[VariableValue]) -> List[VariableValue]:
+        if str(deviceId) == str(self.deviceId):
+            self.isOnline = isOnline
 
-        results = []
+        if isOnline:
+            self._config.request_policy.mark_online(str(deviceId))
+        else:
+            self._config.request_policy.mark_offline(str(deviceId))
 
-        for value in currentValues.Values:
-            value = ValueModel(**value)  # type: ignore
-            id = value.VariableId
-            enumerator = Variable(id)
-            name = enumerator.name
+        return list(results)
 
-            # Regular expression pattern to match numeric value and unit
-            pattern = r'^(-?[\d]+(?:[.,]\d{1,})?)(\D*)$'
+    def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
+        """
+        Returns history values for selected variable from specified timerange.
+        """
 
-            match = re.match(pattern, value.CurrentValue)
-            if match:
-                value = match.group(1)  # Extract the numeric value
-                unit = match.group(2)  # Extract the unit
-                if unit == "":
-                    unit = None
+        unit, data = self._get_history_data(variable, int(startDate.timestamp()), int(stopDate.timestamp()), resolution, force_login)
 
-            else:
-                # If no match, consider the entire value as the value itself
-                value = value.CurrentValue
-                unit = None
+        return self._decode_history(unit, data, self._decoder.decode_history_data)
 
-            results.append(VariableValue(
-                Id=id,
-                Name=name,
-                Enumerator=enumerator,
-                Value=value,
-                Unit=unit,
-                EnumValue=None,
-                UpdatedAt=None
-            ))
+    def get_history_series(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> HistorySeries:
+        """
+        Returns history values for selected variable from specified timerange as columnar HistorySeries.
+        """
 
-        return results
+        unit, data = self._get_history_data(variable, int(startDate.timestamp()), int(stopDate.timestamp()), resolution, force_login)
 
-    def get_history_values(self, variable: Variable, startDate: datetime, stopDate: datetime, resolution: int = 1000, force_login: bool = False) -> List[VariableHistoryValue]:
+        return self._decode_history(unit, data, HistorySeries.from_data)
+
+    def get_history_buckets(self, variable: Variable, startDate: datetime, stopDate: datetime, interval: timedelta, fill: Optional[str] = None, points_per_bucket: int = 4, force_login: bool = False) -> HistoryBuckets:
         """
-        Returns history values for selected variable from specified timerange.
+        Returns history aggregated to interval long buckets. Resolution is chosen to give
+        points_per_bucket points per bucket, not more than the server has logged.
+        """
+
+        resolution = bucket_resolution(int(startDate.timestamp()), int(stopDate.timestamp()), int(interval.total_seconds()), points_per_bucket, self._HISTORY_LOG_INTERVAL)
+
+        return (self.get_history_series(variable, startDate, stopDate, resolution, force_login)).aggregate(interval, startDate, stopDate, fill)
+
+    def get_bulk_history_values(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, List[VariableHistoryValue]]:
+        """
+        Returns history values for several variables. Timerange is split to chunks that each
+        fit within the resolution, chunks are fetched concurrently and stitched per variable.
+        """
+
+        bulk_data = self._get_bulk_history_data(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+        return {variable: self._decode_history(unit, data, self._decoder.decode_history_data) for variable, (unit, data) in bulk_data.items()}
+
+    def get_bulk_history_series(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int = 1000, chunk_size: timedelta | None = None, max_workers: int = 4, force_login: bool = False) -> Dict[Variable, HistorySeries]:
+        """
+        Same as get_bulk_history_values, but returns columnar HistorySeries per variable.
+        """
+
+        bulk_data = self._get_bulk_history_data(variables, startDate, stopDate, resolution, chunk_size, max_workers, force_login)
+
+        return {variable: self._decode_history(unit, data, HistorySeries.from_data) for variable, (unit, data) in bulk_data.items()}
+
+    def _get_bulk_history_data(self, variables: List[Variable], startDate: datetime, stopDate: datetime, resolution: int, chunk_size: timedelta | None, max_workers: int, force_login: bool) -> Dict[Variable, Tuple[Optional[str], List[List[Any]]]]:
+        if chunk_size is None:
+            chunk_size = timedelta(seconds=resolution * self._HISTORY_LOG_INTERVAL)
+
+        chunks = split_range(int(startDate.timestamp()), int(stopDate.timestamp()), max(1, int(chunk_size.total_seconds())))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                variable: [executor.submit(self._get_history_data, variable, chunk_start, chunk_stop, resolution, force_login)
+                           for chunk_start, chunk_stop in chunks]
+                for variable in variables
+            }
+
+            return {variable: merge_history_data(future.result() for future in variable_futures)
+                    for variable, variable_futures in futures.items()}
+
+    def _get_history_data(self, variable: Variable, start: int, stop: int, resolution: int, force_login: bool) -> Tuple[Optional[str], List[List[Any]]]:
+        """
+        Returns unit and raw [timestamp, value] pairs. When history cache is configured
+        only the ranges missing from the cache are requested.
         """
 
+        if self._config.history_cache is None:
+            response_data = self._request_history(variable, start, stop, resolution, force_login)
+            return response_data['unit'], response_data['data']
+
+        settled, gaps = self._missing_history(variable, start, stop, resolution)
+
+        for gap_start, gap_stop, gap_resolution in gaps:
+            response_data = self._request_history(variable, gap_start, gap_stop, gap_resolution, force_login)
+            self._store_history(variable, resolution, gap_start, gap_stop, settled, response_data)
+
+        return self._load_cached_history(variable, start, stop, resolution)
+
+    def _request_history(self, variable: Variable, start: int, stop: int, resolution: int, force_login: bool) -> dict:
         url = self._BASE_URL + '/PrivateAPI/History'
 
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
@@ -163,49 +406,59 @@ class MyUpwayService:
             'hpid': self._config.heatpump_id,
             'variableId': variable.value,
             'resolution': resolution,
-            'startDate': int(startDate.timestamp()),
-            'stopDate': int(stopDate.timestamp()),
+            'startDate': start,
+            'stopDate': stop,
             'isFullZoom': True,
             'reloadOverview': True
         }
 
-        if not '.ASPXAUTH' in self._session.cookies and force_login:
-            self.login()
-
-        if not '.ASPXAUTH' in self._session.cookies:
-            raise NotLoggedIn(
-                "Session is not currenly logged in. Use force_login = True if you want to force relogin.")
+        self._ensure_logged_in(force_login)
 
-        response = self._session.post(url, headers=headers, data=data)
+        response = self._session_request('history', 'POST', url, str(self.deviceId), True, headers=headers, data=data)
 
         if response.status_code != 200:
             raise requests.exceptions.HTTPError(
                 f"Request failed with status code {response.status_code}, data: {response}")
 
+        parse_started = time.perf_counter()
+
         try:
-            response_data = HistoryResponseModel(**response.json())
+            response_data = loads(response.content)
+            self._report_decode('history', time.perf_counter() - parse_started, 0.0, len(response_data.get('data') or []))
+            return response_data
 
-        except requests.exceptions.JSONDecodeError:
+        except ValueError:
             raise ResponseError(
                 f"Cannot parse response data. Data: {response.content}")
 
-        results = []
+    def logout(self):
+        url = self._BASE_URL + '/LogOut'
+
+        response = self._request('logout', 'GET', url)
 
-        for value in response_data.data:
-            history_value = value[1]
-            history_date = datetime.fromtimestamp(value[0]/1000)
+    def close(self) -> None:
+        """
+        Closes the HTTP session and stops the batch threads. Shared transport is left open.
+        """
+
+        self._executor.shutdown()
+        self._session.close()
+
+        if self._owns_transport:
+            self._transport.close()
 
-            if response_data.unit == "":
-                history_unit = None
-            else:
-                history_unit = response_data.unit
+    def _session_request(self, operation: str, method: str, url: str, deviceId: str, relogin: bool, breaker: bool = True, **kwargs) -> BufferedResponse:
+        """
+        Sends request with the session cookie. When the server rejects the session with 401
+        it is sent once more after _relogin, unless relogin is False (requests of login itself).
+        """
 
-            results.append(VariableHistoryValue(
-                history_value, history_unit, history_date))
+        session = self._session_cookie()
+        response = self._request(operation, method, url, deviceId, breaker, **kwargs)
 
-        return results
+        if response.status_code == 401 and relogin:
+            self._relogin(session)
 
-    def logout(self):
-        url = self._BASE_URL + '/LogOut'
+            response = self._request(operation, method, url, deviceId, breaker, **kwargs)
 
-        response = self._session.get(url)
+        return response
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import math
+import time
+
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from ..config import MyUpwayConfig
+from ..enums import Variable
+from ..instrumentation import DecodeEvent
+
+
+class ServiceBase:
+    """
+    Parts of the services that do not send requests, shared by the blocking and the
+    asyncio services.
+    """
+
+    _SERVICE: str
+    # Seconds the server may take to log a value, newer history is not marked as downloaded
+    _HISTORY_SETTLE_TIME = 600
+
+    _config: MyUpwayConfig
+
+    deviceId: Optional[str]
+
+    @staticmethod
+    def _body_size(data) -> int:
+        """
+        Size of the request body sent for data, form fields are counted URL encoded like the HTTP clients send them.
+        """
+
+        if data is None:
+            return 0
+
+        if isinstance(data, bytes):
+            return len(data)
+
+        if isinstance(data, str):
+            return len(data.encode('utf-8'))
+
+        return len(urlencode(data, doseq=True))
+
+    def _report_decode(self, operation: str, parse_time: float, decode_time: float, values: int) -> None:
+        if self._config.instrumentation is not None:
+            self._config.instrumentation.on_decode(DecodeEvent(self._SERVICE, operation, parse_time, decode_time, values))
+
+    def _decode_history(self, unit: Optional[str], data: List[List[Any]], factory: Callable):
+        """
+        Builds history result with factory(unit, data), timed when instrumentation is configured.
+        """
+
+        if self._config.instrumentation is None:
+            return factory(unit, data)
+
+        started = time.perf_counter()
+        result = factory(unit, data)
+        self._report_decode('history', 0.0, time.perf_counter() - started, 0)
+
+        return result
+
+    def _missing_history(self, variable: Variable, start: int, stop: int, resolution: int) -> Tuple[int, List[Tuple[int, int, int]]]:
+        """
+        Returns the time until which history is settled, and the ranges missing from config
+        history_cache with the resolution to request each of them with.
+        """
+
+        # Server may not have logged the most recent values yet, so those are never marked as downloaded
+        settled = int(time.time()) - self._HISTORY_SETTLE_TIME
+        gaps = self._config.history_cache.missing_ranges(self.deviceId, variable.value, resolution, start, stop)
+
+        # Keep the point density of the whole window when requesting only a part of it
+        return settled, [(gap_start, gap_stop, max(1, math.ceil(resolution * (gap_stop - gap_start) / max(1, stop - start))))
+                         for gap_start, gap_stop in gaps]
+
+    def _store_history(self, variable: Variable, resolution: int, start: int, stop: int, settled: int, response_data: dict) -> None:
+        self._config.history_cache.store(self.deviceId, variable.value, resolution, start, stop,
+                                         response_data['unit'], response_data['data'], settled)
+
+    def _load_cached_history(self, variable: Variable, start: int, stop: int, resolution: int) -> Tuple[Optional[str], List[List[Any]]]:
+        return self._config.history_cache.load(self.deviceId, variable.value, resolution, start, stop)
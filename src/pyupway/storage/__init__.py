@@ -0,0 +1 @@
+from .atomicwrite import atomic_path, write_json
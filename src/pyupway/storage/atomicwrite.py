@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+import os
+
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    Yields temporary path to write the file to. It replaces path when the block completes,
+    so readers never see partially written file and an interrupted write keeps the previous one.
+    """
+
+    temporary_path = path + '.tmp'
+
+    try:
+        yield temporary_path
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    os.replace(temporary_path, path)
+
+
+def write_json(path: str, data: Any, mode: Optional[int] = None) -> None:
+    """
+    Writes data as JSON to path atomically, with file permissions mode when given.
+    """
+
+    with atomic_path(path) as temporary_path:
+        with open(temporary_path, 'w', encoding='utf-8') as json_file:
+            json.dump(data, json_file)
+
+        if mode is not None:
+            os.chmod(temporary_path, mode)
@@ -0,0 +1,9 @@
+from .ratelimiter import RateLimiter
+from .circuitbreaker import CircuitBreaker
+from .requestpolicy import RequestPolicy
+from .bufferedresponse import BufferedResponse
+from .batches import split_batches, fetch_batches, fetch_batches_async, REJECTED_STATUSES
+from .httptransport import HttpTransport, HttpSession
+from .requeststransport import RequestsTransport
+from .httpxtransport import HttpxTransport
+from .aiohttptransport import AiohttpTransport
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+
+from typing import Dict, Optional
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AiohttpTransport:
+    """
+    HTTP backend of the asyncio services. Every service gets its own aiohttp session
+    (cookies) from session(), and the sessions share one connector that keeps up to limit
+    connections open, limit_per_host to one host (0 is unlimited).
+
+    Give an existing connector to share it, it is then left open by close().
+    """
+
+    retry_exceptions = (aiohttp.ClientConnectionError, asyncio.TimeoutError) if aiohttp is not None else ()
+
+    _connector: Optional[aiohttp.BaseConnector]
+    _connector_owner: bool
+    _connector_options: dict
+    _timeout: aiohttp.ClientTimeout
+    _headers: Dict[str, str]
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 0, connect_timeout: float = 10, read_timeout: float = 60,
+                 keep_alive: bool = True, keepalive_timeout: float = 15, compression: bool = True,
+                 connector: Optional[aiohttp.BaseConnector] = None) -> None:
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for asyncio support. Install it with: pip install pyupway[async]")
+
+        self._connector = connector
+        self._connector_owner = connector is None
+        # aiohttp does not accept keepalive_timeout together with force_close
+        self._connector_options = {'limit': limit, 'limit_per_host': limit_per_host}
+        if keep_alive:
+            self._connector_options['keepalive_timeout'] = keepalive_timeout
+        else:
+            self._connector_options['force_close'] = True
+
+        self._timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        # aiohttp advertises brotli itself when it can decode it
+        self._headers = {} if compression else {'Accept-Encoding': 'identity'}
+
+    def session(self) -> aiohttp.ClientSession:
+        # Connector is created on first use, aiohttp wants it created with the event loop running
+        if self._connector is None:
+            self._connector = aiohttp.TCPConnector(**self._connector_options)
+
+        return aiohttp.ClientSession(connector=self._connector, connector_owner=False, timeout=self._timeout, headers=self._headers)
+
+    async def close(self) -> None:
+        if self._connector is not None and self._connector_owner:
+            await self._connector.close()
+            self._connector = None
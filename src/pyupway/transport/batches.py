@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, List, Sequence
+
+from ..exceptions import PartialResultError
+
+logger = logging.getLogger(__name__)
+
+# Responses telling that the request itself is invalid or too large, splitting it may help
+REJECTED_STATUSES = frozenset({400, 404, 413, 414, 422})
+
+
+def split_batches(items: Sequence[Any], batch_size: int) -> List[List[Any]]:
+    """
+    Splits items to the smallest number of batches of at most batch_size items,
+    sized evenly so the last batch is not much smaller than the others.
+    """
+
+    items = list(items)
+
+    if len(items) <= batch_size:
+        return [items]
+
+    size = math.ceil(len(items) / math.ceil(len(items) / batch_size))
+
+    return [items[index:index + size] for index in range(0, len(items), size)]
+
+
+def fetch_batches(fetch: Callable[[List[Any]], List[Any]], batches: List[List[Any]], executor: Executor,
+                  rejected: Callable[[BaseException], bool]) -> List[Any]:
+    """
+    Calls fetch for every batch in executor and merges the results in batch order.
+
+    Batch the server rejects as invalid (rejected(error) is true) is split in halves and
+    retried, so one bad item only loses its own value. Other failures do not stop the
+    remaining batches, but PartialResultError carrying the values and the errors is
+    raised when some batches failed. Raises the first error if no batch succeeds.
+    """
+
+    failures: List[BaseException] = []
+    rejections: List[BaseException] = []
+    succeeded: List[bool] = []
+
+    def isolated(batch: List[Any]) -> List[Any]:
+        try:
+            results = fetch(batch)
+        except Exception as error:
+            if len(batch) > 1 and rejected(error):
+                middle = len(batch) // 2
+                return isolated(batch[:middle]) + isolated(batch[middle:])
+
+            _failed(batch, error, rejected(error), failures, rejections)
+            return []
+
+        succeeded.append(True)
+        return results
+
+    if len(batches) == 1:
+        parts = [isolated(batches[0])]
+    else:
+        parts = list(executor.map(isolated, batches))
+
+    return _merge(parts, failures, rejections, succeeded)
+
+
+async def fetch_batches_async(fetch: Callable[[List[Any]], Awaitable[List[Any]]], batches: List[List[Any]], max_workers: int,
+                              rejected: Callable[[BaseException], bool]) -> List[Any]:
+    """
+    asyncio version of fetch_batches, at most max_workers batches are fetched at a time.
+    """
+
+    failures: List[BaseException] = []
+    rejections: List[BaseException] = []
+    succeeded: List[bool] = []
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def isolated(batch: List[Any]) -> List[Any]:
+        try:
+            async with semaphore:
+                results = await fetch(batch)
+        except Exception as error:
+            if len(batch) > 1 and rejected(error):
+                middle = len(batch) // 2
+                halves = await asyncio.gather(isolated(batch[:middle]), isolated(batch[middle:]))
+                return halves[0] + halves[1]
+
+            _failed(batch, error, rejected(error), failures, rejections)
+            return []
+
+        succeeded.append(True)
+        return results
+
+    parts = await asyncio.gather(*(isolated(batch) for batch in batches))
+
+    return _merge(parts, failures, rejections, succeeded)
+
+
+def _failed(batch: List[Any], error: BaseException, is_rejected: bool, failures: List[BaseException], rejections: List[BaseException]) -> None:
+    if is_rejected:
+        # Single item the server does not accept, its value is left out
+        logger.debug("Request of %s rejected: %s", batch[0], error)
+        rejections.append(error)
+    else:
+        failures.append(error)
+
+
+def _merge(parts: List[List[Any]], failures: List[BaseException], rejections: List[BaseException], succeeded: List[bool]) -> List[Any]:
+    if not succeeded and (failures or rejections):
+        raise (failures or rejections)[0]
+
+    results = [result for part in parts for result in part]
+
+    if failures:
+        for error in failures:
+            logger.warning("Batch failed, values of the other batches are raised in PartialResultError: %s", error)
+
+        raise PartialResultError(results, failures)
+
+    return results
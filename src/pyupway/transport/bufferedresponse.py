@@ -0,0 +1,13 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Mapping
+
+@dataclass
+class BufferedResponse:
+    """
+    Fully read response, used by the asyncio services so responses can be retried and inspected after the connection is released.
+    """
+
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from typing import Dict, Hashable, Optional, Tuple
+
+from ..exceptions import CircuitOpenError
+
+
+class CircuitBreaker:
+    """
+    Stops requests for a device after failure_threshold consecutive failures, or
+    while the device reports to be offline. After reset_timeout seconds one request
+    is let through to probe whether the device is available again.
+
+    With failure_threshold None only offline devices are paused.
+    """
+
+    _failure_threshold: Optional[int]
+    _reset_timeout: float
+    _offline_timeout: float
+    # key -> (consecutive failures, open until)
+    _states: Dict[Hashable, Tuple[int, float]]
+    _lock: threading.Lock
+
+    def __init__(self, failure_threshold: Optional[int] = 5, reset_timeout: float = 60, offline_timeout: float = 300) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._offline_timeout = offline_timeout
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def check(self, key: Hashable) -> None:
+        """
+        Raises CircuitOpenError when requests for key are paused.
+        """
+
+        with self._lock:
+            failures, open_until = self._states.get(key, (0, 0.0))
+            now = time.monotonic()
+
+            if open_until > now:
+                raise CircuitOpenError(
+                    f"Requests for device {key} are paused for {open_until - now:.0f} s after repeated failures or offline state")
+
+            if open_until:
+                # Half open, let this request probe and pause others until it reports back
+                self._states[key] = (failures, now + self._reset_timeout)
+
+    def record_success(self, key: Hashable) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+    def record_failure(self, key: Hashable) -> None:
+        with self._lock:
+            failures, open_until = self._states.get(key, (0, 0.0))
+            failures += 1
+
+            if self._failure_threshold is not None and failures >= self._failure_threshold:
+                open_until = time.monotonic() + self._reset_timeout
+
+            self._states[key] = (failures, open_until)
+
+    def mark_offline(self, key: Hashable) -> None:
+        """
+        Pauses requests for a device that reported to be offline.
+        """
+
+        with self._lock:
+            failures, _ = self._states.get(key, (0, 0.0))
+            self._states[key] = (failures, time.monotonic() + self._offline_timeout)
+
+    def is_open(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._states.get(key, (0, 0.0))[1] > time.monotonic()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from http.cookiejar import Cookie, CookieJar
+from typing import Optional, Tuple, Type
+
+from requests.cookies import create_cookie
+
+from .bufferedresponse import BufferedResponse
+
+
+class HttpSession(ABC):
+    """
+    Cookies of one service and the requests sent with them. Sessions created by the
+    same transport share its connection pool, which is closed with the transport.
+    """
+
+    cookies: CookieJar
+
+    @abstractmethod
+    def request(self, method: str, url: str, params=None, data=None, headers: Optional[dict] = None) -> BufferedResponse:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def set_cookie(self, name: str, value: str, domain: str) -> None:
+        self.cookies.set_cookie(create_cookie(name, value, domain=domain))
+
+    def get_cookie(self, name: str) -> Optional[Cookie]:
+        while True:
+            try:
+                cookies = list(self.cookies)
+            except RuntimeError:
+                # Iterating the jar is not locked, response of another thread stored a cookie meanwhile
+                continue
+
+            return next((cookie for cookie in cookies if cookie.name == name), None)
+
+    def clear_cookie(self, name: str, domain: str) -> None:
+        try:
+            self.cookies.clear(domain, '/', name)
+        except KeyError:
+            pass
+
+
+class HttpTransport(ABC):
+    """
+    HTTP backend of the blocking services. Every service gets its own session from
+    session() and all requests, including login and token requests, are sent with it.
+
+    Give one transport to the configurations of many clients to keep their connections
+    in one pool. retry_exceptions are the connection errors RequestPolicy retries.
+    """
+
+    retry_exceptions: Tuple[Type[BaseException], ...] = ()
+
+    @abstractmethod
+    def session(self) -> HttpSession:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
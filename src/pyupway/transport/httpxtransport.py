@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+from .bufferedresponse import BufferedResponse
+from .httptransport import HttpSession, HttpTransport
+
+
+class HttpxTransport(HttpTransport):
+    """
+    Transport using httpx, needs pip install pyupway[http2]. With http2 the concurrent
+    requests of all sessions are multiplexed over one connection per host when the
+    server supports HTTP/2, otherwise up to max_connections HTTP/1.1 connections are used.
+
+    Idle connections are kept open for keepalive_expiry seconds, max_keepalive_connections
+    of them (0 closes every connection after its request).
+    """
+
+    _transport: Any
+    _timeout: Any
+    _headers: Dict[str, str]
+
+    def __init__(self, http2: bool = True, max_connections: int = 10, max_keepalive_connections: int = 10, keepalive_expiry: float = 60,
+                 connect_timeout: float = 10, read_timeout: float = 60, compression: bool = True) -> None:
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("httpx is required for HttpxTransport. Install it with: pip install pyupway[http2]")
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections, keepalive_expiry=keepalive_expiry)
+
+        self._transport = httpx.HTTPTransport(http2=http2, limits=limits)
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        # httpx advertises brotli itself when it can decode it
+        self._headers = {} if compression else {'Accept-Encoding': 'identity'}
+
+        self.retry_exceptions = (httpx.TransportError,)
+
+    def session(self) -> HttpSession:
+        import httpx
+
+        client = httpx.Client(transport=self._transport, timeout=self._timeout, headers=self._headers, follow_redirects=True)
+
+        return _HttpxSession(client)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _HttpxSession(HttpSession):
+    def __init__(self, client) -> None:
+        self._client = client
+        self.cookies = client.cookies.jar
+
+    def request(self, method: str, url: str, params=None, data=None, headers: Optional[dict] = None) -> BufferedResponse:
+        content = None
+
+        if data is not None:
+            # Encode the form like requests does, httpx takes fields only as a mapping and writes booleans in lower case
+            content = urlencode(data, doseq=True)
+            headers = {'Content-Type': 'application/x-www-form-urlencoded', **(headers or {})}
+
+        response = self._client.request(method, url, params=params, content=content, headers=headers)
+
+        return BufferedResponse(response.status_code, response.headers, response.content)
+
+    def close(self) -> None:
+        # httpx.Client.close() would close the transport shared with the other sessions
+        self._client.cookies.clear()
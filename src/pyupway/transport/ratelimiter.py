@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread safe token bucket. Allows bursts of burst requests and rate requests
+    per second on average. Share one instance between all clients of an account.
+    """
+
+    _rate: float
+    _burst: float
+    _tokens: float
+    _updated_at: float
+    _lock: threading.Lock
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._tokens = self._burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes one token and returns how many seconds the caller has to wait before using it.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated_at) * self._rate)
+            self._updated_at = now
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+
+            return -self._tokens / self._rate
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request is allowed.
+        """
+
+        wait = self.reserve()
+
+        if wait > 0:
+            time.sleep(wait)
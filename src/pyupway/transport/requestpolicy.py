@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Hashable, Optional, Tuple, Type
+
+from .circuitbreaker import CircuitBreaker
+from .ratelimiter import RateLimiter
+
+
+class RequestPolicy:
+    """
+    Rate limiting, retries and circuit breaking applied to every request of the services.
+    Share one policy between all clients of an account so they use the same rate limit.
+
+    429 and 5xx responses and connection errors are retried max_retries times with
+    exponential backoff and full jitter, or after the time given in Retry-After header.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    rate_limiter: Optional[RateLimiter]
+    circuit_breaker: Optional[CircuitBreaker]
+    max_retries: int
+    backoff: float
+    max_backoff: float
+    max_retry_after: float
+
+    def __init__(self, rate_limit: Optional[float] = None, burst: int = 1, max_retries: int = 2, backoff: float = 0.5,
+                 max_backoff: float = 30, max_retry_after: float = 300, circuit_breaker: Optional[CircuitBreaker] = None) -> None:
+        self.rate_limiter = RateLimiter(rate_limit, burst) if rate_limit else None
+        self.circuit_breaker = circuit_breaker
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    def send(self, call: Callable, key: Optional[Hashable] = None, retry_exceptions: Tuple[Type[BaseException], ...] = ()):
+        """
+        Performs call() with rate limiting and retries. call returns a response with
+        status_code and headers. Last response is returned even if it failed.
+        """
+
+        self._check(key)
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = call()
+            except retry_exceptions:
+                if attempt >= self.max_retries:
+                    self._record(key, False)
+                    raise
+                time.sleep(self.retry_delay(attempt))
+                continue
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self.retry_delay(attempt, response.headers.get('Retry-After')))
+                continue
+
+            self._record(key, response.status_code not in self.RETRY_STATUSES)
+            return response
+
+    async def send_async(self, call: Callable[[], Awaitable], key: Optional[Hashable] = None, retry_exceptions: Tuple[Type[BaseException], ...] = ()):
+        """
+        asyncio version of send.
+        """
+
+        self._check(key)
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            try:
+                response = await call()
+            except retry_exceptions:
+                if attempt >= self.max_retries:
+                    self._record(key, False)
+                    raise
+                await asyncio.sleep(self.retry_delay(attempt))
+                continue
+
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                await asyncio.sleep(self.retry_delay(attempt, response.headers.get('Retry-After')))
+                continue
+
+            self._record(key, response.status_code not in self.RETRY_STATUSES)
+            return response
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retry number attempt + 1.
+        """
+
+        if retry_after:
+            delay = self._parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_retry_after)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def mark_offline(self, key: Hashable) -> None:
+        """
+        Pauses requests for a device that reported to be offline, if circuit breaker is used.
+        """
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.mark_offline(key)
+
+    def mark_online(self, key: Hashable) -> None:
+        """
+        Resumes requests for a device that reported to be online again, if circuit breaker is used.
+        """
+
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success(key)
+
+    def _check(self, key: Optional[Hashable]) -> None:
+        if key is not None and self.circuit_breaker is not None:
+            self.circuit_breaker.check(key)
+
+    def _record(self, key: Optional[Hashable], success: bool) -> None:
+        if key is None or self.circuit_breaker is None:
+            return
+
+        if success:
+            self.circuit_breaker.record_success(key)
+        else:
+            self.circuit_breaker.record_failure(key)
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
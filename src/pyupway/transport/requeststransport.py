@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+from .bufferedresponse import BufferedResponse
+from .httptransport import HttpSession, HttpTransport
+
+
+class RequestsTransport(HttpTransport):
+    """
+    Default transport using requests. Sessions share one connection pool adapter, which
+    keeps up to pool_maxsize connections to each host open for reuse (pool_connections hosts).
+    With pool_block a request waits for a free connection instead of opening an extra one.
+
+    Requests time out after connect_timeout seconds without a connection and read_timeout
+    seconds without data. Compression advertises gzip and deflate, and brotli when the
+    brotli package is installed (pip install pyupway[brotli]).
+    """
+
+    retry_exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    _adapter: HTTPAdapter
+    _headers: Dict[str, str]
+
+    timeout: Tuple[float, float]
+
+    def __init__(self, pool_maxsize: int = 10, pool_connections: int = 10, pool_block: bool = False, connect_timeout: float = 10,
+                 read_timeout: float = 60, keep_alive: bool = True, compression: bool = True) -> None:
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self._headers = {
+            'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'] if compression else 'identity',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        }
+
+        self.timeout = (connect_timeout, read_timeout)
+
+    def session(self) -> HttpSession:
+        session = requests.Session()
+        session.mount('https://', self._adapter)
+        session.mount('http://', self._adapter)
+        session.headers.update(self._headers)
+
+        return _RequestsSession(session, self.timeout)
+
+    def close(self) -> None:
+        self._adapter.close()
+
+
+class _RequestsSession(HttpSession):
+    _session: requests.Session
+    _timeout: Tuple[float, float]
+
+    def __init__(self, session: requests.Session, timeout: Tuple[float, float]) -> None:
+        self._session = session
+        self._timeout = timeout
+        self.cookies = session.cookies
+
+    def request(self, method: str, url: str, params=None, data=None, headers: Optional[dict] = None) -> BufferedResponse:
+        response = self._session.request(method, url, params=params, data=data, headers=headers, timeout=self._timeout)
+
+        return BufferedResponse(response.status_code, response.headers, response.content)
+
+    def close(self) -> None:
+        # requests.Session.close() would close the adapter shared with the other sessions
+        self._session.cookies.clear()
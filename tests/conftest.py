@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+
+from typing import Iterator
+
+import pytest
+
+from mockserver import MockServer
+from pyupway import DataService, MyUpwayConfig
+
+
+def myupway_config(server: MockServer, **options) -> MyUpwayConfig:
+    return MyUpwayConfig(dataservice=DataService.MYUPWAY, username='user', password='secret', heatpump_id=1, base_url=server.url, **options)
+
+
+def myuplink_config(server: MockServer, **options) -> MyUpwayConfig:
+    return MyUpwayConfig(dataservice=DataService.MYUPLINK, client_id='client', client_secret='secret', base_url=server.url, **options)
+
+
+@pytest.fixture
+def server() -> Iterator[MockServer]:
+    with MockServer() as mock:
+        yield mock
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch) -> str:
+    """
+    Runs the test with NumPy and with the pure Python fallback used when NumPy is not installed.
+    """
+
+    if request.param == 'python':
+        monkeypatch.setitem(sys.modules, 'numpy', None)
+    else:
+        pytest.importorskip('numpy')
+
+    return request.param
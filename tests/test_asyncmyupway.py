@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from mockserver import MockServer
+from pyupway import AsyncMyUpway, MyUpway, Variable
+from pyupway.exceptions import NotLoggedIn, ResponseError
+from pyupway.transport import RequestPolicy
+
+VARIABLES = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_values_match_blocking_client(server, config):
+    async def poll():
+        async with AsyncMyUpway(config(server)) as myupway:
+            return myupway.deviceId, myupway.isOnline, await myupway.get_current_values(VARIABLES)
+
+    deviceId, isOnline, values = asyncio.run(poll())
+
+    with MyUpway(config(server)) as myupway:
+        expected = myupway.get_current_values(VARIABLES)
+
+        assert deviceId == myupway.deviceId
+        assert isOnline is True
+
+    assert [(value.Enumerator, value.Value) for value in values] == [(value.Enumerator, value.Value) for value in expected]
+
+
+def test_history_matches_blocking_client(server):
+    stop = datetime.now().replace(microsecond=0)
+    start = stop - timedelta(days=1)
+
+    async def history():
+        async with AsyncMyUpway(myupway_config(server)) as myupway:
+            return await myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop, 100)
+
+    series = asyncio.run(history())
+
+    with MyUpway(myupway_config(server)) as myupway:
+        expected = myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop, 100)
+
+    assert list(series.timestamps) == list(expected.timestamps)
+    assert list(series.values) == list(expected.values)
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_lazy_client_logs_in_on_first_request(server, config):
+    async def poll():
+        myupway = AsyncMyUpway(config(server), lazy=True)
+
+        async with myupway:
+            requests = sum(server.requests.values())
+            values = await myupway.get_current_values(VARIABLES)
+
+        return requests, values
+
+    requests, values = asyncio.run(poll())
+
+    assert requests == 0
+    assert len(values) == len(VARIABLES)
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_client_is_created_outside_event_loop(server, config):
+    myupway = AsyncMyUpway(config(server), lazy=True)
+
+    async def poll():
+        async with myupway:
+            return await myupway.get_current_values(VARIABLES)
+
+    values = asyncio.run(poll())
+
+    assert len(values) == len(VARIABLES)
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_request_before_login_raises_not_logged_in(server, config):
+    async def poll():
+        myupway = AsyncMyUpway(config(server))
+
+        try:
+            await myupway.get_current_values(VARIABLES)
+        finally:
+            await myupway.close()
+
+    with pytest.raises(NotLoggedIn):
+        asyncio.run(poll())
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_rejected_variable_is_left_out_and_logged(config, caplog):
+    caplog.set_level(logging.DEBUG, logger='pyupway.transport.batches')
+    variables = list(Variable)[:24]
+
+    async def poll(server):
+        async with AsyncMyUpway(config(server, values_batch_size=8)) as myupway:
+            return await myupway.get_current_values(variables)
+
+    with MockServer(invalid_ids=[Variable.ROOM_TEMPERATURE.value]) as server:
+        values = asyncio.run(poll(server))
+
+    assert Variable.ROOM_TEMPERATURE not in {value.Enumerator for value in values}
+    assert len(values) == 23
+    assert 'status code 400' in caplog.text
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_failed_request_raises_response_error_with_status(config):
+    async def poll(server):
+        async with AsyncMyUpway(config(server, request_policy=RequestPolicy(max_retries=0))) as myupway:
+            server.error_rate = 1.0
+            await myupway.get_current_values(VARIABLES)
+
+    with MockServer(error_status=500) as server:
+        with pytest.raises(ResponseError) as raised:
+            asyncio.run(poll(server))
+
+    assert raised.value.status == 500
+    assert '500' in str(raised.value)
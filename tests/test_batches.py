@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from conftest import myupway_config
+from mockserver import MockServer
+from pyupway import MyUpway, Variable
+from pyupway.exceptions import PartialResultError
+from pyupway.transport import split_batches, fetch_batches, fetch_batches_async
+
+
+class Rejected(Exception):
+    pass
+
+
+def is_rejected(error: BaseException) -> bool:
+    return isinstance(error, Rejected)
+
+
+def fetch_with(failing=(), rejected=()):
+    def fetch(batch):
+        if any(item in rejected for item in batch):
+            raise Rejected(batch)
+        if any(item in failing for item in batch):
+            raise ConnectionError(batch)
+        return [item * 10 for item in batch]
+
+    return fetch
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_split_batches_evenly():
+    assert split_batches(range(5), 8) == [[0, 1, 2, 3, 4]]
+    assert [len(batch) for batch in split_batches(range(70), 32)] == [24, 24, 22]
+
+
+def test_results_are_merged_in_batch_order(executor):
+    assert fetch_batches(fetch_with(), [[1, 2], [3], [4, 5]], executor, is_rejected) == [10, 20, 30, 40, 50]
+
+
+def test_rejected_item_is_isolated_and_left_out(executor):
+    assert fetch_batches(fetch_with(rejected={3}), [[1, 2, 3, 4], [5, 6]], executor, is_rejected) == [10, 20, 40, 50, 60]
+
+
+def test_failed_batch_raises_partial_result(executor):
+    with pytest.raises(PartialResultError) as raised:
+        fetch_batches(fetch_with(failing={3}), [[1, 2], [3, 4], [5, 6]], executor, is_rejected)
+
+    assert raised.value.results == [10, 20, 50, 60]
+    assert len(raised.value.errors) == 1
+    assert isinstance(raised.value.errors[0], ConnectionError)
+
+
+def test_first_error_is_raised_when_every_batch_fails(executor):
+    with pytest.raises(ConnectionError):
+        fetch_batches(fetch_with(failing={1, 3}), [[1, 2], [3, 4]], executor, is_rejected)
+
+
+def test_async_failed_batch_raises_partial_result():
+    async def fetch(batch):
+        return fetch_with(failing={3}, rejected={6})(batch)
+
+    with pytest.raises(PartialResultError) as raised:
+        asyncio.run(fetch_batches_async(fetch, [[1, 2], [3, 4], [5, 6]], 2, is_rejected))
+
+    assert raised.value.results == [10, 20, 50]
+
+
+def test_service_returns_values_of_other_batches():
+    with MockServer(invalid_ids=[Variable.ROOM_TEMPERATURE.value]) as server:
+        myupway = MyUpway(myupway_config(server, values_batch_size=8))
+        variables = list(Variable)[:24]
+        values = myupway.get_current_values(variables)
+
+        assert Variable.ROOM_TEMPERATURE not in {value.Enumerator for value in values}
+        assert len(values) == 23
+        myupway.close()
+
+
+def test_service_raises_partial_result_for_failed_batches(monkeypatch):
+    with MockServer() as server:
+        myupway = MyUpway(myupway_config(server, values_batch_size=8))
+        variables = list(Variable)[:24]
+        expected = myupway.get_current_values(variables)
+        fetch_batch = myupway._service._fetch_batch
+
+        def failing_fetch_batch(deviceId, batch, *args, **kwargs):
+            if Variable.ROOM_TEMPERATURE in batch:
+                raise requests.exceptions.HTTPError("Request failed with status code 500")
+            return fetch_batch(deviceId, batch, *args, **kwargs)
+
+        monkeypatch.setattr(myupway._service, '_fetch_batch', failing_fetch_batch)
+
+        with pytest.raises(PartialResultError) as raised:
+            myupway.get_current_values(variables)
+
+        failed = next(batch for batch in split_batches(variables, 8) if Variable.ROOM_TEMPERATURE in batch)
+        assert [value.Enumerator for value in raised.value.results] == [value.Enumerator for value in expected if value.Enumerator not in failed]
+        assert len(raised.value.errors) == 1
+        myupway.close()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from mockserver import MockServer
+from pyupway import AsyncMyUpway, MyUpway, Variable
+from pyupway.cache import ConditionalCache
+
+VARIABLES = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+
+def test_request_headers_are_sent_from_stored_response():
+    cache = ConditionalCache()
+
+    assert cache.request_headers('key') == {}
+
+    cache.store('key', {'ETag': '"abc"', 'Last-Modified': 'Wed, 01 Jun 2023 12:00:00 GMT'}, b'{}', {}, ['result'])
+
+    assert cache.request_headers('key') == {'If-None-Match': '"abc"', 'If-Modified-Since': 'Wed, 01 Jun 2023 12:00:00 GMT'}
+    assert cache.request_headers('other') == {}
+
+
+def test_not_modified_and_identical_payload_return_previous_result():
+    cache = ConditionalCache()
+    result = ['result']
+
+    assert cache.lookup_response('key', 200, b'{"a": 1}') is None
+
+    cache.store('key', {}, b'{"a": 1}', {'a': 1}, result)
+
+    assert cache.lookup_response('key', 304, b'') is result
+    assert cache.lookup_response('key', 200, b'{"a": 1}') is result
+    assert cache.lookup_response('key', 200, b'{"a": 2}') is None
+    assert cache.lookup_response('key', 500, b'') is None
+    assert cache.stats == {'not_modified': 1, 'unchanged': 1, 'changed': 1}
+
+
+def test_fingerprint_match_keeps_result_and_remembers_payload():
+    cache = ConditionalCache()
+    result = ['result']
+    cache.store('key', {'ETag': '"1"'}, b'{"a": 1, "date": "now"}', {'a': 1}, result)
+
+    assert cache.lookup_fingerprint('key', {'a': 2}) is None
+    assert cache.lookup_fingerprint('key', {'a': 1}) is result
+
+    cache.update('key', {}, b'{"a": 1, "date": "later"}')
+
+    assert cache.lookup_response('key', 200, b'{"a": 1, "date": "later"}') is result
+    assert cache.request_headers('key') == {'If-None-Match': '"1"'}
+
+    cache.clear()
+
+    assert cache.lookup_fingerprint('key', {'a': 1}) is None
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+@pytest.mark.parametrize('etag, stat', [(True, 'not_modified'), (False, 'unchanged')])
+def test_unchanged_poll_is_not_decoded(config, etag, stat):
+    with MockServer(etag=etag) as server:
+        cache = ConditionalCache()
+        myupway = MyUpway(config(server, conditional_cache=cache))
+
+        first = myupway.get_current_values(VARIABLES)
+        changed = cache.changed
+        second = myupway.get_current_values(VARIABLES)
+
+        assert second == first and second is not first
+        assert cache.changed == changed
+        assert getattr(cache, stat) == 1
+        myupway.close()
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_unchanged_poll_is_not_decoded_async(config):
+    async def poll(server):
+        cache = ConditionalCache()
+
+        async with AsyncMyUpway(config(server, conditional_cache=cache)) as myupway:
+            first = await myupway.get_current_values(VARIABLES)
+            second = await myupway.get_current_values(VARIABLES)
+
+        return cache, first, second
+
+    with MockServer(etag=True) as server:
+        cache, first, second = asyncio.run(poll(server))
+
+    assert second == first
+    assert cache.not_modified == 1
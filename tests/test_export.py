@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import csv
+import os
+
+from array import array
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import myupway_config
+from pyupway import MyUpway, Variable
+from pyupway.export import CsvHistoryWriter, ExportCheckpoint, HistoryExporter, HistoryWriter, LineProtocolHistoryWriter, ParquetHistoryWriter
+from pyupway.history import HistorySeries
+
+VARIABLES = [Variable.AVG_OUTDOOR_TEMP, Variable.HEAT_MEDIUM_FLOW]
+STOP = datetime(2024, 1, 3)
+START = STOP - timedelta(days=2)
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FailingMyUpway:
+    """
+    Passes history requests to myupway until calls requests have been made, then fails.
+    """
+
+    def __init__(self, myupway: MyUpway, calls: int) -> None:
+        self._myupway = myupway
+        self._calls = calls
+
+    def get_history_series(self, *args):
+        if self._calls == 0:
+            raise Interrupted()
+
+        self._calls -= 1
+        return self._myupway.get_history_series(*args)
+
+
+def export(myupway, path: str, checkpoint=None) -> int:
+    with LineProtocolHistoryWriter(path) as writer:
+        return HistoryExporter(myupway, writer, checkpoint, resolution=100, chunk_size=timedelta(hours=6), max_workers=1).export(VARIABLES, START, STOP)
+
+
+def test_csv_writer(tmp_path):
+    path = str(tmp_path / 'history.csv')
+
+    with CsvHistoryWriter(path) as writer:
+        writer.write(Variable.AVG_OUTDOOR_TEMP, HistorySeries('°C', array('q', [0, 60000]), array('d', [1.5, 2.0])))
+
+    with CsvHistoryWriter(path, iso_timestamps=False) as writer:
+        writer.write(Variable.AVG_OUTDOOR_TEMP, HistorySeries(None, array('q', [120000]), array('d', [3.0])))
+
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        rows = list(csv.reader(csv_file))
+
+    assert rows == [
+        ['timestamp', 'variable_id', 'variable', 'value', 'unit'],
+        ['1970-01-01T00:00:00+00:00', '40067', 'AVG_OUTDOOR_TEMP', '1.5', '°C'],
+        ['1970-01-01T00:01:00+00:00', '40067', 'AVG_OUTDOOR_TEMP', '2.0', '°C'],
+        ['120000', '40067', 'AVG_OUTDOOR_TEMP', '3.0', ''],
+    ]
+
+
+def test_line_protocol_writer(tmp_path):
+    path = str(tmp_path / 'history.lp')
+
+    with LineProtocolHistoryWriter(path, tags={'heat pump': '1'}) as writer:
+        writer.write(Variable.AVG_OUTDOOR_TEMP, HistorySeries('°C', array('q', [0, 1, 2, 3]), array('d', [1.5, float('nan'), float('inf'), 2.0])))
+        writer.write(Variable.ADDITION_STATUS, HistorySeries(None, array('q', [0, 1]), ['on', None]))
+        writer.write(Variable.HEAT_MEDIUM_FLOW, HistorySeries(None, array('q', [0, 1, 2]), [20, 20.5, True]))
+
+    with open(path, encoding='utf-8') as lp_file:
+        assert lp_file.read().splitlines() == [
+            'heatpump,heat\\ pump=1,variable=AVG_OUTDOOR_TEMP,unit=°C value=1.5 0',
+            'heatpump,heat\\ pump=1,variable=AVG_OUTDOOR_TEMP,unit=°C value=2.0 3',
+            'heatpump,heat\\ pump=1,variable=ADDITION_STATUS value="on" 0',
+            'heatpump,heat\\ pump=1,variable=HEAT_MEDIUM_FLOW value=20.0 0',
+            'heatpump,heat\\ pump=1,variable=HEAT_MEDIUM_FLOW value=20.5 1',
+            'heatpump,heat\\ pump=1,variable=HEAT_MEDIUM_FLOW value=true 2',
+        ]
+
+
+def test_writer_without_write_cannot_be_created(tmp_path):
+    class IncompleteWriter(HistoryWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteWriter()
+
+
+def test_parquet_writer(tmp_path):
+    pandas = pytest.importorskip('pandas')
+    pytest.importorskip('pyarrow')
+    directory = str(tmp_path / 'dataset')
+
+    with ParquetHistoryWriter(directory) as writer:
+        writer.write(Variable.AVG_OUTDOOR_TEMP, HistorySeries('°C', array('q', [0, 60000]), array('d', [1.5, 2.0])))
+        writer.commit()
+        writer.write(Variable.HEAT_MEDIUM_FLOW, HistorySeries('°C', array('q', [0]), array('d', [30.0])))
+        writer.commit()
+
+    assert sorted(os.listdir(directory)) == ['part-000000.parquet', 'part-000001.parquet']
+
+    frame = pandas.read_parquet(directory)
+
+    assert list(frame['variable']) == ['AVG_OUTDOOR_TEMP', 'AVG_OUTDOOR_TEMP', 'HEAT_MEDIUM_FLOW']
+    assert list(frame['value']) == [1.5, 2.0, 30.0]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = ExportCheckpoint(str(tmp_path / 'checkpoint.json'))
+
+    assert checkpoint.load() == ({}, None)
+
+    checkpoint.save({40067: (1000, 999000)}, 123)
+
+    assert checkpoint.load() == ({40067: (1000, 999000)}, 123)
+    assert os.listdir(tmp_path) == ['checkpoint.json']
+
+    checkpoint.clear()
+
+    assert checkpoint.load() == ({}, None)
+
+
+def test_interrupted_export_resumes_to_same_output(tmp_path, server):
+    with MyUpway(myupway_config(server)) as myupway:
+        expected_points = export(myupway, str(tmp_path / 'expected.lp'))
+
+        path = str(tmp_path / 'resumed.lp')
+        checkpoint = str(tmp_path / 'checkpoint.json')
+
+        with pytest.raises(Interrupted):
+            export(FailingMyUpway(myupway, 5), path, checkpoint)
+
+        history_requests = server.requests['history']
+        resumed_points = export(myupway, path, checkpoint)
+
+        # Two variables and eight chunks, two chunks were committed before the interruption
+        assert server.requests['history'] - history_requests == 12
+
+    with open(tmp_path / 'expected.lp', encoding='utf-8') as expected, open(path, encoding='utf-8') as resumed:
+        assert resumed.read() == expected.read()
+
+    assert 0 < resumed_points < expected_points
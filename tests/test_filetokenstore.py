@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import myuplink_config
+from pyupway.auth import FileTokenStore
+from pyupway.models import OAuthToken
+from pyupway.services import MyUplinkService
+
+
+def test_save_and_load(tmp_path):
+    store = FileTokenStore(str(tmp_path / 'tokens.json'))
+    store.save('a', OAuthToken(AccessToken='token-a', ExpiresAt=100.0))
+    store.save('b', OAuthToken(AccessToken='token-b', ExpiresAt=200.0))
+
+    assert store.load('a') == OAuthToken(AccessToken='token-a', ExpiresAt=100.0)
+    assert store.load('b').AccessToken == 'token-b'
+    assert store.load('missing') is None
+    assert stat.S_IMODE(os.stat(tmp_path / 'tokens.json').st_mode) == 0o600
+    assert os.listdir(tmp_path) == ['tokens.json']
+
+
+def test_lock_serializes_load_and_save(tmp_path):
+    store = FileTokenStore(str(tmp_path / 'tokens.json'))
+    store.save('counter', OAuthToken(AccessToken='0', ExpiresAt=0.0))
+
+    def increment(_):
+        with store.lock():
+            value = int(store.load('counter').AccessToken)
+            # Give the other threads a chance to interleave if the lock did not hold them
+            time.sleep(0.001)
+            store.save('counter', OAuthToken(AccessToken=str(value + 1), ExpiresAt=0.0))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(increment, range(40)))
+
+    assert store.load('counter').AccessToken == '40'
+
+
+def test_lock_is_exclusive_between_store_objects(tmp_path):
+    # Two objects on the same file stand in for two processes
+    first = FileTokenStore(str(tmp_path / 'tokens.json'))
+    second = FileTokenStore(str(tmp_path / 'tokens.json'))
+    acquired = threading.Event()
+
+    def take_second():
+        with second.lock():
+            acquired.set()
+
+    with first.lock():
+        thread = threading.Thread(target=take_second)
+        thread.start()
+        assert not acquired.wait(0.2)
+
+    thread.join(5)
+    assert acquired.is_set()
+
+
+def test_clients_starting_together_fetch_one_token(tmp_path, server):
+    store = FileTokenStore(str(tmp_path / 'tokens.json'))
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        services = list(executor.map(lambda _: MyUplinkService(myuplink_config(server, token_store=store)), range(6)))
+
+    assert server.requests['token'] == 1
+    assert len({service._token.AccessToken for service in services}) == 1
+
+    for service in services:
+        service.close()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+
+from array import array
+from datetime import timedelta
+
+import pytest
+
+from pyupway.history import HistoryBuckets, HistorySeries, bucket_resolution
+
+MINUTE = 60000
+
+
+def series(data) -> HistorySeries:
+    return HistorySeries.from_data('°C', data)
+
+
+def test_bucket_resolution():
+    assert bucket_resolution(0, 3600, 600) == 24
+    assert bucket_resolution(0, 3601, 600) == 28
+    assert bucket_resolution(0, 3600, 600, points_per_bucket=1) == 6
+    assert bucket_resolution(0, 3600, 600, log_interval=300) == 12
+    assert bucket_resolution(0, 0, 600) == 4
+
+
+def test_statistics_of_buckets(backend):
+    buckets = series([[0, 1.0], [MINUTE, 3.0], [2 * MINUTE, 2.0], [5 * MINUTE, 10.0], [9 * MINUTE, 4.0]]).aggregate(timedelta(minutes=5))
+
+    assert list(buckets.timestamps) == [0, 5 * MINUTE]
+    assert list(buckets.count) == [3, 2]
+    assert list(buckets.minimum) == [1.0, 4.0]
+    assert list(buckets.maximum) == [3.0, 10.0]
+    assert list(buckets.mean) == [2.0, 7.0]
+    assert list(buckets.last) == [2.0, 4.0]
+
+
+def test_unsorted_points_use_latest_as_last(backend):
+    buckets = HistoryBuckets.aggregate(None, array('q', [2 * MINUTE, 0, MINUTE]), array('d', [5.0, 1.0, 3.0]), timedelta(minutes=5))
+
+    assert list(buckets.count) == [3]
+    assert list(buckets.last) == [5.0]
+    assert list(buckets.mean) == [3.0]
+
+
+def test_points_outside_range_are_left_out(backend):
+    data = series([[0, 100.0], [10 * MINUTE, 1.0], [14 * MINUTE, 2.0], [20 * MINUTE, 100.0]])
+    buckets = HistoryBuckets.aggregate(data.Unit, data.timestamps, data.values, timedelta(minutes=5), 10 * MINUTE, 20 * MINUTE)
+
+    assert list(buckets.timestamps) == [10 * MINUTE, 15 * MINUTE]
+    assert list(buckets.count) == [2, 0]
+    assert buckets[0].Max == 2.0
+    assert buckets[1].Max is None and math.isnan(buckets.maximum[1])
+
+
+@pytest.mark.parametrize('fill, column, expected', [
+    (None, 'Mean', [1.0, None, None, 7.0]),
+    ('previous', 'Mean', [1.0, 2.0, 2.0, 7.0]),
+    ('previous', 'Last', [2.0, 2.0, 2.0, 7.0]),
+    ('linear', 'Mean', [1.0, 3.0, 5.0, 7.0]),
+])
+def test_fill_empty_buckets(backend, fill, column, expected):
+    data = series([[0, 0.0], [MINUTE, 1.0], [2 * MINUTE, 2.0], [15 * MINUTE, 7.0]])
+    buckets = HistoryBuckets.aggregate(data.Unit, data.timestamps, data.values, timedelta(minutes=5), 0, 20 * MINUTE, fill)
+
+    assert list(buckets.count) == [3, 0, 0, 1]
+    assert [getattr(bucket, column) for bucket in buckets] == expected
+    assert buckets[1].Count == 0
+
+
+def test_leading_and_trailing_empty_buckets_are_not_filled(backend):
+    data = series([[5 * MINUTE, 1.0]])
+    buckets = HistoryBuckets.aggregate(data.Unit, data.timestamps, data.values, timedelta(minutes=5), 0, 15 * MINUTE, 'linear')
+
+    assert [bucket.Mean for bucket in buckets] == [None, 1.0, None]
+
+
+def test_invalid_arguments():
+    data = series([[0, 1.0]])
+
+    with pytest.raises(ValueError):
+        data.aggregate(timedelta(minutes=5), fill='nearest')
+
+    with pytest.raises(ValueError):
+        data.aggregate(timedelta(0))
+
+    with pytest.raises(TypeError):
+        series([[0, 'on']]).aggregate(timedelta(minutes=5))
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from conftest import myupway_config
+from mockserver import MockServer
+from pyupway import MyUpway, Variable
+from pyupway.history import HistoryCache
+
+
+def test_missing_ranges_of_empty_cache():
+    cache = HistoryCache()
+
+    assert cache.missing_ranges(1, 40067, 100, 1000, 2000) == [(1000, 2000)]
+
+
+def test_stored_ranges_are_merged_and_gaps_reported():
+    cache = HistoryCache()
+    cache.store(1, 40067, 100, 1000, 1500, '°C', [[1000000, 1.0], [1500000, 2.0]])
+    cache.store(1, 40067, 100, 1800, 2000, '°C', [[1900000, 3.0]])
+
+    assert cache.missing_ranges(1, 40067, 100, 500, 2500) == [(500, 1000), (1500, 1800), (2000, 2500)]
+    assert cache.missing_ranges(1, 40067, 100, 1100, 1400) == []
+
+    cache.store(1, 40067, 100, 1500, 1800, '°C', [[1600000, 4.0]])
+
+    assert cache.missing_ranges(1, 40067, 100, 1000, 2000) == []
+    assert cache.load(1, 40067, 100, 1000, 2000) == ('°C', [[1000000, 1.0], [1500000, 2.0], [1600000, 4.0], [1900000, 3.0]])
+
+
+def test_ranges_are_kept_per_device_variable_and_resolution():
+    cache = HistoryCache()
+    cache.store(1, 40067, 100, 1000, 2000, None, [])
+
+    assert cache.missing_ranges(2, 40067, 100, 1000, 2000) == [(1000, 2000)]
+    assert cache.missing_ranges(1, 40071, 100, 1000, 2000) == [(1000, 2000)]
+    assert cache.missing_ranges(1, 40067, 200, 1000, 2000) == [(1000, 2000)]
+
+
+def test_unsettled_part_is_requested_again_and_replaced():
+    cache = HistoryCache()
+    cache.store(1, 40067, 100, 1000, 2000, None, [[1000000, 1.0], [1700000, 2.0], [1900000, 3.0]], settled=1500)
+
+    assert cache.missing_ranges(1, 40067, 100, 1000, 2000) == [(1500, 2000)]
+
+    cache.store(1, 40067, 100, 1500, 2000, None, [[1600000, 5.0], [2000000, 6.0]], settled=2000)
+
+    assert cache.missing_ranges(1, 40067, 100, 1000, 2000) == []
+    assert cache.load(1, 40067, 100, 1000, 2000)[1] == [[1000000, 1.0], [1600000, 5.0], [2000000, 6.0]]
+
+
+def test_service_requests_only_missing_history():
+    stop = datetime.now().replace(microsecond=0) - timedelta(days=1)
+    start = stop - timedelta(days=2)
+
+    with MockServer() as server:
+        myupway = MyUpway(myupway_config(server, history_cache=HistoryCache()))
+        first = myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop, 100)
+        again = myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop, 100)
+
+        assert server.requests['history'] == 1
+        assert list(again.timestamps) == list(first.timestamps)
+
+        myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop + timedelta(days=1), 100)
+
+        assert server.requests['history'] == 2
+        myupway.close()
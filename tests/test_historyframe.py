@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import math
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from pyupway import Variable
+from pyupway.history import HistoryFrame, HistorySeries
+
+MINUTE = 60000
+FLOW = Variable.EXTERNAL_FLOW_TEMP
+RETURN = Variable.EXTERNAL_RETURN_TEMP
+STATUS = Variable.ADDITION_STATUS
+
+
+def series(data) -> HistorySeries:
+    return HistorySeries.from_data('°C', data)
+
+
+def values(frame: HistoryFrame, variable: Variable) -> list:
+    return [None if isinstance(value, float) and math.isnan(value) else value for value in frame.columns[variable]]
+
+
+def test_timeline_is_union_of_timestamps(backend):
+    frame = HistoryFrame.align({
+        FLOW: series([[0, 30.0], [2 * MINUTE, 32.0]]),
+        RETURN: series([[MINUTE, 25.0], [2 * MINUTE, 26.0]]),
+    })
+
+    assert list(frame.timestamps) == [0, MINUTE, 2 * MINUTE]
+    assert values(frame, FLOW) == [30.0, 30.0, 32.0]
+    assert values(frame, RETURN) == [None, 25.0, 26.0]
+
+
+def test_without_ffill_only_exact_matches_are_used(backend):
+    frame = HistoryFrame.align({
+        FLOW: series([[0, 30.0], [2 * MINUTE, 32.0]]),
+        RETURN: series([[MINUTE, 25.0], [2 * MINUTE, 26.0]]),
+    }, ffill=False)
+
+    assert values(frame, FLOW) == [30.0, None, 32.0]
+    assert values(frame, RETURN) == [None, 25.0, 26.0]
+
+
+def test_values_older_than_tolerance_are_missing(backend):
+    frame = HistoryFrame.align({
+        FLOW: series([[0, 30.0], [10 * MINUTE, 32.0]]),
+        RETURN: series([[0, 25.0], [MINUTE, 25.5], [2 * MINUTE, 26.0], [10 * MINUTE, 27.0]]),
+    }, on=RETURN, tolerance=timedelta(minutes=1))
+
+    assert list(frame.timestamps) == [0, MINUTE, 2 * MINUTE, 10 * MINUTE]
+    assert values(frame, FLOW) == [30.0, 30.0, None, 32.0]
+
+
+def test_grid_timeline(backend):
+    start = datetime.fromtimestamp(0)
+    frame = HistoryFrame.align({FLOW: series([[MINUTE, 30.0], [4 * MINUTE, 32.0]])},
+                               on=timedelta(minutes=2), start=start, stop=start + timedelta(minutes=6))
+
+    assert list(frame.timestamps) == [0, 2 * MINUTE, 4 * MINUTE, 6 * MINUTE]
+    assert values(frame, FLOW) == [None, 30.0, 32.0, 32.0]
+
+    with pytest.raises(ValueError):
+        HistoryFrame.align({FLOW: series([[0, 30.0]])}, on=timedelta(0))
+
+
+def test_non_numeric_column(backend):
+    frame = HistoryFrame.align({
+        FLOW: series([[0, 30.0], [2 * MINUTE, 32.0]]),
+        STATUS: series([[MINUTE, 'on']]),
+    }, tolerance=timedelta(seconds=30))
+
+    assert frame.columns[STATUS] == [None, 'on', None]
+
+
+def test_at_and_between():
+    frame = HistoryFrame.align({FLOW: series([[0, 30.0], [MINUTE, 31.0], [2 * MINUTE, 32.0]])})
+    start = datetime.fromtimestamp(0)
+
+    assert frame.at(start - timedelta(seconds=1)) == {FLOW: None}
+    assert frame.at(start + timedelta(seconds=90)) == {FLOW: 31.0}
+    assert list(frame.between(start + timedelta(minutes=1), start + timedelta(minutes=2)).timestamps) == [MINUTE]
+
+
+def test_at_leaves_out_values_older_than_tolerance():
+    frame = HistoryFrame.align({FLOW: series([[0, 30.0], [MINUTE, 31.0]])}, tolerance=timedelta(minutes=5))
+    start = datetime.fromtimestamp(0)
+
+    assert frame.at(start + timedelta(minutes=6)) == {FLOW: 31.0}
+    assert frame.at(start + timedelta(minutes=7)) == {FLOW: None}
+    assert frame.between(start, start + timedelta(minutes=1)).at(start + timedelta(minutes=6)) == {FLOW: None}
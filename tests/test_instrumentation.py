@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from mockserver import MockServer
+from pyupway import AsyncMyUpway, MyUpway, Variable
+from pyupway.instrumentation import DecodeEvent, Instrumentation, PrometheusCollector, RequestEvent
+from pyupway.services.servicebase import ServiceBase
+from pyupway.transport import RequestPolicy
+
+VARIABLES = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+
+class Recorder(Instrumentation):
+    requests: List[RequestEvent]
+    decodes: List[DecodeEvent]
+
+    def __init__(self) -> None:
+        self.requests = []
+        self.decodes = []
+
+    def on_request(self, event: RequestEvent) -> None:
+        self.requests.append(event)
+
+    def on_decode(self, event: DecodeEvent) -> None:
+        self.decodes.append(event)
+
+
+def test_requests_and_decoding_are_reported(server):
+    recorder = Recorder()
+    stop = datetime.now().replace(microsecond=0)
+
+    with MyUpway(myupway_config(server, instrumentation=recorder)) as myupway:
+        myupway.get_current_values(VARIABLES)
+        myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, stop - timedelta(days=1), stop, 100)
+
+    assert [event.Operation for event in recorder.requests] == ['login', 'values', 'values', 'history']
+    assert all(event.Service == 'myupway' and event.Status == 200 and event.Error is None for event in recorder.requests)
+    assert all(event.BytesReceived > 0 and event.Retries == 0 for event in recorder.requests)
+    # All MyUpway requests are form posts
+    assert all(event.BytesSent > 0 for event in recorder.requests)
+    assert recorder.requests[2].DeviceId == '1'
+
+    values = [event for event in recorder.decodes if event.Operation == 'values']
+    assert values[-1].Values == len(VARIABLES)
+    assert any(event.Operation == 'history' for event in recorder.decodes)
+
+
+def test_async_requests_are_reported(server):
+    recorder = Recorder()
+
+    async def poll():
+        async with AsyncMyUpway(myuplink_config(server, instrumentation=recorder)) as myupway:
+            await myupway.get_current_values(VARIABLES)
+
+    asyncio.run(poll())
+
+    assert [event.Operation for event in recorder.requests] == ['token', 'devices', 'values']
+    assert all(event.Service == 'myuplink' and event.Status == 200 for event in recorder.requests)
+    assert [event.BytesSent > 0 for event in recorder.requests] == [True, False, False]
+    assert recorder.decodes[-1].Values == len(VARIABLES)
+
+
+def test_retries_and_errors_are_reported():
+    recorder = Recorder()
+
+    with MockServer() as server:
+        myupway = MyUpway(myupway_config(server, instrumentation=recorder, request_policy=RequestPolicy(max_retries=2, backoff=0.001)))
+        server.error_rate = 1.0
+
+        with pytest.raises(Exception):
+            myupway.get_current_values(VARIABLES)
+
+        myupway.close()
+
+    event = recorder.requests[-1]
+    assert event.Operation == 'values'
+    assert event.Status == 503
+    assert event.Retries == 2
+
+
+def test_prometheus_collector_renders_counters_and_histograms():
+    collector = PrometheusCollector(buckets=(0.1, 1.0))
+    collector.on_request(RequestEvent('myupway', 'values', '1', 200, 0.05, 100, 1, None, 40))
+    collector.on_request(RequestEvent('myupway', 'values', '1', None, 2.0, 0, 0, 'ConnectionError'))
+    collector.on_decode(DecodeEvent('myupway', 'values', 0.001, 0.002, 3))
+
+    lines = collector.render().splitlines()
+
+    assert 'pyupway_requests_total{service="myupway",operation="values",status="200"} 1' in lines
+    assert 'pyupway_request_errors_total{service="myupway",operation="values",error="ConnectionError"} 1' in lines
+    assert 'pyupway_request_retries_total{service="myupway",operation="values"} 1' in lines
+    assert 'pyupway_request_bytes_total{service="myupway",operation="values"} 40' in lines
+    assert 'pyupway_response_bytes_total{service="myupway",operation="values"} 100' in lines
+    assert 'pyupway_decoded_values_total{service="myupway",operation="values"} 3' in lines
+    assert 'pyupway_request_duration_seconds_bucket{service="myupway",operation="values",le="0.1"} 1' in lines
+    assert 'pyupway_request_duration_seconds_bucket{service="myupway",operation="values",le="1"} 1' in lines
+    assert 'pyupway_request_duration_seconds_bucket{service="myupway",operation="values",le="+Inf"} 2' in lines
+    assert 'pyupway_request_duration_seconds_count{service="myupway",operation="values"} 2' in lines
+    assert '# TYPE pyupway_request_duration_seconds histogram' in lines
+
+    collector.reset()
+
+    assert collector.render() == "\n"
+
+
+@pytest.mark.parametrize('data, size', [(None, 0), (b'abc', 3), ({'a': 'b c', 'd': 1}, 9), ([('id', 1), ('id', 2)], 9)])
+def test_body_size_counts_encoded_form(data, size):
+    assert ServiceBase._body_size(data) == size
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import os
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import myupway_config
+from pyupway import MyUpway, Variable, VariableValue
+from pyupway.metrics import Metric, MetricsEngine, RollingWindow, StateDuration, TimeWeightedIntegral
+
+POWER = Variable.ADDITION_ELECTRICAL_ADDITION_POWER
+START = datetime(2024, 1, 1)
+MINUTE = 60000
+
+
+def value(variable: Variable, number, minutes: float = 0, enum_value=None) -> VariableValue:
+    return VariableValue(variable.value, variable.name, variable, number, None, enum_value, START + timedelta(minutes=minutes))
+
+
+def feed(metric, points) -> None:
+    base = int(START.timestamp() * 1000)
+
+    for minutes, number in points:
+        metric.update(base + int(minutes * MINUTE), value(metric.variable, number))
+
+
+def test_step_integral_holds_value_until_next_observation():
+    integral = TimeWeightedIntegral(POWER, unit=timedelta(hours=1))
+    feed(integral, [(0, '2'), (30, '4'), (60, '0')])
+
+    assert integral.integral == pytest.approx(3.0)
+    assert integral.mean == pytest.approx(3.0)
+    assert integral.at(START + timedelta(minutes=90)) == pytest.approx(3.0)
+
+
+def test_linear_integral_and_max_gap():
+    linear = TimeWeightedIntegral(POWER, method='linear', max_gap=timedelta(minutes=30))
+    feed(linear, [(0, '0'), (30, '2'), (120, '2'), (150, '4')])
+
+    # 0 -> 2 over 30 min is 0.5, the 90 min gap is skipped, 2 -> 4 over 30 min is 1.5
+    assert linear.integral == pytest.approx(2.0)
+    assert linear.duration == 60 * MINUTE
+
+    step = TimeWeightedIntegral(POWER, max_gap=timedelta(minutes=30))
+    feed(step, [(0, '2'), (120, '2')])
+
+    assert step.integral == pytest.approx(1.0)
+    assert step.at(START + timedelta(minutes=300)) == pytest.approx(2.0)
+
+
+def test_older_observation_is_skipped():
+    integral = TimeWeightedIntegral(POWER)
+    base = int(START.timestamp() * 1000)
+
+    assert integral.update(base + MINUTE, value(POWER, '1'))
+    assert not integral.update(base + MINUTE, value(POWER, '5'))
+    assert not integral.update(base, value(POWER, '5'))
+
+
+def test_rolling_window():
+    window = RollingWindow(Variable.MYUPWAY_DEGREE_MINUTES, window=timedelta(minutes=10))
+    feed(window, [(0, '5'), (4, '-3'), (8, '7'), (12, '1'), (13, 'not a number')])
+
+    # Observation at 0 has left the window of the latest one at 13
+    assert window.count == 3
+    assert window.sum == pytest.approx(5.0)
+    assert window.minimum == -3.0
+    assert window.maximum == 7.0
+    assert window.change == pytest.approx(4.0)
+
+    feed(window, [(30, '2')])
+
+    assert (window.count, window.minimum, window.maximum, window.mean) == (1, 2.0, 2.0, 2.0)
+
+
+def test_state_duration():
+    states = StateDuration(Variable.ADDITION_STATUS)
+    feed(states, [(0, 'off'), (10, 'on'), (15, 'on'), (25, 'off'), (40, 'on')])
+
+    assert states.duration('off') == timedelta(minutes=25)
+    assert states.duration('on') == timedelta(minutes=15)
+    assert states.duration('on', START + timedelta(minutes=50)) == timedelta(minutes=25)
+    assert states.entries('on') == 2
+    assert states.ratio('off') == pytest.approx(25 / 40)
+    assert states.states == ['off', 'on']
+
+
+def test_state_duration_with_state_function_on_string_values():
+    # MyUpway returns numbers as strings, as in the StateDuration docstring example
+    duty = StateDuration(Variable.CURRENT_COMPRESSOR_FREQUENCY, state=lambda value: float(value.Value) > 0)
+    feed(duty, [(0, '0'), (10, '45.5'), (40, '0'), (60, '30')])
+
+    assert duty.duration(True) == timedelta(minutes=30)
+    assert duty.duration(False) == timedelta(minutes=30)
+    assert duty.entries(True) == 2
+
+
+def test_metric_without_observe_cannot_be_created():
+    class IncompleteMetric(Metric):
+        def _state(self):
+            return {}
+
+        def _restore(self, snapshot):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteMetric(POWER)
+
+
+def test_engine_feeds_metrics_and_survives_restart(tmp_path, server):
+    path = str(tmp_path / 'metrics.json')
+
+    def engine() -> MetricsEngine:
+        return MetricsEngine({
+            'temperature': RollingWindow(Variable.AVG_OUTDOOR_TEMP, window=timedelta(hours=1)),
+            'flow': TimeWeightedIntegral(Variable.HEAT_MEDIUM_FLOW, unit=timedelta(minutes=1)),
+        }, path)
+
+    first = engine()
+
+    with MyUpway(myupway_config(server)) as myupway:
+        values = myupway.get_current_values(first.variables)
+
+    assert first.update(values, START) == 2
+    assert first.update(values, START + timedelta(minutes=1)) == 2
+    assert first.update(values, START) == 0
+
+    first.save()
+
+    assert os.listdir(tmp_path) == ['metrics.json']
+
+    second = engine()
+
+    assert second.snapshot() == first.snapshot()
+    assert second['temperature'].count == 2
+    assert second['flow'].integral == pytest.approx(float(values[1].Value))
+
+
+def test_restore_rejects_snapshot_of_other_metric():
+    with pytest.raises(ValueError):
+        RollingWindow(Variable.AVG_OUTDOOR_TEMP, timedelta(hours=1)).restore(TimeWeightedIntegral(Variable.AVG_OUTDOOR_TEMP).snapshot())
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from mockserver import MockServer
+from pyupway import AsyncMyUpway, DataService, MyUpway, MyUpwayConfig, MyUpwayFleet, Variable
+from pyupway.exceptions import LoginErr
+
+VARIABLES = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+
+def test_myuplink_fleet_lists_devices_in_one_pass():
+    with MockServer(devices=250) as server:
+        with MyUpwayFleet(myuplink_config(server)) as fleet:
+            # 100 devices per page
+            assert server.requests['systems'] == 3
+            assert len(fleet.devices) == 250
+            assert len({device.Id for device in fleet.devices}) == 250
+
+            values = fleet.get_current_values(VARIABLES)
+
+    assert set(values) == {device.Id for device in fleet.devices}
+    assert all(len(device_values) == len(VARIABLES) for device_values in values.values())
+
+
+def test_myupway_fleet_polls_configured_heat_pumps(server):
+    config = MyUpwayConfig(dataservice=DataService.MYUPWAY, username='user', password='secret', heatpump_ids=[1, 2, 3], base_url=server.url)
+
+    with MyUpwayFleet(config) as fleet:
+        assert server.requests['login'] == 1
+        values = fleet.get_current_values(VARIABLES)
+
+    assert sorted(values) == ['1', '2', '3']
+    assert server.requests['login'] == 1
+
+
+@pytest.mark.parametrize('client', ['sync', 'async'])
+def test_myuplink_login_reads_only_first_page(client):
+    async def login(server):
+        async with AsyncMyUpway(myuplink_config(server)) as myupway:
+            return myupway.deviceId
+
+    with MockServer(devices=250) as server:
+        if client == 'sync':
+            with MyUpway(myuplink_config(server)) as myupway:
+                deviceId = myupway.deviceId
+        else:
+            deviceId = asyncio.run(login(server))
+
+        assert server.requests['systems'] == 1
+
+        with MyUpwayFleet(myuplink_config(server)) as fleet:
+            assert deviceId == fleet.devices[0].Id
+
+
+@pytest.mark.parametrize('client', ['sync', 'async'])
+def test_myuplink_login_without_devices_raises_login_error(client):
+    async def login(server):
+        myupway = AsyncMyUpway(myuplink_config(server), lazy=True)
+
+        try:
+            await myupway.login()
+        finally:
+            await myupway.close()
+
+    with MockServer(devices=0) as server:
+        with pytest.raises(LoginErr):
+            if client == 'sync':
+                MyUpway(myuplink_config(server))
+            else:
+                asyncio.run(login(server))
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+
+from conftest import myuplink_config
+from pyupway import MyUpway, Variable
+from pyupway.cache import ParameterCatalog
+
+
+def test_catalog_is_saved_and_loaded(tmp_path, server):
+    path = str(tmp_path / 'catalog.json')
+    catalog = ParameterCatalog(path)
+
+    with MyUpway(myuplink_config(server, parameter_catalog=catalog)) as myupway:
+        values = myupway.get_current_values([Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE])
+
+    catalog.save()
+
+    assert os.listdir(tmp_path) == ['catalog.json']
+
+    loaded = ParameterCatalog(path)
+    deviceId = myupway.deviceId
+
+    assert {metadata.ParameterId for metadata in loaded.parameters(deviceId)} == {metadata.ParameterId for metadata in catalog.parameters(deviceId)}
+    assert loaded.get(deviceId, str(Variable.HEAT_MEDIUM_FLOW.value)).Unit == values[0].Unit
+
+
+def test_unchanged_point_reuses_metadata():
+    catalog = ParameterCatalog()
+    point = {'parameterId': '40067', 'parameterName': 'Outdoor', 'parameterUnit': '°C', 'category': 'x', 'enumValues': []}
+
+    metadata, changed = catalog.resolve('device', point)
+    again, changed_again = catalog.resolve('device', dict(point))
+
+    assert changed and not changed_again
+    assert again is metadata
+    assert metadata.Enumerator == Variable.AVG_OUTDOOR_TEMP
+
+    _, changed_unit = catalog.resolve('device', dict(point, parameterUnit='K'))
+
+    assert changed_unit
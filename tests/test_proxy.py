@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import time
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from pyupway import MyUpway, Variable
+from pyupway.exceptions import ProxyError
+from pyupway.proxy import MyUpwayProxy, ProxyClient
+
+VARIABLES = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+
+def wait_for_poll(proxy: MyUpwayProxy) -> None:
+    deadline = time.monotonic() + 5
+
+    while proxy.polls == 0:
+        assert time.monotonic() < deadline, "Proxy did not poll"
+        time.sleep(0.01)
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_consumers_share_one_upstream_poll(server, config):
+    with MyUpway(config(server)) as myupway:
+        expected = myupway.get_current_values(VARIABLES)
+
+        with MyUpwayProxy(myupway, {variable: 60 for variable in VARIABLES}, port=0) as proxy:
+            wait_for_poll(proxy)
+            upstream = server.requests['values'] + server.requests['points']
+            clients = [ProxyClient(proxy.url) for _ in range(5)]
+
+            for client in clients:
+                values = client.get_current_values(VARIABLES)
+                assert [(value.Enumerator, value.Value, value.Unit) for value in values] == [(value.Enumerator, value.Value, value.Unit) for value in expected]
+                assert client.deviceId == myupway.deviceId
+                client.close()
+
+            assert server.requests['values'] + server.requests['points'] == upstream
+            assert proxy.status()['polls'] == 1
+
+
+def test_history_is_requested_through_the_client(server):
+    stop = datetime.now().replace(microsecond=0)
+    start = stop - timedelta(days=1)
+
+    with MyUpway(myupway_config(server)) as myupway:
+        expected = myupway.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop, 100)
+
+        with MyUpwayProxy(myupway, {Variable.AVG_OUTDOOR_TEMP: 60}, port=0) as proxy:
+            client = ProxyClient(proxy.url)
+            series = client.get_history_series(Variable.AVG_OUTDOOR_TEMP, start, stop, 100)
+            client.close()
+
+    assert series.Unit == expected.Unit
+    assert list(series.timestamps) == list(expected.timestamps)
+    assert list(series.values) == list(expected.values)
+
+
+def test_invalid_requests_raise_proxy_error(server):
+    with MyUpway(myupway_config(server)) as myupway:
+        with MyUpwayProxy(myupway, {Variable.AVG_OUTDOOR_TEMP: 60}, port=0) as proxy:
+            client = ProxyClient(proxy.url)
+
+            with pytest.raises(ProxyError, match='404'):
+                client._get('/unknown')
+
+            with pytest.raises(ProxyError, match='400'):
+                client._get('/values?variables=abc')
+
+            client.close()
+
+
+def test_subscriber_gets_current_values_first(server):
+    with MyUpway(myupway_config(server)) as myupway:
+        with MyUpwayProxy(myupway, {variable: 60 for variable in VARIABLES}, port=0) as proxy:
+            wait_for_poll(proxy)
+            events = ProxyClient(proxy.url).subscribe()
+
+            values = next(events)
+            assert sorted(value.Enumerator.value for value in values) == sorted(variable.value for variable in VARIABLES)
+
+            proxy.stop()
+
+            # Stopping the proxy ends the stream
+            assert list(events) == []
+
+
+def test_unix_socket(server, tmp_path):
+    path = str(tmp_path / 'pyupway.sock')
+
+    with MyUpway(myupway_config(server)) as myupway:
+        with MyUpwayProxy(myupway, {variable: 60 for variable in VARIABLES}, unix_socket=path) as proxy:
+            wait_for_poll(proxy)
+            client = ProxyClient(unix_socket=path)
+
+            assert [value.Enumerator for value in client.get_current_values(VARIABLES)] == VARIABLES
+            assert client.get_proxy_status()['polls'] == 1
+
+            client.close()
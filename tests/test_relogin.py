@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from mockserver import MockServer
+from pyupway import AsyncMyUpway, MyUpway, Variable
+
+VARIABLES = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+THREADS = 8
+# Seconds the server accepts a session cookie or access token
+LIFETIME = 0.5
+
+
+def poll_concurrently(myupway: MyUpway) -> list:
+    barrier = threading.Barrier(THREADS)
+
+    def poll(_):
+        barrier.wait()
+        return myupway.get_current_values(VARIABLES)
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        return list(executor.map(poll, range(THREADS)))
+
+
+@pytest.mark.parametrize('config, lifetime, operation', [
+    (myupway_config, 'session_lifetime', 'login'),
+    (myuplink_config, 'token_revoke_after', 'token'),
+])
+def test_expired_session_is_renewed_once(config, lifetime, operation):
+    with MockServer(**{lifetime: LIFETIME}) as server:
+        myupway = MyUpway(config(server))
+
+        for expected in (1, 2, 3):
+            results = poll_concurrently(myupway)
+
+            assert server.requests[operation] == expected
+            assert all(len(values) == len(VARIABLES) for values in results)
+
+            time.sleep(LIFETIME + 0.1)
+
+        myupway.close()
+
+
+@pytest.mark.parametrize('config, lifetime, operation', [
+    (myupway_config, 'session_lifetime', 'login'),
+    (myuplink_config, 'token_revoke_after', 'token'),
+])
+def test_expired_session_is_renewed_once_async(config, lifetime, operation):
+    async def poll(server):
+        async with AsyncMyUpway(config(server)) as myupway:
+            await myupway.get_current_values(VARIABLES)
+            await asyncio.sleep(LIFETIME + 0.1)
+
+            return await asyncio.gather(*(myupway.get_current_values(VARIABLES) for _ in range(THREADS)))
+
+    with MockServer(**{lifetime: LIFETIME}) as server:
+        results = asyncio.run(poll(server))
+
+        assert server.requests[operation] == 2
+        assert all(len(values) == len(VARIABLES) for values in results)
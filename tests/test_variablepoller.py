@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import pytest
+
+from conftest import myupway_config, myuplink_config
+from pyupway import AsyncMyUpway, MyUpway, Variable, VariableValue
+from pyupway.polling import AsyncVariablePoller, VariablePoller
+
+FAST = Variable.CURRENT_COMPRESSOR_FREQUENCY
+SLOW = Variable.AVG_OUTDOOR_TEMP
+
+
+class FakeClient:
+    """
+    Returns the values set in current and records the variables of every request.
+    """
+
+    current: Dict[Variable, str]
+    requests: List[List[Variable]]
+
+    def __init__(self, current: Dict[Variable, str]) -> None:
+        self.current = current
+        self.requests = []
+
+    def get_current_values(self, variables, force_login=False) -> List[VariableValue]:
+        self.requests.append(list(variables))
+
+        return [VariableValue(variable.value, variable.name, variable, self.current[variable], None, None, datetime.now()) for variable in variables]
+
+
+@pytest.fixture
+def clock(monkeypatch) -> List[float]:
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+
+    return now
+
+
+def test_variables_are_polled_on_their_own_intervals(clock):
+    client = FakeClient({FAST: '50', SLOW: '5.0'})
+    poller = VariablePoller(client, {FAST: 10, SLOW: timedelta(minutes=1)})
+
+    assert [value.Enumerator for value in poller.poll_once()] == [FAST, SLOW]
+    assert poller.sleep_time() == 10
+
+    clock[0] += 10
+    client.current[FAST] = '55'
+
+    assert [(value.Enumerator, value.Value) for value in poller.poll_once()] == [(FAST, '55')]
+    assert client.requests == [[FAST, SLOW], [FAST]]
+
+    clock[0] += 50
+
+    # Both are due again and fetched with one request, neither changed
+    assert poller.poll_once() == []
+    assert client.requests[-1] == [FAST, SLOW]
+    assert poller.last_values[FAST].Value == '55'
+
+
+def test_nothing_is_requested_before_a_variable_is_due(clock):
+    client = FakeClient({FAST: '50'})
+    poller = VariablePoller(client, {FAST: 10})
+    poller.poll_once()
+
+    clock[0] += 5
+
+    assert poller.poll_once() == []
+    assert poller.sleep_time() == 5
+    assert len(client.requests) == 1
+
+
+@pytest.mark.parametrize('intervals', [{}, {FAST: 0}, {FAST: timedelta(seconds=-1)}])
+def test_invalid_intervals_raise_value_error(intervals):
+    with pytest.raises(ValueError):
+        VariablePoller(FakeClient({}), intervals)
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_poller_yields_changes_from_client(server, config):
+    variables = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+    with MyUpway(config(server)) as myupway:
+        poller = VariablePoller(myupway, {variable: 60 for variable in variables})
+        changes = list(poller.poll(max_polls=1))
+        requests = sum(server.requests.values())
+
+        # Second poll is not due yet and sends no request
+        assert poller.poll_once() == []
+        assert sum(server.requests.values()) == requests
+
+    assert [[value.Enumerator for value in values] for values in changes] == [variables]
+
+
+@pytest.mark.parametrize('config', [myupway_config, myuplink_config])
+def test_async_poller_yields_changes_from_client(server, config):
+    variables = [Variable.HEAT_MEDIUM_FLOW, Variable.ROOM_TEMPERATURE]
+
+    async def poll():
+        async with AsyncMyUpway(config(server)) as myupway:
+            poller = AsyncVariablePoller(myupway, {variable: 60 for variable in variables})
+
+            return [values async for values in poller.poll(max_polls=1)]
+
+    changes = asyncio.run(poll())
+
+    assert [[value.Enumerator for value in values] for values in changes] == [variables]